@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: Session síncrona vs AsyncSession dentro de rutas async def
+
+Simula una consulta lenta (SLEEP) y lanza muchas peticiones concurrentes
+contra dos apps en proceso:
+  - "antes":   async def + Session síncrona (bloquea el event loop)
+  - "despues": async def + AsyncSession (aiosqlite / aiomysql)
+
+Uso (desde Backend/):
+    python benchmarks/bench_async_db.py --peticiones 200 --concurrencia 20 --latencia 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+def registrar_sleep(engine):
+    # SQLite no tiene SLEEP(): lo registramos para simular una consulta lenta de MySQL
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep", 1, lambda s: time.sleep(s) or 0)
+
+
+def crear_app_sync(ruta_db: str, latencia: float) -> FastAPI:
+    engine = create_engine(f"sqlite:///{ruta_db}", connect_args={"check_same_thread": False},
+                           pool_size=20, max_overflow=0)
+    registrar_sleep(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.state.engine = engine
+
+    @app.get("/noticias")
+    async def noticias(db: Session = Depends(get_db)):
+        # Patrón anterior: consulta síncrona dentro de async def
+        return {"ok": db.execute(text("SELECT sleep(:s)"), {"s": latencia}).scalar()}
+
+    return app
+
+
+def crear_app_async(ruta_db: str, latencia: float) -> FastAPI:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{ruta_db}", poolclass=AsyncAdaptedQueuePool,
+                                 pool_size=20, max_overflow=0)
+    registrar_sleep(engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.state.engine = engine
+
+    @app.get("/noticias")
+    async def noticias(db: AsyncSession = Depends(get_async_db)):
+        result = await db.execute(text("SELECT sleep(:s)"), {"s": latencia})
+        return {"ok": result.scalar()}
+
+    return app
+
+
+async def medir(app: FastAPI, peticiones: int, concurrencia: int) -> dict:
+    semaforo = asyncio.Semaphore(concurrencia)
+    latencias = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as cliente:
+        async def una():
+            async with semaforo:
+                inicio = time.perf_counter()
+                r = await cliente.get("/noticias")
+                r.raise_for_status()
+                latencias.append(time.perf_counter() - inicio)
+
+        # Calentamiento (abre las conexiones del pool)
+        await asyncio.gather(*[una() for _ in range(concurrencia)])
+        latencias.clear()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*[una() for _ in range(peticiones)])
+        total = time.perf_counter() - inicio
+
+    # Cerrar las conexiones (aiosqlite mantiene un hilo por conexión abierta)
+    resultado = app.state.engine.dispose()
+    if asyncio.iscoroutine(resultado):
+        await resultado
+
+    latencias.sort()
+    return {
+        "req_s": peticiones / total,
+        "p50_ms": latencias[len(latencias) // 2] * 1000,
+        "p99_ms": latencias[int(len(latencias) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--peticiones", type=int, default=200)
+    parser.add_argument("--concurrencia", type=int, default=20)
+    parser.add_argument("--latencia", type=float, default=0.02, help="segundos que tarda la consulta simulada")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_db = os.path.join(tmp, "bench.db")
+        print(f"\nBENCHMARK async vs sync ({args.peticiones} peticiones, concurrencia {args.concurrencia}, consulta {args.latencia * 1000:.0f} ms)")
+        print("=" * 70)
+        for nombre, fabrica in (("antes  (Session sync)", crear_app_sync), ("despues (AsyncSession)", crear_app_async)):
+            r = asyncio.run(medir(fabrica(ruta_db, args.latencia), args.peticiones, args.concurrencia))
+            print(f"{nombre:<24} {r['req_s']:8.1f} req/s   p50 {r['p50_ms']:7.1f} ms   p99 {r['p99_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
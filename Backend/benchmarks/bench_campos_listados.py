@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: tamaño de respuesta y bytes leídos de la base según los campos pedidos
+
+Levanta la app en proceso contra una base SQLite temporal (noticias con
+contenido de ~2000 caracteres) y, para cada listado, compara:
+  - "all":     todos los campos (lo que devolvía antes cada listado)
+  - "resumen": la proyección por defecto (sin `fields`)
+  - "mínimo":  un `fields=` con dos o tres campos
+
+Los "bytes BD" son la suma del tamaño de los valores que devuelve la consulta
+principal del listado (se vuelve a ejecutar el SQL capturado directamente
+sobre sqlite3), así que reflejan las columnas que load_only() dejó afuera.
+
+Uso (desde Backend/):
+    python benchmarks/bench_campos_listados.py --filas 50 --repeticiones 50
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+RUTA_DB = os.path.join(tempfile.mkdtemp(prefix="sn52_bench_"), "campos.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{RUTA_DB}"
+os.environ.setdefault("DB_POOL_PROFILE", "pruebas")
+os.environ["CACHE_RESPUESTAS_ACTIVA"] = "0"  # se mide la carga, no la cache
+os.environ["CORREOS_WORKER_ACTIVO"] = "0"
+os.environ["RECUPERACION_BARRIDO_ACTIVO"] = "0"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from db.database import engine, async_engine
+from db.session import SessionLocal
+from main import app
+from models.categoria import Categoria
+from models.comentario import Comentario
+from models.noticia import Noticia
+from models.notificacion import Notificacion
+from models.rol import Rol
+from models.usuario import Usuario
+from security.auth import get_current_user
+
+CASOS = [
+    ("/api/noticias/", Noticia, "titulo,imagen"),
+    ("/api/comentarios/noticia/1", Comentario, "id_comentario,contenido"),
+    ("/api/notificaciones/", Notificacion, "id_notificacion,titulo,leida"),
+]
+
+
+def sembrar(filas: int):
+    hoy = date.today()
+    with SessionLocal() as db:
+        db.add(Rol(id_rol=1, nombre="admin", fecha_creacion=hoy))
+        db.add_all([
+            Usuario(id_usuario=i, nombre_usuario=f"Nombre{i}", apellido_usuario="Apellido", correo_usuario=f"u{i}@sn52.test",
+                    contrasena_usuario="x", rol_id=1)
+            for i in range(1, 21)
+        ])
+        db.add(Categoria(id_categoria=1, nombre="General", estado=True))
+        for i in range(1, filas + 1):
+            db.add(Noticia(id_noticia=i, titulo=f"Titular de la noticia {i}", introduccion="Introducción breve " * 8,
+                           contenido=("Párrafo del contenido completo de la noticia. " * 45)[:2000], categoria_id=1,
+                           estado=3, fecha_creacion=hoy - timedelta(days=i), imagen=f"uploads/noticias/noticia_{i}.jpg",
+                           usuario_escritor_id=1 + i % 20, usuario_revisor_id=1 + (i + 1) % 20))
+            db.add(Comentario(id_comentario=i, noticia_id=1, usuario_id=1 + i % 20, contenido=f"Comentario {i} " * 10,
+                              estado=True, fecha_creacion=hoy - timedelta(days=i)))
+            db.add(Notificacion(id_notificacion=i, usuario_id=1, noticia_id=i, titulo=f"Aviso {i}",
+                                mensaje="Mensaje de la notificación " * 6, fecha_creacion=datetime.utcnow() - timedelta(minutes=i)))
+        db.commit()
+        usuario = db.get(Usuario, 1)
+        db.expunge(usuario)
+    return usuario
+
+
+def bytes_valor(valor) -> int:
+    if valor is None:
+        return 0
+    if isinstance(valor, (bytes, str)):
+        return len(valor.encode() if isinstance(valor, str) else valor)
+    return 8
+
+
+def bytes_leidos(consultas, tabla: str) -> int:
+    """Re-ejecuta la consulta principal del listado sobre sqlite3 y suma el tamaño de lo que devuelve"""
+    sql, parametros = next((s, p) for s, p in consultas if f"FROM {tabla}" in s and "validador_cache" not in s)
+    with sqlite3.connect(RUTA_DB) as conexion:
+        return sum(bytes_valor(v) for fila in conexion.execute(sql, parametros) for v in fila)
+
+
+def medir(cliente, url: str, tabla: str, repeticiones: int) -> tuple[int, int, float]:
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append((statement, parameters))
+
+    for e in (engine, async_engine.sync_engine):
+        event.listen(e, "before_cursor_execute", registrar)
+    try:
+        cuerpo = cliente.get(url).content
+    finally:
+        for e in (engine, async_engine.sync_engine):
+            event.remove(e, "before_cursor_execute", registrar)
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        cliente.get(url)
+    ms = (time.perf_counter() - inicio) / repeticiones * 1000
+    return len(cuerpo), bytes_leidos(consultas, tabla), ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payload y bytes leídos por proyección de campos")
+    parser.add_argument("--filas", type=int, default=50, help="filas por página (y sembradas por tabla)")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.getLogger("sn52").setLevel(logging.WARNING)  # sin la línea de log por petición
+    usuario = sembrar(args.filas)
+    app.dependency_overrides[get_current_user] = lambda: usuario
+
+    with TestClient(app) as cliente:
+        print(f"{'listado':<16}{'campos':<10}{'payload':>11}{'bytes BD':>11}{'ms/pet':>9}")
+        for ruta, modelo, minimo in CASOS:
+            tabla = modelo.__tablename__
+            base = f"{ruta}?limit={args.filas}"
+            for nombre, url in (("all", f"{base}&fields=all"), ("resumen", base), ("mínimo", f"{base}&fields={minimo}")):
+                payload, leidos, ms = medir(cliente, url, tabla, args.repeticiones)
+                print(f"{tabla:<16}{nombre:<10}{payload:>9} B{leidos:>9} B{ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: tamaño y costo de comprimir un listado de noticias (utils/compresion.py)
+
+Arma el JSON de una página de N noticias con todos los campos (como
+/api/noticias/?fields=all) y lo comprime con gzip y, si está instalado,
+brotli en varios niveles. Informa bytes resultantes, proporción y
+microsegundos por respuesta, para elegir COMPRESION_NIVEL_GZIP,
+COMPRESION_NIVEL_BROTLI y COMPRESION_MINIMO_BYTES.
+
+Uso (desde Backend/):
+    python benchmarks/bench_compresion.py --filas 1 10 100 --repeticiones 200
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import orjson
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.compresion import Compresor, codificaciones_disponibles
+
+NIVELES = {"gzip": (1, 6, 9), "br": (1, 4, 5, 11)}
+
+
+def pagina(filas: int) -> bytes:
+    hoy = date.today()
+    return orjson.dumps([
+        {
+            "id_noticia": i, "titulo": f"Titular de la noticia {i}", "introduccion": "Introducción breve " * 8,
+            "contenido": ("Contenido de la noticia. " * 80)[:2000], "imagen": f"uploads/noticias/noticia_{i}.jpg",
+            "fecha_creacion": hoy - timedelta(days=i), "categoria_id": 1 + i % 3, "estado": 3,
+            "usuario_escritor_id": i, "usuario_revisor_id": 1,
+            "escritor": {"id": i, "nombre": f"Escritor {i}"}, "revisor": {"id": 1, "nombre": "Editor"},
+            "categoria": {"id": 1 + i % 3, "nombre": "General"},
+        }
+        for i in range(1, filas + 1)
+    ])
+
+
+def medir(codificacion: str, nivel: int, cuerpo: bytes, repeticiones: int) -> tuple[int, float]:
+    """(bytes comprimidos, microsegundos por respuesta)"""
+    comprimido = Compresor(codificacion, nivel).terminar(cuerpo)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        Compresor(codificacion, nivel).terminar(cuerpo)
+    return len(comprimido), (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compresión gzip/brotli de un listado de noticias")
+    parser.add_argument("--filas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'filas':>6}{'original':>10}{'codif.':>8}{'nivel':>6}{'bytes':>9}{'proporción':>12}{'µs':>9}")
+    for n in args.filas:
+        cuerpo = pagina(n)
+        for codificacion in codificaciones_disponibles():
+            for nivel in NIVELES[codificacion]:
+                tamano, micros = medir(codificacion, nivel, cuerpo, max(5, args.repeticiones * 10 // max(n, 10)))
+                print(f"{n:>6}{len(cuerpo):>10}{codificacion:>8}{nivel:>6}{tamano:>9}{tamano / len(cuerpo):>12.2f}{micros:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: lectura de una página con el ORM vs db/lecturas.py (Core + sentencias cacheadas)
+
+Contra una base SQLite temporal, por página de N filas (noticias,
+comentarios y notificaciones, todos los campos) compara:
+  - "orm":  select(Modelo) + ordenar_por_cursor, objetos en el identity map (lo de antes)
+  - "core": leer_pagina(): Select ya armado y compilado, filas Row
+
+Cada petición abre su sesión, lee la página y la serializa con
+utils/serializacion.py. Se informa filas/s y el pico de memoria asignada
+por petición (tracemalloc).
+
+Uso (desde Backend/):
+    python benchmarks/bench_lecturas.py --filas 10 100 1000 --repeticiones 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+RUTA_DB = os.path.join(tempfile.mkdtemp(prefix="sn52_bench_"), "lecturas.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{RUTA_DB}"
+os.environ.setdefault("DB_POOL_PROFILE", "pruebas")
+
+from sqlalchemy import select
+
+from db import Base, engine
+from db.lecturas import leer_pagina
+from db.session import AsyncSessionLocal, SessionLocal
+from dtos.comentario_dto import ComentarioResponse
+from dtos.noticia_dto import NoticiaResponse
+from dtos.notificacion_dto import NotificacionResponse
+from models.categoria import Categoria
+from models.comentario import Comentario
+from models.noticia import Noticia
+from models.notificacion import Notificacion
+from models.rol import Rol
+from models.usuario import Usuario
+from utils.paginacion import ordenar_por_cursor
+from utils.serializacion import Serializador
+
+# (modelo, respuesta, filtros, columna id); ComentarioResponse sin el usuario anidado, que no depende de la lectura
+CASOS = [
+    (Noticia, NoticiaResponse, {"estado": 3}, "id_noticia"),
+    (Comentario, ComentarioResponse, {"noticia_id": 1, "estado": True}, "id_comentario"),
+    (Notificacion, NotificacionResponse, {"usuario_id": 1}, "id_notificacion"),
+]
+
+
+def sembrar(filas: int):
+    Base.metadata.create_all(bind=engine)
+    hoy = date.today()
+    with SessionLocal() as db:
+        db.add(Rol(id_rol=1, nombre="admin", fecha_creacion=hoy))
+        db.add(Usuario(id_usuario=1, nombre_usuario="Nombre", apellido_usuario="Apellido", correo_usuario="u1@sn52.test",
+                       contrasena_usuario="x", rol_id=1))
+        db.add(Categoria(id_categoria=1, nombre="General", estado=True))
+        for i in range(1, filas + 1):
+            db.add(Noticia(id_noticia=i, titulo=f"Titular {i}", introduccion="Introducción breve " * 8,
+                           contenido=("Contenido de la noticia. " * 80)[:2000], categoria_id=1, estado=3,
+                           fecha_creacion=hoy - timedelta(days=i), imagen=f"uploads/noticias/{i}.jpg",
+                           usuario_escritor_id=1, usuario_revisor_id=1))
+            db.add(Comentario(id_comentario=i, noticia_id=1, usuario_id=1, contenido=f"Comentario {i} " * 10,
+                              estado=True, fecha_creacion=hoy - timedelta(days=i)))
+            db.add(Notificacion(id_notificacion=i, usuario_id=1, noticia_id=i, titulo=f"Aviso {i}",
+                                mensaje="Mensaje de la notificación " * 6, fecha_creacion=datetime.utcnow() - timedelta(minutes=i)))
+        db.commit()
+
+
+def comentario_sin_usuario(fila) -> dict:
+    return {"usuario": {"id": 1, "nombre": "Nombre Apellido"}}
+
+
+async def pagina_orm(modelo, serializador, filtros, id_columna, limit: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        query = select(modelo)
+        for nombre, valor in filtros.items():
+            query = query.where(getattr(modelo, nombre) == valor)
+        query = ordenar_por_cursor(query, modelo.fecha_creacion, getattr(modelo, id_columna)).offset(0)
+        filas = (await db.execute(query.limit(limit + 1))).scalars().all()[:limit]
+        extra = comentario_sin_usuario if modelo is Comentario else (lambda fila: {})
+        return serializador.json_lista([serializador.fila(f, **extra(f)) for f in filas])
+
+
+async def pagina_core(modelo, serializador, filtros, id_columna, limit: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        filas = (await leer_pagina(db, modelo, serializador.columnas(modelo, serializador.campos), filtros, None, 0, limit))[:limit]
+        extra = comentario_sin_usuario if modelo is Comentario else (lambda fila: {})
+        return serializador.json_lista([serializador.fila(f, **extra(f)) for f in filas])
+
+
+async def medir(funcion, repeticiones: int) -> tuple[float, float]:
+    """(segundos por petición, KiB de pico por petición)"""
+    await funcion()  # calentamiento: conexión, compilación y cache de sentencias
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        await funcion()
+    segundos = (time.perf_counter() - inicio) / repeticiones
+
+    picos = []
+    for _ in range(min(repeticiones, 10)):
+        tracemalloc.start()
+        await funcion()
+        picos.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return segundos, sorted(picos)[len(picos) // 2] / 1024
+
+
+async def principal(filas: list, repeticiones: int):
+    print(f"{'tabla':<15}{'filas':>6}{'orm filas/s':>14}{'core filas/s':>14}{'orm KiB':>10}{'core KiB':>10}{'mejora':>8}")
+    for modelo, respuesta, filtros, id_columna in CASOS:
+        serializador = Serializador(respuesta)
+        for n in filas:
+            veces = max(5, repeticiones * 10 // max(n, 10))
+            orm = lambda: pagina_orm(modelo, serializador, filtros, id_columna, n)
+            core = lambda: pagina_core(modelo, serializador, filtros, id_columna, n)
+            assert await orm() == await core()  # mismo JSON
+            t_orm, kib_orm = await medir(orm, veces)
+            t_core, kib_core = await medir(core, veces)
+            print(f"{modelo.__tablename__:<15}{n:>6}{n / t_orm:>14.0f}{n / t_core:>14.0f}"
+                  f"{kib_orm:>10.0f}{kib_core:>10.0f}{t_orm / t_core:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM vs Core en las lecturas de listados")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    sembrar(max(args.filas) + 1)
+    asyncio.run(principal(args.filas, args.repeticiones))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+PRUEBA DE CARGA: ráfaga de logins concurrentes con bcrypt
+
+Lanza una ráfaga de logins y, al mismo tiempo, peticiones livianas (/ping)
+contra tres apps en proceso:
+  - "antes def":      def login + bcrypt en línea (ocupa un hilo del threadpool de Starlette)
+  - "antes async":    async def + bcrypt en línea (como register: congela el event loop)
+  - "despues pool":   async def + bcrypt en security.passwords.PoolHash (acotado, con 503 al saturarse)
+
+Mide p50/p99 del login, p99 del /ping durante la ráfaga y logins rechazados (503).
+
+Uso (desde Backend/):
+    python benchmarks/bench_login.py --logins 100 --rondas 10 --hilos 4 --cola 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI, Form, HTTPException
+from passlib.context import CryptContext
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from security.passwords import PoolHash
+
+
+def crear_apps(rondas: int, hilos: int, cola: int) -> dict:
+    contexto = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rondas)
+    hash_guardado = contexto.hash("secreta")
+    pool = PoolHash(hilos, cola)
+
+    antes_def, antes_async, despues = FastAPI(), FastAPI(), FastAPI()
+    for app in (antes_def, antes_async, despues):
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+    @antes_def.post("/login")
+    def login_def(contrasena: str = Form(...)):
+        if not contexto.verify(contrasena, hash_guardado):
+            raise HTTPException(status_code=400)
+        return {"ok": True}
+
+    @antes_async.post("/login")
+    async def login_async(contrasena: str = Form(...)):
+        if not contexto.verify(contrasena, hash_guardado):
+            raise HTTPException(status_code=400)
+        return {"ok": True}
+
+    @despues.post("/login")
+    async def login_pool(contrasena: str = Form(...)):
+        if not await pool.ejecutar(contexto.verify, contrasena, hash_guardado):
+            raise HTTPException(status_code=400)
+        return {"ok": True}
+
+    return {"antes def": (antes_def, None), "antes async": (antes_async, None), "despues pool": (despues, pool)}
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+async def rafaga(app: FastAPI, logins: int) -> dict:
+    latencias_login, latencias_ping, rechazados = [], [], 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as cliente:
+        # Todos los logins llegan en el mismo instante: la latencia se mide desde el inicio de la ráfaga
+        # (medirla desde que arranca cada corrutina esconde el tiempo que el event loop estuvo congelado)
+        inicio = time.perf_counter()
+
+        async def login():
+            nonlocal rechazados
+            r = await cliente.post("/login", data={"contrasena": "secreta"})
+            if r.status_code == 503:
+                rechazados += 1
+                return
+            r.raise_for_status()
+            latencias_login.append(time.perf_counter() - inicio)
+
+        async def pings(fin: asyncio.Event):
+            # Un /ping cada 5 ms: la latencia incluye lo que el loop tardó en despertar del sleep
+            while not fin.is_set():
+                programado = time.perf_counter() + 0.005
+                await asyncio.sleep(0.005)
+                await cliente.get("/ping")
+                latencias_ping.append(time.perf_counter() - programado)
+
+        fin = asyncio.Event()
+        tarea_pings = asyncio.ensure_future(pings(fin))
+        await asyncio.gather(*[login() for _ in range(logins)])
+        total = time.perf_counter() - inicio
+        fin.set()
+        await tarea_pings
+
+    return {
+        "total_s": total,
+        "login_p50": percentil(latencias_login, 0.50),
+        "login_p99": percentil(latencias_login, 0.99),
+        "ping_p99": percentil(latencias_ping, 0.99),
+        "rechazados": rechazados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100, help="logins simultáneos en la ráfaga")
+    parser.add_argument("--rondas", type=int, default=10, help="costo de bcrypt (producción usa 12)")
+    parser.add_argument("--hilos", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--cola", type=int, default=32, help="logins que pueden esperar en el pool")
+    args = parser.parse_args()
+
+    print(f"\nCARGA login ({args.logins} logins simultáneos, bcrypt {args.rondas} rondas, "
+          f"pool {args.hilos} hilos + cola {args.cola}, {os.cpu_count()} CPU)")
+    print("=" * 90)
+    for nombre, (app, pool) in crear_apps(args.rondas, args.hilos, args.cola).items():
+        r = asyncio.run(rafaga(app, args.logins))
+        print(f"{nombre:<14} total {r['total_s']:6.2f} s   login p50 {r['login_p50']:8.1f} ms   "
+              f"p99 {r['login_p99']:8.1f} ms   /ping p99 {r['ping_p99']:8.1f} ms   503: {r['rechazados']}")
+        if pool:
+            print(f"{'':<14} {pool.resumen()}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: costo de render por mensaje de los correos
+
+Compara, para el aviso de borrador y el de bienvenida:
+  - "f-string":            el HTML armado con f-strings como antes (copia abajo)
+  - "jinja sin precompilar": Environment nuevo y compilación en cada mensaje
+  - "jinja precompilado":  services/plantillas_correo.py sin cache
+  - "jinja + cache":       el mismo borrador enviado a N editores (fan-out)
+
+Uso (desde Backend/):
+    python benchmarks/bench_plantillas_correo.py --mensajes 20000 --editores 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from services.plantillas_correo import DIRECTORIO_PLANTILLAS, renderizar, fragmento, cache_render, estadisticas_render
+
+URL_PANEL = "http://localhost:5173/dashboard"
+
+
+def borrador_fstring(titulo_noticia: str, escritor_nombre: str) -> str:
+    # Cuerpo que usaba mail_service antes de las plantillas
+    return f"""
+        <html>
+          <body style="font-family: Arial, sans-serif; color: #333; padding: 20px;">
+            <div style="max-width: 600px; margin: auto; border: 1px solid #ddd; border-radius: 10px; padding: 20px;">
+              <h2 style="color: #004aad;">📝 Nuevo borrador para revisión</h2>
+              <p>Hola,</p>
+              <p>El escritor <strong>{escritor_nombre}</strong> ha guardado un nuevo borrador titulado:</p>
+              <p style="font-size: 18px; font-weight: bold; color: #004aad;">"{titulo_noticia}"</p>
+              <p>Por favor, revisa el borrador en el panel de administración y proporciona retroalimentación al escritor.</p>
+              <a href="{URL_PANEL}"
+                 style="background-color:#004aad; color:white; padding:10px 20px; border-radius:5px; text-decoration:none; font-weight:bold;">
+                 Ir al panel de administración
+              </a>
+              <br><br>
+              <p>Con aprecio,<br><strong>El equipo de SN-52</strong></p>
+            </div>
+          </body>
+        </html>
+        """
+
+
+def borrador_sin_precompilar(titulo_noticia: str, escritor_nombre: str) -> str:
+    entorno = Environment(loader=FileSystemLoader(DIRECTORIO_PLANTILLAS), autoescape=select_autoescape(["html"]),
+                          cache_size=0, trim_blocks=True, lstrip_blocks=True)
+    entorno.globals["fragmento"] = fragmento
+    return entorno.get_template("borrador.html").render(
+        titulo_noticia=titulo_noticia, escritor_nombre=escritor_nombre, url_panel=URL_PANEL
+    )
+
+
+def medir(funcion, mensajes: int) -> float:
+    """Microsegundos por mensaje"""
+    inicio = time.perf_counter()
+    for i in range(mensajes):
+        funcion(i)
+    return (time.perf_counter() - inicio) * 1e6 / mensajes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mensajes", type=int, default=20000)
+    parser.add_argument("--editores", type=int, default=20, help="destinatarios por borrador en el fan-out")
+    args = parser.parse_args()
+
+    contexto = lambda i: {"titulo_noticia": f"Borrador {i}", "escritor_nombre": "Ana Pérez", "url_panel": URL_PANEL}
+    casos = [
+        ("borrador f-string", lambda i: borrador_fstring(f"Borrador {i}", "Ana Pérez")),
+        ("borrador sin precompilar", lambda i: borrador_sin_precompilar(f"Borrador {i}", "Ana Pérez")),
+        ("borrador precompilado", lambda i: renderizar("borrador.html", contexto(i), cache=False)),
+        (f"borrador + cache ({args.editores} editores)", lambda i: renderizar("borrador.html", contexto(i // args.editores))),
+        ("bienvenida precompilada", lambda i: renderizar("bienvenida.html", {"nombre": f"Usuario {i}"}, cache=False)),
+    ]
+
+    print(f"\nBENCHMARK render de correos ({args.mensajes} mensajes por caso)")
+    print("=" * 70)
+    for nombre, funcion in casos:
+        cache_render.limpiar()
+        # "sin precompilar" es ~100x más lento: con menos mensajes alcanza
+        mensajes = args.mensajes // 50 if "sin precompilar" in nombre else args.mensajes
+        print(f"{nombre:<40} {medir(funcion, mensajes):9.2f} µs/mensaje")
+        if "cache" in nombre:
+            print(f"{'':<40} {estadisticas_render()}")
+
+
+if __name__ == "__main__":
+    main()
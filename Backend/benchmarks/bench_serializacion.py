@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: costo de serializar una página de noticias, comentarios y notificaciones
+
+Para listas de N filas ORM (sin base de datos) compara:
+  - "antes":            model_validate().model_dump() por fila en la ruta, después la
+                        validación de FastAPI contra response_model y JSONResponse (json.dumps)
+  - "antes + orjson":   lo mismo con ORJSONResponse como clase por defecto
+  - "una validación":   utils/serializacion.py (TypeAdapter + dump_json de pydantic-core)
+  - "una val. + orjson": la misma validación, dump_python(mode="json") y orjson.dumps
+
+Uso (desde Backend/):
+    python benchmarks/bench_serializacion.py --filas 10 100 1000 --repeticiones 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from dtos.comentario_dto import ComentarioResponse, usuario_short
+from dtos.noticia_dto import NoticiaResponse, NoticiaExpandidaResponse, autor_publico
+from dtos.notificacion_dto import NotificacionResponse, NotificacionExpandidaResponse
+from models.categoria import Categoria
+from models.comentario import Comentario
+from models.noticia import Noticia
+from models.notificacion import Notificacion
+from models.usuario import Usuario
+from utils.serializacion import Serializador
+
+
+def crear_filas(n: int):
+    usuarios = [
+        Usuario(id_usuario=i, nombre_usuario=f"Nombre{i}", apellido_usuario=f"Apellido{i}",
+                correo_usuario=f"u{i}@sn52.test", foto_usuario=None)
+        for i in range(1, 21)
+    ]
+    categoria = Categoria(id_categoria=1, nombre="General")
+    hoy = date(2026, 10, 18)
+    ahora = datetime(2026, 10, 18, 12, 0, 0)
+    noticias = [
+        Noticia(id_noticia=i, titulo=f"Titular {i}", introduccion="Introducción " * 8, contenido="Contenido " * 60,
+                categoria_id=1, estado=3, fecha_creacion=hoy - timedelta(days=i), imagen=f"/uploads/noticias/{i}.jpg",
+                usuario_escritor_id=usuarios[i % 20].id_usuario, usuario_revisor_id=usuarios[(i + 1) % 20].id_usuario)
+        for i in range(n)
+    ]
+    comentarios = [
+        Comentario(id_comentario=i, contenido=f"Comentario número {i}", fecha_creacion=ahora - timedelta(minutes=i),
+                   noticia_id=1, usuario_id=usuarios[i % 20].id_usuario, estado=True)
+        for i in range(n)
+    ]
+    notificaciones = [
+        Notificacion(id_notificacion=i, titulo=f"Aviso {i}", mensaje="Mensaje de la notificación " * 4, leida=bool(i % 2),
+                     noticia_id=i, usuario_id=1, fecha_creacion=ahora - timedelta(minutes=i))
+        for i in range(n)
+    ]
+    return {u.id_usuario: u for u in usuarios}, categoria, noticias, comentarios, notificaciones
+
+
+def casos(n: int):
+    """(nombre, response_model, filas -> lista como la armaba la ruta, serializador, filas -> dicts para una validación)"""
+    usuarios, categoria, noticias, comentarios, notificaciones = crear_filas(n)
+    titulos = {n.id_noticia: n.titulo for n in noticias}
+
+    def noticias_antes():
+        respuesta = []
+        for n in noticias:
+            datos = NoticiaResponse.model_validate(n).model_dump()
+            datos["escritor"] = autor_publico(usuarios.get(n.usuario_escritor_id), n.usuario_escritor_id)
+            datos["revisor"] = autor_publico(usuarios.get(n.usuario_revisor_id), n.usuario_revisor_id)
+            datos["categoria"] = {"id": categoria.id_categoria, "nombre": categoria.nombre}
+            respuesta.append(datos)
+        return respuesta
+
+    s_noticias = Serializador(NoticiaExpandidaResponse)
+
+    def noticias_una():
+        return [
+            s_noticias.fila(
+                n,
+                escritor=autor_publico(usuarios.get(n.usuario_escritor_id), n.usuario_escritor_id),
+                revisor=autor_publico(usuarios.get(n.usuario_revisor_id), n.usuario_revisor_id),
+                categoria={"id": categoria.id_categoria, "nombre": categoria.nombre},
+            )
+            for n in noticias
+        ]
+
+    def comentarios_antes():
+        # La ruta armaba los dicts a mano y FastAPI los validaba
+        return [
+            {"id_comentario": c.id_comentario, "contenido": c.contenido, "fecha_creacion": c.fecha_creacion,
+             "noticia_id": c.noticia_id, "usuario": usuario_short(usuarios.get(c.usuario_id), c.usuario_id),
+             "estado": c.estado}
+            for c in comentarios
+        ]
+
+    s_comentarios = Serializador(ComentarioResponse)
+
+    def comentarios_una():
+        return [s_comentarios.fila(c, usuario=usuario_short(usuarios.get(c.usuario_id), c.usuario_id)) for c in comentarios]
+
+    def notificaciones_antes():
+        respuesta = []
+        for n in notificaciones:
+            datos = NotificacionResponse.model_validate(n).model_dump()
+            datos["noticia_titulo"] = titulos.get(n.noticia_id)
+            respuesta.append(datos)
+        return respuesta
+
+    s_notificaciones = Serializador(NotificacionExpandidaResponse)
+
+    def notificaciones_una():
+        return [s_notificaciones.fila(n, noticia_titulo=titulos.get(n.noticia_id)) for n in notificaciones]
+
+    return [
+        ("NoticiaResponse", NoticiaExpandidaResponse, noticias_antes, s_noticias, noticias_una),
+        ("ComentarioResponse", ComentarioResponse, comentarios_antes, s_comentarios, comentarios_una),
+        ("NotificacionResponse", NotificacionExpandidaResponse, notificaciones_antes, s_notificaciones, notificaciones_una),
+    ]
+
+
+def medir(funcion, repeticiones: int) -> float:
+    funcion()  # calentamiento
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1e6  # µs por página
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo de serializar listas de respuestas")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+
+    for n in args.filas:
+        repeticiones = max(5, args.repeticiones * 10 // max(n, 10))
+        print(f"\n== {n} filas ({repeticiones} repeticiones) ==")
+        print(f"{'modelo':<22}{'antes':>12}{'antes+orjson':>14}{'una valid.':>12}{'una+orjson':>12}{'mejora':>9}")
+        for nombre, modelo, antes, serializador, una in casos(n):
+            campo = create_model_field(name="Response_" + nombre, type_=List[modelo], mode="serialization")
+
+            def pipeline_antes(clase=JSONResponse):
+                contenido = loop.run_until_complete(serialize_response(field=campo, response_content=antes()))
+                return clase(contenido).body
+
+            def pipeline_una():
+                return serializador.respuesta_lista(una()).body
+
+            def pipeline_una_orjson():
+                validados = serializador._lista.validate_python(una())
+                return orjson.dumps(serializador._lista.dump_python(validados, mode="json"))
+
+            # Las cuatro variantes producen el mismo JSON
+            esperado = orjson.loads(pipeline_antes())
+            assert orjson.loads(pipeline_una()) == esperado
+            assert orjson.loads(pipeline_una_orjson()) == esperado
+
+            t_antes = medir(pipeline_antes, repeticiones)
+            t_orjson = medir(lambda: pipeline_antes(ORJSONResponse), repeticiones)
+            t_una = medir(pipeline_una, repeticiones)
+            t_una_orjson = medir(pipeline_una_orjson, repeticiones)
+            print(f"{nombre:<22}{t_antes:>10.0f}µs{t_orjson:>12.0f}µs{t_una:>10.0f}µs{t_una_orjson:>10.0f}µs{t_antes / t_una:>8.2f}x")
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# db/cargador.py
+"""
+Cargador por lotes (estilo DataLoader) con alcance de una petición.
+
+Mientras se arma la respuesta se piden los ids que hacen falta
+(cargador.pedir(Usuario, id)) y luego resolver() trae cada tipo de entidad
+con una sola consulta IN (...), en vez de un SELECT por fila.
+
+Con filas=True (rutas GET de solo lectura, ver db/lecturas.py) trae filas de
+Core en vez de objetos del ORM: mismos atributos, sin identity map, y solo
+las columnas de COLUMNAS_RELACIONADAS: para mostrar un autor no se leen su
+contraseña ni su correo.
+"""
+from collections import defaultdict
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.lecturas import leer_por_ids
+from db.session import get_async_db
+from models.categoria import Categoria
+from models.usuario import Usuario
+
+# Lo que las respuestas muestran de cada entidad relacionada (autor_publico, usuario_short, categoría)
+COLUMNAS_RELACIONADAS = {
+    Usuario: ("id_usuario", "nombre_usuario", "apellido_usuario", "foto_usuario"),
+    Categoria: ("id_categoria", "nombre"),
+}
+
+
+class CargadorLote:
+
+    def __init__(self, db: AsyncSession, filas: bool = False, columnas: dict = COLUMNAS_RELACIONADAS):
+        self.db = db
+        self.filas = filas
+        self.columnas = columnas
+        self._pendientes = defaultdict(set)
+        self._cargados = defaultdict(dict)
+
+    def pedir(self, modelo, *ids):
+        """Anota ids de `modelo` para la próxima resolución (ignora None y los ya cargados)"""
+        cargados = self._cargados[modelo]
+        for id_ in ids:
+            if id_ is not None and id_ not in cargados:
+                self._pendientes[modelo].add(id_)
+
+    def agregar(self, modelo, id_, objeto):
+        """Registra una entidad que ya se tiene en memoria (ej. current_user)"""
+        self._cargados[modelo][id_] = objeto
+        self._pendientes[modelo].discard(id_)
+
+    async def resolver(self):
+        """Una consulta por tipo de entidad con todos los ids pendientes"""
+        for modelo, ids in list(self._pendientes.items()):
+            if not ids:
+                continue
+            if self.filas:
+                encontrados = await leer_por_ids(self.db, modelo, self.columnas[modelo], ids)
+                self._cargados[modelo].update({id_: encontrados.get(id_) for id_ in ids})
+                continue
+            pk = list(modelo.__table__.primary_key.columns)[0]
+            result = await self.db.execute(select(modelo).where(pk.in_(ids)))
+            cargados = self._cargados[modelo]
+            for objeto in result.scalars():
+                cargados[getattr(objeto, pk.key)] = objeto
+            # Los que no existen quedan como None para no volver a pedirlos
+            for id_ in ids:
+                cargados.setdefault(id_, None)
+        self._pendientes.clear()
+
+    def obtener(self, modelo, id_):
+        return self._cargados[modelo].get(id_)
+
+
+def get_cargador(db: AsyncSession = Depends(get_async_db)) -> CargadorLote:
+    # FastAPI cachea las dependencias por petición: un cargador (y una sesión) por request
+    return CargadorLote(db)
+
+
+def get_cargador_lectura(db: AsyncSession = Depends(get_async_db)) -> CargadorLote:
+    # Para las rutas GET que arman la respuesta con db/lecturas.py
+    return CargadorLote(db, filas=True)
@@ -0,0 +1,144 @@
+# db/instrumentacion.py
+"""
+Instrumentación SQL por petición.
+
+Los eventos del engine cuentan las consultas y el tiempo en base de datos de
+la petición en curso (ContextVar). El middleware lo devuelve en el header
+Server-Timing y escribe una línea de log estructurada por petición.
+Las consultas que superan SQL_SLOW_QUERY_MS se registran con su SQL y solo los
+tipos de sus parámetros: los valores (hashes de contraseñas y de tokens, correos)
+no llegan al log salvo que se active SQL_LOG_PARAMETROS para depurar.
+"""
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger("sn52.sql")
+
+UMBRAL_CONSULTA_LENTA = float(os.getenv("SQL_SLOW_QUERY_MS", "200")) / 1000
+LOG_PARAMETROS = os.getenv("SQL_LOG_PARAMETROS", "0") == "1"
+
+
+def describir_parametros(parameters):
+    """Tipos de los parámetros, sin sus valores (executemany: los de la primera fila y cuántas son)"""
+    if LOG_PARAMETROS:
+        return repr(parameters)
+    filas = 1
+    if isinstance(parameters, list):
+        filas = len(parameters)
+        parameters = parameters[0] if parameters else ()
+    if isinstance(parameters, dict):
+        tipos = {clave: type(valor).__name__ for clave, valor in parameters.items()}
+    else:
+        tipos = [type(valor).__name__ for valor in parameters or ()]
+    return {"filas": filas, "tipos": tipos}
+
+
+class MetricasPeticion:
+    """Acumulado de las consultas de una petición"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.mas_lenta = 0.0
+        self.sql_mas_lenta = None
+
+    def registrar(self, sql: str, duracion: float):
+        self.consultas += 1
+        self.tiempo_db += duracion
+        if duracion > self.mas_lenta:
+            self.mas_lenta = duracion
+            self.sql_mas_lenta = sql
+
+
+metricas_actuales: ContextVar[MetricasPeticion | None] = ContextVar("metricas_sql", default=None)
+
+
+def instalar_instrumentacion(engine):
+    """Engancha los eventos de cursor del engine (sync o async.sync_engine)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        duracion = time.perf_counter() - conn.info["inicio_consulta"].pop()
+        metricas = metricas_actuales.get()
+        if metricas is not None:
+            metricas.registrar(statement, duracion)
+        if duracion >= UMBRAL_CONSULTA_LENTA:
+            logger.warning(json.dumps({
+                "evento": "consulta_lenta",
+                "duracion_ms": round(duracion * 1000, 2),
+                "sql": statement,
+                "parametros": describir_parametros(parameters),
+            }, ensure_ascii=False))
+
+
+class MiddlewareTiempoSQL:
+    """
+    Middleware ASGI: abre las métricas de la petición, añade
+    Server-Timing (db y app) a la respuesta y registra el resumen.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metricas = MetricasPeticion()
+        token = metricas_actuales.set(metricas)
+        inicio = time.perf_counter()
+        estado = {"status": None}
+
+        async def send_con_timing(message):
+            if message["type"] == "http.response.start":
+                estado["status"] = message["status"]
+                total_ms = (time.perf_counter() - inicio) * 1000
+                valor = (
+                    f'db;dur={metricas.tiempo_db * 1000:.2f};desc="{metricas.consultas} consultas", '
+                    f'app;dur={total_ms:.2f}'
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", valor.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_timing)
+        finally:
+            metricas_actuales.reset(token)
+            logger.info(json.dumps({
+                "evento": "peticion",
+                "metodo": scope.get("method"),
+                "ruta": scope.get("path"),
+                "status": estado["status"],
+                "consultas": metricas.consultas,
+                "db_ms": round(metricas.tiempo_db * 1000, 2),
+                "mas_lenta_ms": round(metricas.mas_lenta * 1000, 2),
+                "sql_mas_lenta": (metricas.sql_mas_lenta or "")[:200] or None,
+                "total_ms": round((time.perf_counter() - inicio) * 1000, 2),
+            }, ensure_ascii=False))
+
+
+def presupuesto_consultas(maximo: int):
+    """
+    Declara junto a la ruta cuántas consultas SQL puede hacer como máximo
+    (sin contar la autenticación). tests/api/test_presupuesto_consultas.py lo verifica.
+
+        @router.get("/")
+        @presupuesto_consultas(4)
+        async def obtener_noticias(...):
+    """
+    def decorador(funcion):
+        funcion.presupuesto_consultas = maximo
+        return funcion
+    return decorador
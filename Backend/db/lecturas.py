@@ -0,0 +1,125 @@
+# db/lecturas.py
+"""
+Lecturas de solo lectura sin ORM para las rutas GET más usadas (listado y
+detalle de noticias, comentarios de una noticia, notificaciones).
+
+Con select(Noticia) cada fila se convierte en un objeto del ORM, entra al
+identity map de la sesión y se descarta apenas se serializa. Aquí las
+consultas son select() de Core sobre las columnas de la tabla y cada fila
+vuelve como Row (una tupla con acceso por nombre: fila.titulo), que
+utils/serializacion.py lee igual que un objeto.
+
+Las sentencias se arman una sola vez por forma (tabla, columnas, filtros,
+tipo de cursor) con bindparam() para los valores y se guardan en una LRU.
+Como se ejecuta siempre el mismo objeto Select, SQLAlchemy no recalcula su
+clave de cache y reutiliza el SQL ya compilado del compiled cache del
+engine: por petición solo cambian los parámetros.
+
+Las filas no son objetos de la sesión: no sirven para escribir. Las rutas
+que modifican datos siguen usando el ORM.
+"""
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, bindparam, or_, select
+
+from utils.cache_lru import CacheLRU
+from utils.paginacion import decodificar_cursor
+
+load_dotenv()
+
+LECTURAS_SENTENCIAS_MAXIMO = int(os.getenv("LECTURAS_SENTENCIAS_MAXIMO", "256"))
+
+sentencias_lectura = CacheLRU(LECTURAS_SENTENCIAS_MAXIMO)
+
+
+def sentencia(clave, construir):
+    """El Select guardado para `clave`, o el que arma `construir()` la primera vez"""
+    existente = sentencias_lectura.obtener(clave)
+    if existente is None:
+        existente = construir()
+        sentencias_lectura.guardar(clave, existente)
+    return existente
+
+
+def _columnas(tabla, nombres) -> tuple:
+    # En el orden de la tabla, sin repetidos; None = todas
+    if nombres is None:
+        return tuple(tabla.c)
+    nombres = set(nombres)
+    return tuple(c for c in tabla.c if c.key in nombres)
+
+
+def _clave_primaria(tabla):
+    return list(tabla.primary_key.columns)[0]
+
+
+async def leer_por_ids(db, modelo, columnas, ids) -> dict:
+    """{id: fila} con las columnas pedidas (None = todas) en una sola consulta IN (...)"""
+    ids = [i for i in set(ids) if i is not None]
+    if not ids:
+        return {}
+    tabla = modelo.__table__
+    pk = _clave_primaria(tabla)
+    columnas = tuple(columnas) if columnas is not None else None
+
+    def construir():
+        incluidas = _columnas(tabla, None if columnas is None else (*columnas, pk.key))
+        return select(*incluidas).where(pk.in_(bindparam("ids", expanding=True)))
+
+    filas = await db.execute(sentencia(("por_ids", tabla.name, columnas), construir), {"ids": ids})
+    return {getattr(fila, pk.key): fila for fila in filas}
+
+
+async def leer_uno(db, modelo, columnas, id_fila):
+    return (await leer_por_ids(db, modelo, columnas, [id_fila])).get(id_fila)
+
+
+async def leer_pagina(db, modelo, columnas, iguales: dict, cursor: str | None, skip: int, limit: int,
+                      columna_fecha: str = "fecha_creacion") -> list:
+    """
+    Página ordenada por (fecha, id) descendente, como utils/paginacion.ordenar_por_cursor:
+    limit + 1 filas para que recortar_pagina sepa si hay otra página.
+    `iguales` son filtros columna == valor; los que valen None se omiten.
+    """
+    tabla = modelo.__table__
+    pk = _clave_primaria(tabla)
+    fecha = tabla.c[columna_fecha]
+    iguales = {nombre: valor for nombre, valor in iguales.items() if valor is not None}
+    columnas = tuple(columnas) if columnas is not None else None
+
+    parametros = {f"igual_{nombre}": valor for nombre, valor in iguales.items()}
+    tipo_cursor = None
+    if cursor:
+        valor_fecha, parametros["cursor_id"] = decodificar_cursor(cursor)
+        if valor_fecha is None:
+            tipo_cursor = "sin_fecha"
+        else:
+            tipo_cursor = "fecha"
+            parametros["cursor_fecha"] = valor_fecha if fecha.type.python_type is datetime else valor_fecha.date()
+    else:
+        parametros["salto"] = skip
+    parametros["limite"] = limit + 1
+
+    def construir():
+        incluidas = _columnas(tabla, None if columnas is None else (*columnas, pk.key, columna_fecha))
+        consulta = select(*incluidas)
+        for nombre in sorted(iguales):
+            consulta = consulta.where(tabla.c[nombre] == bindparam(f"igual_{nombre}"))
+        if tipo_cursor == "sin_fecha":
+            # Las filas sin fecha van al final en orden descendente (MySQL y SQLite)
+            consulta = consulta.where(fecha.is_(None), pk < bindparam("cursor_id"))
+        elif tipo_cursor == "fecha":
+            consulta = consulta.where(or_(
+                fecha < bindparam("cursor_fecha"),
+                and_(fecha == bindparam("cursor_fecha"), pk < bindparam("cursor_id")),
+                fecha.is_(None),
+            ))
+        consulta = consulta.order_by(fecha.desc(), pk.desc()).limit(bindparam("limite"))
+        if tipo_cursor is None:
+            consulta = consulta.offset(bindparam("salto"))
+        return consulta
+
+    clave = ("pagina", tabla.name, columnas, tuple(sorted(iguales)), tipo_cursor, columna_fecha)
+    return (await db.execute(sentencia(clave, construir), parametros)).all()
@@ -0,0 +1,224 @@
+# db/pool.py
+"""
+Configuración del pool de conexiones y métricas en vivo del pool.
+
+El tamaño del pool se elige con un perfil (DB_POOL_PROFILE) y cada valor
+se puede sobreescribir con su variable DB_POOL_* en el .env.
+Recuerda que cada worker de uvicorn tiene su propio pool: el total de
+conexiones abiertas es workers * (pool_size + max_overflow) y debe quedar
+por debajo de max_connections de MySQL.
+"""
+import bisect
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Perfiles predefinidos. pre_ping puede ser:
+#   "siempre"     -> SELECT 1 en cada checkout (pool_pre_ping=True)
+#   "inactividad" -> SELECT 1 solo si la conexión estuvo inactiva más de pre_ping_inactividad segundos
+#   "nunca"       -> sin ping; se confía en pool_recycle
+PERFILES_POOL = {
+    "desarrollo": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_recycle": 1800,
+        "pool_timeout": 30,
+        "pre_ping": "siempre",
+        "pre_ping_inactividad": 0,
+    },
+    "produccion": {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_recycle": 280,
+        "pool_timeout": 10,
+        "pre_ping": "inactividad",
+        "pre_ping_inactividad": 60,
+    },
+    "pruebas": {
+        "pool_size": 2,
+        "max_overflow": 0,
+        "pool_recycle": -1,
+        "pool_timeout": 5,
+        "pre_ping": "nunca",
+        "pre_ping_inactividad": 0,
+    },
+}
+
+ESTRATEGIAS_PRE_PING = ("siempre", "inactividad", "nunca")
+
+# Límites (en milisegundos) del histograma de espera en el checkout
+BUCKETS_ESPERA_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def configuracion_pool() -> dict:
+    """Lee el perfil del pool y aplica las variables DB_POOL_* encima"""
+    perfil = os.getenv("DB_POOL_PROFILE", "desarrollo")
+    if perfil not in PERFILES_POOL:
+        raise ValueError(f"Perfil de pool desconocido: {perfil}. Opciones: {', '.join(PERFILES_POOL)}")
+
+    config = dict(PERFILES_POOL[perfil], perfil=perfil)
+    enteros = {
+        "pool_size": "DB_POOL_SIZE",
+        "max_overflow": "DB_POOL_MAX_OVERFLOW",
+        "pool_recycle": "DB_POOL_RECYCLE",
+        "pool_timeout": "DB_POOL_TIMEOUT",
+        "pre_ping_inactividad": "DB_POOL_PRE_PING_INACTIVIDAD",
+    }
+    for clave, variable in enteros.items():
+        valor = os.getenv(variable)
+        if valor:
+            config[clave] = int(valor)
+
+    pre_ping = os.getenv("DB_POOL_PRE_PING")
+    if pre_ping:
+        config["pre_ping"] = pre_ping
+    if config["pre_ping"] not in ESTRATEGIAS_PRE_PING:
+        raise ValueError(f"DB_POOL_PRE_PING inválido: {config['pre_ping']}. Opciones: {', '.join(ESTRATEGIAS_PRE_PING)}")
+
+    return config
+
+
+class MetricasPool:
+    """Contadores del pool: espera en el checkout, fallos y desconexiones"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.fallos_checkout = 0
+        self.desconexiones = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.histograma = [0] * (len(BUCKETS_ESPERA_MS) + 1)
+
+    def registrar_espera(self, segundos: float):
+        ms = segundos * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+            self.histograma[bisect.bisect_left(BUCKETS_ESPERA_MS, ms)] += 1
+
+    def registrar_fallo(self):
+        with self._lock:
+            self.fallos_checkout += 1
+
+    def registrar_desconexion(self):
+        with self._lock:
+            self.desconexiones += 1
+
+    def resumen(self) -> dict:
+        with self._lock:
+            etiquetas = [f"<={b}ms" for b in BUCKETS_ESPERA_MS] + [f">{BUCKETS_ESPERA_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "fallos_checkout": self.fallos_checkout,
+                "desconexiones": self.desconexiones,
+                "espera_promedio_ms": round(self.espera_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima * 1000, 3),
+                "histograma_espera": dict(zip(etiquetas, self.histograma)),
+            }
+
+
+class _MedicionCheckout:
+    """Mixin que mide cuánto espera cada checkout y cuenta los que fallan"""
+
+    def __init__(self, *args, metricas: MetricasPool | None = None, **kw):
+        super().__init__(*args, **kw)
+        self.metricas = metricas or MetricasPool()
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except Exception:
+            # Timeout esperando conexión libre o error al abrir una nueva
+            self.metricas.registrar_fallo()
+            raise
+        self.metricas.registrar_espera(time.perf_counter() - inicio)
+        return conexion
+
+    def recreate(self):
+        # dispose()/invalidaciones recrean el pool: conservamos las métricas acumuladas
+        nuevo = super().recreate()
+        nuevo.metricas = self.metricas
+        return nuevo
+
+
+class PoolMedido(_MedicionCheckout, QueuePool):
+    pass
+
+
+class PoolMedidoAsync(_MedicionCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def argumentos_engine(url: str, config: dict, poolclass=PoolMedido) -> dict:
+    """Argumentos de create_engine para la URL y la configuración dadas"""
+    if url.startswith("sqlite"):
+        # SQLite (pruebas locales) usa su propio pool; solo permitimos varios hilos
+        return {"connect_args": {"check_same_thread": False}}
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": config["pool_size"],
+        "max_overflow": config["max_overflow"],
+        "pool_recycle": config["pool_recycle"],
+        "pool_timeout": config["pool_timeout"],
+        "pool_pre_ping": config["pre_ping"] == "siempre",
+    }
+
+
+def instalar_pre_ping_inactividad(engine, config: dict):
+    """
+    Estrategia "inactividad": solo se hace ping a conexiones que llevan más de
+    pre_ping_inactividad segundos en el pool, en vez de un round-trip por checkout.
+    """
+    if config["pre_ping"] != "inactividad":
+        return
+
+    umbral = config["pre_ping_inactividad"]
+
+    @event.listens_for(engine, "checkin")
+    def _marcar_checkin(dbapi_connection, connection_record):
+        connection_record.info["ultimo_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_si_inactiva(dbapi_connection, connection_record, connection_proxy):
+        ultimo = connection_record.info.get("ultimo_checkin")
+        if ultimo is None or time.monotonic() - ultimo < umbral:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception:
+            metricas = getattr(engine.pool, "metricas", None)
+            if metricas:
+                metricas.registrar_desconexion()
+            # El pool descarta esta conexión y reintenta con una nueva
+            raise exc.DisconnectionError()
+        finally:
+            cursor.close()
+
+
+def estadisticas_pool(engine) -> dict:
+    """Estado actual del pool del engine (por proceso/worker)"""
+    pool = engine.pool
+    datos = {
+        "pid": os.getpid(),
+        "pool": type(pool).__name__,
+    }
+    if isinstance(pool, QueuePool):
+        datos.update({
+            "tamano": pool.size(),
+            "en_uso": pool.checkedout(),
+            "disponibles": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "timeout": pool.timeout(),
+        })
+    metricas = getattr(pool, "metricas", None)
+    if metricas is not None:
+        datos.update(metricas.resumen())
+    return datos
@@ -1,12 +1,136 @@
-from sqlalchemy.orm import sessionmaker
-from db.database import engine, Base
+import hashlib
+import random
+import threading
+import time
+from fastapi import Request
+from sqlalchemy import Select, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from security.ip_cliente import ip_cliente
+from db.database import (
+    engine, async_engine, replica_engines, async_replica_engines, REPLICA_STICKY_SEGUNDOS
+)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Peticiones que no modifican datos: las únicas que pueden leer de una réplica
+METODOS_LECTURA = ("GET", "HEAD", "OPTIONS")
+
+
+class RegistroEscrituras:
+    """
+    Recuerda qué clientes escribieron hace poco para que sus lecturas sigan
+    yendo al primario durante `ventana` segundos (read-your-writes).
+    El registro es por proceso: con varios workers la ventana debe cubrir el lag de la réplica.
+    """
+
+    def __init__(self, ventana: float):
+        self.ventana = ventana
+        self._ultimas = {}
+        self._lock = threading.Lock()
+
+    def marcar(self, clave: str):
+        if not clave:
+            return
+        ahora = time.monotonic()
+        with self._lock:
+            self._ultimas[clave] = ahora
+            # Limpieza perezosa para que el dict no crezca sin límite
+            if len(self._ultimas) > 10000:
+                self._ultimas = {k: t for k, t in self._ultimas.items() if ahora - t < self.ventana}
+
+    def reciente(self, clave: str) -> bool:
+        if not clave:
+            return False
+        with self._lock:
+            ultima = self._ultimas.get(clave)
+        return ultima is not None and time.monotonic() - ultima < self.ventana
+
+
+class RoutingSession(Session):
+    """
+    Session que manda los SELECT a una réplica y todo lo demás (flush, UPDATE,
+    DELETE, SELECT ... FOR UPDATE) al primario. Una vez que la sesión escribe,
+    o si el cliente escribió hace poco, todas sus lecturas van al primario.
+    """
+
+    def __init__(self, *args, primario=None, replicas=(), registro: RegistroEscrituras = None, **kw):
+        super().__init__(*args, **kw)
+        self.primario = primario
+        self.replicas = list(replicas)
+        self.registro = registro
+        self.info.setdefault("usar_primario", False)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.replicas or self.info.get("usar_primario") or self._flushing:
+            return self.primario
+        if isinstance(clause, Select) and clause._for_update_arg is None:
+            return random.choice(self.replicas)
+        return self.primario
+
+    def fijar_cliente(self, clave: str):
+        """Asocia la sesión a un cliente; si escribió hace poco, lee del primario"""
+        self.info["clave_cliente"] = clave
+        if self.registro is not None and self.registro.reciente(clave):
+            self.info["usar_primario"] = True
+
+    def fijar_peticion(self, request: Request):
+        """
+        Como fijar_cliente, y además las peticiones que modifican datos usan el primario
+        desde la primera lectura: los permisos, el estado anterior y los read-modify-write
+        no pueden decidirse con datos atrasados de la réplica.
+        """
+        self.fijar_cliente(clave_cliente(request))
+        if request.method not in METODOS_LECTURA:
+            self.info["usar_primario"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _marcar_escritura(session, flush_context):
+    # A partir de aquí las lecturas de esta sesión deben ver lo que se acaba de escribir
+    session.info["usar_primario"] = True
+    session.info["escribio"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _registrar_escritura(session):
+    if session.info.pop("escribio", False) and session.registro is not None:
+        session.registro.marcar(session.info.get("clave_cliente"))
+
+
+def clave_cliente(request: Request) -> str:
+    """Identifica al cliente por su token (si lo envía) o por su IP"""
+    autorizacion = request.headers.get("authorization")
+    if autorizacion:
+        return "token:" + hashlib.sha256(autorizacion.encode()).hexdigest()[:32]
+    return "ip:" + ip_cliente(request)
+
+
+registro_escrituras = RegistroEscrituras(REPLICA_STICKY_SEGUNDOS)
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine,
+    primario=engine, replicas=replica_engines, registro=registro_escrituras
+)
+
+# expire_on_commit=False: con AsyncSession no se puede hacer lazy load al serializar la respuesta
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False,
+    sync_session_class=RoutingSession,
+    primario=async_engine.sync_engine,
+    replicas=[e.sync_engine for e in async_replica_engines],
+    registro=registro_escrituras
+)
 
 # Este es get_db
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    db.fijar_peticion(request)
     try:
         yield db
     finally:
         db.close()
+
+# Versión async de get_db para las rutas async def
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        db.sync_session.fijar_peticion(request)
+        yield db
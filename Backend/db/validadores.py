@@ -0,0 +1,172 @@
+# db/validadores.py
+"""
+Validadores HTTP (ETag / Last-Modified) para las lecturas de noticias y comentarios.
+
+Cada colección tiene un contador en la tabla validador_cache: "noticias"
+(cualquier noticia o imagen), "noticia:<id>", "comentarios:<id_noticia>",
+"usuarios" (nombre, correo o foto de un autor) y "categorias". Un evento de
+Session lo incrementa en el mismo flush que la escritura, así que todo
+cambio hecho por el ORM (actualizar_noticia, crear_comentario,
+eliminar_comentario, imágenes, etc.) cambia el ETag sin tocar las rutas.
+
+Las rutas GET leen sus contadores con una consulta por clave primaria; si
+el cliente manda If-None-Match (o If-Modified-Since) con el valor actual se
+responde 304 sin consultar ni serializar nada más. Los cambios hechos por
+fuera del ORM (SQL a mano, query().update()) no mueven los contadores.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from itertools import chain
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from sqlalchemy import event, inspect, select, update, insert
+from sqlalchemy.orm import Session
+
+from models.categoria import Categoria
+from models.comentario import Comentario
+from models.imagen import Imagen
+from models.noticia import Noticia
+from models.usuario import Usuario
+from models.validador_cache import ValidadorCache
+
+load_dotenv()
+
+# Cache-Control por ruta. "no-cache" permite guardar la respuesta pero obliga a revalidar
+# (con el ETag) en cada uso; con max-age=N el navegador la reutiliza N segundos sin preguntar.
+POLITICAS_CACHE = {
+    "noticias": os.getenv("CACHE_CONTROL_NOTICIAS", "public, no-cache"),
+    "noticia": os.getenv("CACHE_CONTROL_NOTICIA", "public, no-cache"),
+    "comentarios": os.getenv("CACHE_CONTROL_COMENTARIOS", "public, no-cache"),
+}
+
+COLUMNAS_AUTOR = ("nombre_usuario", "apellido_usuario", "correo_usuario", "foto_usuario")
+
+
+def _claves_de(objeto, borrado: bool = False) -> set:
+    if isinstance(objeto, Noticia):
+        return {"noticias", f"noticia:{objeto.id_noticia}"}
+    if isinstance(objeto, Imagen):
+        return {"noticias", f"noticia:{objeto.noticia_id}"}
+    if isinstance(objeto, Comentario):
+        return {f"comentarios:{objeto.noticia_id}"}
+    if isinstance(objeto, Categoria):
+        return {"categorias"}
+    if isinstance(objeto, Usuario):
+        # Las rutas solo muestran estos datos del autor; login, bloqueos, etc. no invalidan nada
+        estado = inspect(objeto)
+        if borrado or any(estado.attrs[c].history.has_changes() for c in COLUMNAS_AUTOR):
+            return {"usuarios"}
+    return set()
+
+
+def incrementar(conexion, claves):
+    """Suma 1 a la versión de cada clave (la crea si no existe) con un solo upsert"""
+    tabla = ValidadorCache.__table__
+    ahora = datetime.utcnow().replace(microsecond=0)  # Last-Modified tiene resolución de segundos
+    # Orden fijo: dos transacciones que tocan las mismas claves las bloquean en el mismo orden
+    filas = [{"clave": clave, "version": 1, "modificado": ahora} for clave in sorted(claves)]
+    dialecto = conexion.dialect.name
+    if dialecto == "mysql":
+        from sqlalchemy.dialects.mysql import insert as insert_mysql
+        sentencia = insert_mysql(tabla).values(filas)
+        sentencia = sentencia.on_duplicate_key_update(version=tabla.c.version + 1, modificado=sentencia.inserted.modificado)
+    elif dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+        sentencia = insert_sqlite(tabla).values(filas)
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=["clave"], set_={"version": tabla.c.version + 1, "modificado": sentencia.excluded.modificado}
+        )
+    else:
+        for fila in filas:
+            resultado = conexion.execute(
+                update(tabla).where(tabla.c.clave == fila["clave"]).values(version=tabla.c.version + 1, modificado=ahora)
+            )
+            if not resultado.rowcount:
+                conexion.execute(insert(tabla).values(fila))
+        return
+    conexion.execute(sentencia)
+
+
+@event.listens_for(Session, "after_flush")
+def _incrementar_validadores(session, flush_context):
+    modificados = (o for o in session.dirty if session.is_modified(o))
+    claves = set()
+    for objeto in chain(session.new, modificados):
+        claves |= _claves_de(objeto)
+    for objeto in session.deleted:
+        claves |= _claves_de(objeto, borrado=True)
+    if claves:
+        incrementar(session.connection(), claves)
+        # Para quien necesite reaccionar al commit (services/cache_respuestas.py)
+        session.info.setdefault("validadores_modificados", set()).update(claves)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_validadores(session):
+    session.info.pop("validadores_modificados", None)
+
+
+async def leer_validadores(db, claves: list) -> tuple[str, datetime | None]:
+    """(versiones concatenadas, última modificación) de las claves; las que no existen cuentan como 0"""
+    filas = (await db.execute(
+        select(ValidadorCache.clave, ValidadorCache.version, ValidadorCache.modificado)
+        .where(ValidadorCache.clave.in_(claves))
+    )).all()
+    por_clave = {clave: (version, modificado) for clave, version, modificado in filas}
+    versiones = ".".join(str(por_clave.get(clave, (0, None))[0]) for clave in claves)
+    fechas = [modificado for _, modificado in por_clave.values()]
+    return versiones, max(fechas) if fechas else None
+
+
+def calcular_etag(versiones: str, consulta: str) -> str:
+    # La consulta (página, filtros, cursor) también define el contenido
+    return f'"{versiones}-{hashlib.sha1(consulta.encode()).hexdigest()[:8]}"'
+
+
+def _coincide_etag(if_none_match: str, etag: str) -> bool:
+    # Comparación débil (RFC 9110): W/"x" coincide con "x"
+    if if_none_match.strip() == "*":
+        return True
+    etiquetas = (e.strip().removeprefix("W/") for e in if_none_match.split(","))
+    return etag in etiquetas
+
+
+def _no_modificado_desde(if_modified_since: str, ultima: datetime | None) -> bool:
+    if ultima is None:
+        return False
+    try:
+        fecha = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return ultima <= fecha
+
+
+async def responder_si_no_cambio(request: Request, response: Response, db, claves: list, politica: str) -> Response | None:
+    """
+    Pone ETag, Last-Modified y Cache-Control en la respuesta. Devuelve una
+    respuesta 304 si el cliente ya tiene la versión actual, o None para que
+    la ruta siga y arme el cuerpo.
+    """
+    versiones, ultima = await leer_validadores(db, claves)
+    etag = calcular_etag(versiones, request.url.query)
+
+    cabeceras = {"ETag": etag, "Cache-Control": POLITICAS_CACHE[politica]}
+    if ultima is not None:
+        cabeceras["Last-Modified"] = format_datetime(ultima.replace(tzinfo=timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        no_cambio = _coincide_etag(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        no_cambio = if_modified_since is not None and _no_modificado_desde(if_modified_since, ultima)
+
+    if no_cambio:
+        return Response(status_code=304, headers=cabeceras)
+    response.headers.update(cabeceras)
+    return None
@@ -5,4 +5,8 @@ from datetime import datetime
 class CategoriaDTO(BaseModel):
     nombre: str
     fecha_creacion: Optional[datetime] = None
-    estado: Optional[bool] = True
\ No newline at end of file
+    estado: Optional[bool] = True
+
+class CategoriaShort(BaseModel):
+    id: int
+    nombre: Optional[str] = None
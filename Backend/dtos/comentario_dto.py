@@ -8,6 +8,17 @@ class UsuarioShort(BaseModel):
     correo: Optional[str] = None
     foto: Optional[str] = None
 
+def usuario_short(usuario, usuario_id: int = None) -> dict:
+    # usuario may be missing (deleted user); guard against None
+    if usuario is None:
+        return {'id': usuario_id, 'nombre': None, 'correo': None, 'foto': None}
+    return {
+        'id': getattr(usuario, 'id_usuario', None),
+        'nombre': f"{getattr(usuario, 'nombre_usuario', '')} {getattr(usuario, 'apellido_usuario', '')}".strip(),
+        'correo': getattr(usuario, 'correo_usuario', None),
+        'foto': getattr(usuario, 'foto_usuario', None)
+    }
+
 class ComentarioBase(BaseModel):
     contenido: str
     noticia_id: int
@@ -1,6 +1,23 @@
 from datetime import date
 from pydantic import BaseModel
 from typing import Optional, List
+from dtos.categoria_dto import CategoriaShort
+
+class AutorPublico(BaseModel):
+    # Las noticias se leen sin login: del escritor/revisor solo lo que se muestra, nunca el correo
+    id: int
+    nombre: Optional[str] = None
+    foto: Optional[str] = None
+
+def autor_publico(usuario, usuario_id: int = None) -> dict:
+    # usuario may be missing (deleted user); guard against None
+    if usuario is None:
+        return {'id': usuario_id, 'nombre': None, 'foto': None}
+    return {
+        'id': getattr(usuario, 'id_usuario', None),
+        'nombre': f"{getattr(usuario, 'nombre_usuario', '')} {getattr(usuario, 'apellido_usuario', '')}".strip(),
+        'foto': getattr(usuario, 'foto_usuario', None)
+    }
 
 class NoticiaBase(BaseModel):
     titulo: str
@@ -30,4 +47,10 @@ class NoticiaResponse(NoticiaBase):
 
     class Config:
         # Pydantic v2 renamed 'orm_mode' to 'from_attributes'
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class NoticiaExpandidaResponse(NoticiaResponse):
+    # Escritor, revisor y categoría resueltos en el servidor (una consulta IN por tipo)
+    escritor: Optional[AutorPublico] = None
+    revisor: Optional[AutorPublico] = None
+    categoria: Optional[CategoriaShort] = None
@@ -21,3 +21,10 @@ class NotificacionResponse(NotificacionBase):
 
     class Config:
         from_attributes = True
+
+class NotificacionExpandidaResponse(NotificacionResponse):
+    noticia_titulo: Optional[str] = None
+
+class PreferenciaCorreo(BaseModel):
+    # True: un correo por borrador apenas se guarda; False: resumen cada RESUMEN_BORRADORES_MINUTOS
+    inmediato: bool
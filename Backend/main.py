@@ -1,16 +1,41 @@
 # main.py
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from db import Base, engine
+from db.instrumentacion import MiddlewareTiempoSQL
+from utils.compresion import MiddlewareCompresion, COMPRESION_ACTIVA
+from utils.subidas import StaticSubidas
+from services.cola_correos import trabajador_correos, CORREOS_WORKER_ACTIVO
+from security.tokens_recuperacion import barrido_tokens, RECUPERACION_BARRIDO_ACTIVO
 from routes.usuarios_controller import router as auth_router, router_compat as usuarios_compat_router
 
-# Crear las tablas en la base de datos
-Base.metadata.create_all(bind=engine)
+# Logs estructurados de la app (una línea JSON por petición en el logger sn52.sql)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+logging.getLogger("sn52").addHandler(_log_handler)
+logging.getLogger("sn52").setLevel(logging.INFO)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Trabajador que envía la cola de correos (services/cola_correos.py)
+    if CORREOS_WORKER_ACTIVO:
+        trabajador_correos.iniciar()
+    # Borra por lotes los tokens de recuperación vencidos (security/tokens_recuperacion.py)
+    if RECUPERACION_BARRIDO_ACTIVO:
+        barrido_tokens.iniciar()
+    yield
+    await trabajador_correos.detener()
+    await barrido_tokens.detener()
+
 
-# Inicializar la app FastAPI
-app = FastAPI(title="SN-52 Backend")
+# Inicializar la app FastAPI. Las respuestas JSON se codifican con orjson; los listados
+# grandes ya llegan serializados desde utils/serializacion.py
+app = FastAPI(title="SN-52 Backend", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Configurar CORS para permitir peticiones desde el frontend
 app.add_middleware(
@@ -19,10 +44,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # cursor de la siguiente página; validador de caché
 )
 
-# Montar carpeta para archivos estáticos (por ejemplo, imágenes o adjuntos)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Server-Timing con número de consultas y tiempo en base de datos por petición
+app.add_middleware(MiddlewareTiempoSQL)
+
+# gzip/brotli según Accept-Encoding para las respuestas de texto grandes (utils/compresion.py)
+if COMPRESION_ACTIVA:
+    app.add_middleware(MiddlewareCompresion)
+
+# Montar carpeta para archivos estáticos (por ejemplo, imágenes o adjuntos): variantes .br/.gz, nombres por
+# contenido con Cache-Control immutable y Range (utils/subidas.py)
+app.mount("/uploads", StaticSubidas(directory="uploads"), name="uploads")
 
 # Configurar carpeta de plantillas HTML
 templates = Jinja2Templates(directory="templates")
@@ -38,6 +72,7 @@ from routes.imagenes_controller import router as imagenes_router
 from routes.notificaciones_controller import router as notificaciones_router
 from routes.categoria_controller import router as categorias_router
 from routes.roles_controller import router as roles_router
+from routes.metricas_controller import router as metricas_router
 
 app.include_router(noticias_router)
 app.include_router(comentarios_router)
@@ -45,6 +80,10 @@ app.include_router(imagenes_router)
 app.include_router(notificaciones_router)
 app.include_router(categorias_router)
 app.include_router(roles_router)
+app.include_router(metricas_router)
+
+# Crear las tablas en la base de datos (después de importar las rutas: así ya están todos los modelos)
+Base.metadata.create_all(bind=engine)
 
 # Ruta raíz de prueba
 @app.get("/")
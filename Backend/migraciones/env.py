@@ -14,6 +14,10 @@ from models.rol import Rol
 from models.categoria import Categoria
 from models.noticia import Noticia
 from models.imagen import Imagen
+from models.correo_pendiente import CorreoPendiente
+from models.token_revocado import TokenRevocado
+from models.token_recuperacion import TokenRecuperacion
+from models.validador_cache import ValidadorCache
 
 # Configuración de Alembic
 config = context.config
@@ -0,0 +1,35 @@
+"""revocado_desde con microsegundos
+
+Revision ID: 4d7e2b91c0a6
+Revises: 7f41c2d9e8a3
+Create Date: 2026-10-18 10:12:41.207334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d7e2b91c0a6'
+down_revision: Union[str, None] = '7f41c2d9e8a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('token_revocado', 'revocado_desde',
+                    existing_type=sa.DateTime(),
+                    type_=sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql'),
+                    existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('token_revocado', 'revocado_desde',
+                    existing_type=sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql'),
+                    type_=sa.DateTime(),
+                    existing_nullable=False)
@@ -0,0 +1,71 @@
+"""token_recuperacion
+
+Revision ID: 5c3e9a17f0b2
+Revises: ab1ac50737ad
+Create Date: 2026-10-17 18:05:31.204117
+
+"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c3e9a17f0b2'
+down_revision: Union[str, None] = 'ab1ac50737ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    token_recuperacion = op.create_table(
+        'token_recuperacion',
+        sa.Column('id_token', sa.Integer(), nullable=False),
+        sa.Column('token_hash', sa.String(length=64), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('expira', sa.DateTime(), nullable=False),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuario.id_usuario'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id_token')
+    )
+    op.create_index(op.f('ix_token_recuperacion_token_hash'), 'token_recuperacion', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_token_recuperacion_usuario_id'), 'token_recuperacion', ['usuario_id'], unique=False)
+    op.create_index(op.f('ix_token_recuperacion_expira'), 'token_recuperacion', ['expira'], unique=False)
+
+    # Los enlaces ya enviados siguen funcionando: se copian hasheados. La expiración nunca
+    # se guardó (el código escribía reset_token_expira), así que se les da una hora desde ahora.
+    conexion = op.get_bind()
+    pendientes = conexion.execute(sa.text(
+        "SELECT id_usuario, reset_token FROM usuario WHERE reset_token IS NOT NULL"
+    )).fetchall()
+    ahora = datetime.utcnow()
+    if pendientes:
+        op.bulk_insert(token_recuperacion, [
+            {
+                'token_hash': hashlib.sha256(token.encode()).hexdigest(),
+                'usuario_id': id_usuario,
+                'expira': ahora + timedelta(hours=1),
+                'fecha_creacion': ahora,
+            }
+            for id_usuario, token in pendientes
+        ])
+
+    op.drop_index('ix_usuario_reset_token', table_name='usuario')
+    op.drop_column('usuario', 'reset_token')
+    op.drop_column('usuario', 'reset_token_expiration')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Los tokens solo existen hasheados: los pendientes se pierden al bajar
+    op.add_column('usuario', sa.Column('reset_token_expiration', sa.DateTime(), nullable=True))
+    op.add_column('usuario', sa.Column('reset_token', sa.String(length=255), nullable=True))
+    op.create_index('ix_usuario_reset_token', 'usuario', ['reset_token'], unique=False)
+    op.drop_index(op.f('ix_token_recuperacion_expira'), table_name='token_recuperacion')
+    op.drop_index(op.f('ix_token_recuperacion_usuario_id'), table_name='token_recuperacion')
+    op.drop_index(op.f('ix_token_recuperacion_token_hash'), table_name='token_recuperacion')
+    op.drop_table('token_recuperacion')
@@ -0,0 +1,34 @@
+"""validador_cache
+
+Revision ID: 7f41c2d9e8a3
+Revises: 5c3e9a17f0b2
+Create Date: 2026-10-17 19:22:10.481932
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f41c2d9e8a3'
+down_revision: Union[str, None] = '5c3e9a17f0b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'validador_cache',
+        sa.Column('clave', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('modificado', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('clave')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('validador_cache')
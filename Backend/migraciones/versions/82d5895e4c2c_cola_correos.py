@@ -0,0 +1,42 @@
+"""cola_correos
+
+Revision ID: 82d5895e4c2c
+Revises: b1bcd52042c3
+Create Date: 2026-10-17 11:26:05.331870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '82d5895e4c2c'
+down_revision: Union[str, None] = 'b1bcd52042c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'correo_pendiente',
+        sa.Column('id_correo', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=30), nullable=False),
+        sa.Column('datos', sa.Text(), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('intentos', sa.Integer(), nullable=False),
+        sa.Column('proximo_intento', sa.DateTime(), nullable=False),
+        sa.Column('ultimo_error', sa.String(length=500), nullable=True),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+        sa.Column('fecha_envio', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id_correo')
+    )
+    op.create_index('ix_correo_pendiente_estado_proximo', 'correo_pendiente', ['estado', 'proximo_intento'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_correo_pendiente_estado_proximo', table_name='correo_pendiente')
+    op.drop_table('correo_pendiente')
@@ -0,0 +1,35 @@
+"""token_revocado
+
+Revision ID: ab1ac50737ad
+Revises: d562239e76dc
+Create Date: 2026-10-17 16:44:09.582617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ab1ac50737ad'
+down_revision: Union[str, None] = 'd562239e76dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'token_revocado',
+        sa.Column('id_usuario', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('revocado_desde', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id_usuario')
+    )
+    op.create_index(op.f('ix_token_revocado_revocado_desde'), 'token_revocado', ['revocado_desde'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_token_revocado_revocado_desde'), table_name='token_revocado')
+    op.drop_table('token_revocado')
@@ -0,0 +1,41 @@
+"""backfill_imagen_principal
+
+Revision ID: b1bcd52042c3
+Revises: e28cd4dca3ec
+Create Date: 2026-10-17 10:03:27.904116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1bcd52042c3'
+down_revision: Union[str, None] = 'e28cd4dca3ec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Noticia.imagen pasa a mantenerse desde imagenes_controller: rellenamos las noticias
+    # existentes sin imagen con su primera Imagen, igual que hacía GET /api/noticias fila por fila
+    op.execute(sa.text("""
+        UPDATE noticias
+        SET imagen = (
+            SELECT imagen.url FROM imagen
+            WHERE imagen.noticia_id = noticias.id_noticia
+            ORDER BY imagen.id_imagen ASC
+            LIMIT 1
+        )
+        WHERE (imagen IS NULL OR imagen = '')
+          AND EXISTS (SELECT 1 FROM imagen WHERE imagen.noticia_id = noticias.id_noticia)
+    """))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Solo es un relleno de datos: no hay nada que deshacer en el esquema
+    pass
@@ -0,0 +1,29 @@
+"""correo_inmediato_editores
+
+Revision ID: d562239e76dc
+Revises: 82d5895e4c2c
+Create Date: 2026-10-17 13:02:47.190331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd562239e76dc'
+down_revision: Union[str, None] = '82d5895e4c2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Por defecto los editores reciben el resumen periódico de borradores
+    op.add_column('usuario', sa.Column('correo_inmediato', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('usuario', 'correo_inmediato')
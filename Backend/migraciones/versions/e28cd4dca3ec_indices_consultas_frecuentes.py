@@ -0,0 +1,47 @@
+"""indices_consultas_frecuentes
+
+Revision ID: e28cd4dca3ec
+Revises: 373a23585657
+Create Date: 2026-10-17 09:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e28cd4dca3ec'
+down_revision: Union[str, None] = '373a23585657'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nombre, tabla, columnas) -- deben coincidir con los Index declarados en models/
+# y con la forma de las consultas de routes/ (tests/db/test_indices_explain.py lo verifica)
+INDICES = [
+    ('ix_noticias_categoria_estado_fecha', 'noticias', ['categoria_id', 'estado', 'fecha_creacion', 'id_noticia']),
+    ('ix_noticias_estado_fecha', 'noticias', ['estado', 'fecha_creacion', 'id_noticia']),
+    ('ix_comentario_noticia_estado_fecha', 'comentario', ['noticia_id', 'estado', 'fecha_creacion']),
+    ('ix_notificaciones_usuario_fecha', 'notificaciones', ['usuario_id', 'fecha_creacion']),
+    ('ix_imagen_noticia_id', 'imagen', ['noticia_id', 'id_imagen']),
+    ('ix_usuario_reset_token', 'usuario', ['reset_token']),
+    ('ix_usuario_rol_id', 'usuario', ['rol_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Comentario.estado se usa en los filtros (soft delete) pero no todas las bases lo tienen
+    columnas = [c['name'] for c in sa.inspect(op.get_bind()).get_columns('comentario')]
+    if 'estado' not in columnas:
+        op.add_column('comentario', sa.Column('estado', sa.Boolean(), nullable=True, server_default=sa.true()))
+
+    for nombre, tabla, columnas_indice in INDICES:
+        op.create_index(nombre, tabla, columnas_indice, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla)
@@ -1,19 +1,24 @@
 from db import Base
-from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 class Comentario(Base):
     __tablename__ = "comentario"
+    __table_args__ = (
+        # Comentarios activos de una noticia, más recientes primero
+        Index("ix_comentario_noticia_estado_fecha", "noticia_id", "estado", "fecha_creacion"),
+    )
     id_comentario = Column(Integer, primary_key=True)
     fecha_creacion = Column(Date)
     contenido = Column(String(200))
+    estado = Column(Boolean, default=True)  # False = eliminado (soft delete)
 
-    usuario = relationship("Usuario", back_populates="comentario")
+    usuario = relationship("Usuario", back_populates="comentarios")
     # Clave foránea
     noticia_id = Column(Integer,
                         ForeignKey("noticias.id_noticia"))
     # clave foránea
     usuario_id = Column(Integer,
-                        ForeignKey("usuarios.id_usuario"))
+                        ForeignKey("usuario.id_usuario"))
 
     noticia = relationship("Noticia", back_populates="comentarios")
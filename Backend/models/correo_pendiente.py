@@ -0,0 +1,20 @@
+from db import Base
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+
+class CorreoPendiente(Base):
+    """Cola (outbox) de correos: los handlers encolan y services/cola_correos.py los envía"""
+    __tablename__ = "correo_pendiente"
+    __table_args__ = (
+        # El trabajador busca los pendientes cuyo próximo intento ya venció
+        Index("ix_correo_pendiente_estado_proximo", "estado", "proximo_intento"),
+    )
+    id_correo = Column(Integer, primary_key=True)
+    tipo = Column(String(30), nullable=False)  # bienvenida, recuperacion, borrador
+    datos = Column(Text, nullable=False)  # JSON con los argumentos para armar el mensaje
+    estado = Column(String(20), nullable=False, default="pendiente")  # pendiente, enviando, enviado, fallido
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime, nullable=False, default=datetime.utcnow)
+    ultimo_error = Column(String(500), nullable=True)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_envio = Column(DateTime, nullable=True)
@@ -1,13 +1,17 @@
 from db import Base
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 class Imagen(Base):
     __tablename__ = "imagen"
+    __table_args__ = (
+        # Imágenes de una noticia en orden de subida (la primera es la principal)
+        Index("ix_imagen_noticia_id", "noticia_id", "id_imagen"),
+    )
     id_imagen = Column(Integer, primary_key=True)
     fecha_creacion = Column(Date)
     url = Column(String(200))
     tipo_archivo = Column(String(10))
     
     noticia_id = Column(Integer, ForeignKey("noticias.id_noticia"))  # clave foránea
-    noticia = relationship("Noticia", back_populates="imagen")
\ No newline at end of file
+    noticia = relationship("Noticia", back_populates="imagenes")
\ No newline at end of file
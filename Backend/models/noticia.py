@@ -1,9 +1,15 @@
 from db import Base
-from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 class Noticia(Base):
     __tablename__ = "noticias"
+    __table_args__ = (
+        # Listado filtrado por categoría y estado, ordenado por fecha
+        Index("ix_noticias_categoria_estado_fecha", "categoria_id", "estado", "fecha_creacion", "id_noticia"),
+        # Listado filtrado solo por estado (ej. publicadas)
+        Index("ix_noticias_estado_fecha", "estado", "fecha_creacion", "id_noticia"),
+    )
     id_noticia = Column(Integer,
                 primary_key=True)
     fecha_creacion = Column(Date)
@@ -15,9 +21,9 @@ class Noticia(Base):
     estado = Column(Integer)
 
     
-    categoria_id = Column(Integer, ForeignKey("categorias.id_categoria"))
-    usuario_revisor_id = Column(Integer, ForeignKey("usuarios.id_usuario"))
-    usuario_escritor_id = Column(Integer, ForeignKey("usuarios.id_usuario"))
+    categoria_id = Column(Integer, ForeignKey("categoria.id_categoria"))
+    usuario_revisor_id = Column(Integer, ForeignKey("usuario.id_usuario"))
+    usuario_escritor_id = Column(Integer, ForeignKey("usuario.id_usuario"))
 
     
     imagenes = relationship("Imagen", back_populates="noticia") #plural y coincide
@@ -1,10 +1,14 @@
 from db import Base
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 class Notificacion(Base):
     __tablename__ = "notificaciones"
+    __table_args__ = (
+        # Bandeja de notificaciones del usuario, más recientes primero
+        Index("ix_notificaciones_usuario_fecha", "usuario_id", "fecha_creacion"),
+    )
     id_notificacion = Column(Integer, primary_key=True)
     titulo = Column(String(100), nullable=False)
     mensaje = Column(String(500), nullable=False)
@@ -12,7 +16,7 @@ class Notificacion(Base):
     leida = Column(Boolean, default=False)
 
     # Relaciones
-    usuario_id = Column(Integer, ForeignKey("usuarios.id_usuario"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuario.id_usuario"), nullable=False)
     usuario = relationship("Usuario", back_populates="notificaciones")
 
     noticia_id = Column(Integer, ForeignKey("noticias.id_noticia"), nullable=True)
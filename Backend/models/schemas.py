@@ -0,0 +1,23 @@
+# models/schemas.py
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class UsuarioOut(BaseModel):
+    id: int
+    nombre: str
+    apellidos: str
+    correo: str
+    foto: Optional[str] = None
+    rol_id: int
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str
+    usuario: UsuarioOut
+
+
+class RecuperarPasswordRequest(BaseModel):
+    email: str
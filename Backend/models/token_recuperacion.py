@@ -0,0 +1,12 @@
+from db import Base
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+
+class TokenRecuperacion(Base):
+    """Token de recuperación de contraseña; se guarda solo el hash (security/tokens_recuperacion.py)"""
+    __tablename__ = "token_recuperacion"
+    id_token = Column(Integer, primary_key=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)  # sha256 en hex
+    usuario_id = Column(Integer, ForeignKey("usuario.id_usuario", ondelete="CASCADE"), nullable=False, index=True)
+    expira = Column(DateTime, nullable=False, index=True)  # el barrido borra por este índice
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
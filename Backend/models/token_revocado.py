@@ -0,0 +1,10 @@
+from db import Base
+from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy.dialects import mysql
+
+class TokenRevocado(Base):
+    """Los tokens del usuario emitidos antes de revocado_desde ya no valen (modo AUTH_MODO=sin_estado)"""
+    __tablename__ = "token_revocado"
+    id_usuario = Column(Integer, primary_key=True, autoincrement=False)
+    # DATETIME(6) en MySQL: se compara con el iat en microsegundos (security/revocacion.py)
+    revocado_desde = Column(DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"), nullable=False, index=True)
@@ -1,6 +1,6 @@
 # usuario.py
 from db import Base
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -14,17 +14,18 @@ class Usuario(Base):
     contrasena_usuario = Column(String(255), nullable=False)
     foto_usuario = Column(String(255), nullable=True)
 
-    rol_id = Column(Integer, ForeignKey("roles.id_rol"), nullable=False)
-    rol = relationship("Rol", back_populates="usuario")
+    rol_id = Column(Integer, ForeignKey("rol.id_rol"), nullable=False, index=True)
+    rol = relationship("Rol", back_populates="usuarios")
     comentarios = relationship("Comentario", back_populates="usuario")
 
-    reset_token = Column(String(255), nullable=True)
-    reset_token_expiration = Column(DateTime, nullable=True)
-
+    # Los tokens de recuperación de contraseña viven en token_recuperacion
 
     # Campos para límite de intentos de login
     intentos_fallidos = Column(Integer, default=0, nullable=False)
     bloqueado_hasta = Column(DateTime, nullable=True)
 
+    # Editores: True = un correo por cada borrador; False = resumen periódico (services/cola_correos.py)
+    correo_inmediato = Column(Boolean, default=False, nullable=False)
+
     # Relación con notificaciones
     notificaciones = relationship("Notificacion", back_populates="usuario")
@@ -0,0 +1,9 @@
+from db import Base
+from sqlalchemy import Column, Integer, String, DateTime
+
+class ValidadorCache(Base):
+    """Contador de cambios por colección para los ETag/Last-Modified de las lecturas (db/validadores.py)"""
+    __tablename__ = "validador_cache"
+    clave = Column(String(100), primary_key=True)  # noticias, noticia:<id>, comentarios:<id_noticia>...
+    version = Column(Integer, nullable=False, default=0)
+    modificado = Column(DateTime, nullable=False)
@@ -1,27 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
-from db.session import get_db
+from db.session import get_async_db
+from db.cargador import CargadorLote, get_cargador, get_cargador_lectura
+from db.lecturas import leer_pagina
+from db.instrumentacion import presupuesto_consultas
+from db.validadores import responder_si_no_cambio
 from models.comentario import Comentario
 from models.noticia import Noticia
-from dtos.comentario_dto import ComentarioCreate, ComentarioUpdate, ComentarioResponse
+from dtos.comentario_dto import ComentarioCreate, ComentarioUpdate, ComentarioResponse, usuario_short
 from security.auth import get_current_user
 from models.usuario import Usuario
+from utils.paginacion import recortar_pagina
+from utils.serializacion import Serializador
 
 router = APIRouter(
     prefix="/api/comentarios",
     tags=["comentarios"]
 )
 
+# En el listado, noticia_id ya está en la URL y estado siempre es True: el resumen los omite
+serializador_comentarios = Serializador(
+    ComentarioResponse,
+    resumen=("id_comentario", "contenido", "fecha_creacion", "usuario"),
+    dependencias={"usuario": "usuario_id"},
+)
+
+def comentario_a_respuesta(c: Comentario, usuario: Usuario = None) -> dict:
+    # Build response with nested usuario info (usuario comes from the CargadorLote: no lazy load per row)
+    return serializador_comentarios.fila(c, usuario=usuario_short(usuario, c.usuario_id))
+
+async def responder_comentarios(comentarios: list, cargador: CargadorLote, campos: tuple = serializador_comentarios.campos) -> list:
+    serializador = serializador_comentarios.parcial(campos)
+    if "usuario" not in campos:
+        return [serializador.fila(c) for c in comentarios]
+    # Todos los autores de la página en una sola consulta IN (...)
+    cargador.pedir(Usuario, *[c.usuario_id for c in comentarios])
+    await cargador.resolver()
+    return [serializador.fila(c, usuario=usuario_short(cargador.obtener(Usuario, c.usuario_id), c.usuario_id)) for c in comentarios]
+
 @router.post("/", response_model=ComentarioResponse)
 async def crear_comentario(
     comentario: ComentarioCreate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verificar que la noticia existe
-    noticia = db.query(Noticia).filter(Noticia.id_noticia == comentario.noticia_id).first()
+    noticia = await db.get(Noticia, comentario.noticia_id)
     if not noticia:
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
     
@@ -33,85 +59,58 @@ async def crear_comentario(
     )
 
     db.add(nuevo_comentario)
-    db.commit()
-    db.refresh(nuevo_comentario)
-
-    # Build response with nested usuario info
-    usuario_info = {
-        'id': current_user.id_usuario,
-        'nombre': f"{current_user.nombre_usuario} {current_user.apellido_usuario}".strip(),
-        'correo': current_user.correo_usuario,
-        'foto': current_user.foto_usuario
-    }
+    await db.commit()
+    await db.refresh(nuevo_comentario)
 
-    response = {
-        'id_comentario': nuevo_comentario.id_comentario,
-        'contenido': nuevo_comentario.contenido,
-        'fecha_creacion': nuevo_comentario.fecha_creacion,
-        'noticia_id': nuevo_comentario.noticia_id,
-        'usuario': usuario_info,
-        'estado': nuevo_comentario.estado
-    }
-    return response
+    return comentario_a_respuesta(nuevo_comentario, current_user)
 
 @router.get("/noticia/{noticia_id}", response_model=List[ComentarioResponse])
+@presupuesto_consultas(3)  # validadores + comentarios + autores
 async def obtener_comentarios_noticia(
     noticia_id: int,
-    skip: int = 0,
-    limit: int = 50,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str = None,
+    fields: str = None,  # campos separados por coma o "all"; sin él, el resumen
+    db: AsyncSession = Depends(get_async_db),
+    cargador: CargadorLote = Depends(get_cargador_lectura)
 ):
-    comentarios = db.query(Comentario)\
-        .filter(Comentario.noticia_id == noticia_id)\
-        .filter(Comentario.estado == True)\
-        .order_by(Comentario.fecha_creacion.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-
-    results = []
-    for c in comentarios:
-        # usuario relationship may be loaded; guard against None
-        usuario = None
-        if hasattr(c, 'usuario') and c.usuario:
-            usuario = {
-                'id': getattr(c.usuario, 'id_usuario', None),
-                'nombre': f"{getattr(c.usuario, 'nombre_usuario', '')} {getattr(c.usuario, 'apellido_usuario', '')}".strip(),
-                'correo': getattr(c.usuario, 'correo_usuario', None),
-                'foto': getattr(c.usuario, 'foto_usuario', None)
-            }
-        else:
-            usuario = {'id': c.usuario_id, 'nombre': None, 'correo': None, 'foto': None}
+    campos = serializador_comentarios.campos_pedidos(fields)
+    no_cambio = await responder_si_no_cambio(request, response, db, [f"comentarios:{noticia_id}", "usuarios"], "comentarios")
+    if no_cambio:
+        return no_cambio
 
-        results.append({
-            'id_comentario': c.id_comentario,
-            'contenido': c.contenido,
-            'fecha_creacion': c.fecha_creacion,
-            'noticia_id': c.noticia_id,
-            'usuario': usuario,
-            'estado': c.estado
-        })
+    # Solo las columnas pedidas, con una sentencia de Core ya compilada (db/lecturas.py)
+    filas = await leer_pagina(db, Comentario, serializador_comentarios.columnas(Comentario, campos),
+                              {"noticia_id": noticia_id, "estado": True}, cursor, skip, limit)
+    comentarios = recortar_pagina(filas, limit, response, 'fecha_creacion', 'id_comentario')
 
-    return results
+    # Se valida una sola vez y se devuelve ya serializado (con el ETag y el cursor de `response`)
+    return serializador_comentarios.parcial(campos).respuesta_lista(await responder_comentarios(comentarios, cargador, campos), response)
 
 @router.get("/{comentario_id}", response_model=ComentarioResponse)
+@presupuesto_consultas(2)  # comentario + autor
 async def obtener_comentario(
     comentario_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    cargador: CargadorLote = Depends(get_cargador)
 ):
-    comentario = db.query(Comentario).filter(Comentario.id_comentario == comentario_id).first()
+    comentario = await db.get(Comentario, comentario_id)
     if not comentario:
         raise HTTPException(status_code=404, detail="Comentario no encontrado")
-    return comentario
+    return (await responder_comentarios([comentario], cargador))[0]
 
 @router.put("/{comentario_id}", response_model=ComentarioResponse)
 async def actualizar_comentario(
     comentario_id: int,
     comentario_update: ComentarioUpdate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    cargador: CargadorLote = Depends(get_cargador)
 ):
-    db_comentario = db.query(Comentario).filter(Comentario.id_comentario == comentario_id).first()
+    db_comentario = await db.get(Comentario, comentario_id)
     if not db_comentario:
         raise HTTPException(status_code=404, detail="Comentario no encontrado")
     
@@ -122,17 +121,16 @@ async def actualizar_comentario(
     for key, value in comentario_update.dict(exclude_unset=True).items():
         setattr(db_comentario, key, value)
     
-    db.commit()
-    db.refresh(db_comentario)
-    return db_comentario
+    await db.commit()
+    return (await responder_comentarios([db_comentario], cargador))[0]
 
 @router.delete("/{comentario_id}")
 async def eliminar_comentario(
     comentario_id: int,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_comentario = db.query(Comentario).filter(Comentario.id_comentario == comentario_id).first()
+    db_comentario = await db.get(Comentario, comentario_id)
     if not db_comentario:
         raise HTTPException(status_code=404, detail="Comentario no encontrado")
     
@@ -142,23 +140,23 @@ async def eliminar_comentario(
     
     # Soft delete
     db_comentario.estado = False
-    db.commit()
+    await db.commit()
     return {"message": "Comentario eliminado correctamente"}
 
 @router.put("/{comentario_id}/restaurar", response_model=ComentarioResponse)
 async def restaurar_comentario(
     comentario_id: int,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    cargador: CargadorLote = Depends(get_cargador)
 ):
     if current_user.rol_id != 1:  # Solo administradores pueden restaurar comentarios
         raise HTTPException(status_code=403, detail="No tienes permisos para restaurar comentarios")
     
-    db_comentario = db.query(Comentario).filter(Comentario.id_comentario == comentario_id).first()
+    db_comentario = await db.get(Comentario, comentario_id)
     if not db_comentario:
         raise HTTPException(status_code=404, detail="Comentario no encontrado")
     
     db_comentario.estado = True
-    db.commit()
-    db.refresh(db_comentario)
-    return db_comentario
\ No newline at end of file
+    await db.commit()
+    return (await responder_comentarios([db_comentario], cargador))[0]
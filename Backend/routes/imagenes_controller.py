@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-import os
-import shutil
-from db.session import get_db
+from db.session import get_async_db
+from db.instrumentacion import presupuesto_consultas
 from models.imagen import Imagen
 from models.noticia import Noticia
 from dtos.imagen_dto import ImagenCreate, ImagenUpdate, ImagenResponse
 from datetime import date
 from security.auth import get_current_user
 from models.usuario import Usuario
+from services.imagen_service import recalcular_imagen_principal, actualizar_imagen_principal, borrar_subida_sin_uso
+from utils.subidas import guardar_subida, confirmar_subida, extension_segura
 
 router = APIRouter(
     prefix="/api/imagenes",
@@ -23,10 +26,10 @@ async def crear_imagen(
     noticia_id: int,
     file: UploadFile = File(...),
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verificar que la noticia existe
-    noticia = db.query(Noticia).filter(Noticia.id_noticia == noticia_id).first()
+    noticia = await db.get(Noticia, noticia_id)
     if not noticia:
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
     
@@ -36,52 +39,51 @@ async def crear_imagen(
     ):
         raise HTTPException(status_code=403, detail="No tienes permisos para agregar imágenes a esta noticia")
     
-    # Crear directorio si no existe
-    os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
-    
-    # Guardar archivo
-    file_extension = os.path.splitext(file.filename)[1]
-    file_name = f"noticia_{noticia_id}_{os.urandom(8).hex()}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIRECTORY, file_name)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # Crear registro en base de datos
-    # tipo_archivo: guardar sin el punto
-    tipo_archivo = file_extension.lstrip('.') if file_extension else None
-    nueva_imagen = Imagen(
-        url=file_path,
-        tipo_archivo=tipo_archivo,
-        noticia_id=noticia_id,
-        fecha_creacion=date.today()
-    )
+    # Guardar archivo con nombre por contenido (utils/subidas.py): la URL nunca cambia de contenido.
+    # Hash, escritura y precompresión son bloqueantes: fuera del event loop
+    subida = await run_in_threadpool(guardar_subida, file, UPLOAD_DIRECTORY)
+    try:
+        # Crear registro en base de datos
+        # tipo_archivo: guardar sin el punto
+        tipo_archivo = extension_segura(file.filename).lstrip('.') or None
+        nueva_imagen = Imagen(
+            url=subida.ruta,
+            tipo_archivo=tipo_archivo,
+            noticia_id=noticia_id,
+            fecha_creacion=date.today()
+        )
 
-    # Asociar imagen a la noticia (actualizar campo imagen en Noticia) para permitir
-    # que endpoints que retornan la noticia incluyan la ruta de la imagen principal.
-    noticia.imagen = file_path
+        db.add(nueva_imagen)
+        await db.flush()
 
-    db.add(nueva_imagen)
-    db.commit()
-    db.refresh(nueva_imagen)
+        # La principal sigue siendo la primera imagen: la nueva solo lo es si la noticia no tenía
+        await actualizar_imagen_principal(db, noticia)
+        await db.commit()
+    finally:
+        # Si un borrado concurrente se llevó el archivo reutilizado, se repone
+        await run_in_threadpool(confirmar_subida, subida)
+    await db.refresh(nueva_imagen)
     # refresh noticia as well
-    db.refresh(noticia)
+    await db.refresh(noticia)
     return nueva_imagen
 
 @router.get("/noticia/{noticia_id}", response_model=List[ImagenResponse])
+@presupuesto_consultas(1)
 async def obtener_imagenes_noticia(
     noticia_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    imagenes = db.query(Imagen).filter(Imagen.noticia_id == noticia_id).all()
+    result = await db.execute(select(Imagen).where(Imagen.noticia_id == noticia_id))
+    imagenes = result.scalars().all()
     return imagenes
 
 @router.get("/{imagen_id}", response_model=ImagenResponse)
+@presupuesto_consultas(1)
 async def obtener_imagen(
     imagen_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    imagen = db.query(Imagen).filter(Imagen.id_imagen == imagen_id).first()
+    imagen = await db.get(Imagen, imagen_id)
     if not imagen:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
     return imagen
@@ -91,47 +93,75 @@ async def actualizar_imagen(
     imagen_id: int,
     imagen_update: ImagenUpdate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_imagen = db.query(Imagen).filter(Imagen.id_imagen == imagen_id).first()
+    db_imagen = await db.get(Imagen, imagen_id)
     if not db_imagen:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
     
     # Verificar permisos
-    noticia = db.query(Noticia).filter(Noticia.id_noticia == db_imagen.noticia_id).first()
+    noticia = await db.get(Noticia, db_imagen.noticia_id)
     if current_user.rol_id not in [1, 2] or (
         current_user.rol_id == 2 and noticia.usuario_escritor_id != current_user.id_usuario
     ):
         raise HTTPException(status_code=403, detail="No tienes permisos para modificar esta imagen")
     
-    for key, value in imagen_update.dict(exclude_unset=True).items():
+    # Mover la imagen a otra noticia exige los mismos permisos sobre la noticia destino
+    cambios = imagen_update.dict(exclude_unset=True)
+    noticia_destino = None
+    if cambios.get("noticia_id") not in (None, noticia.id_noticia):
+        noticia_destino = await db.get(Noticia, cambios["noticia_id"])
+        if not noticia_destino:
+            raise HTTPException(status_code=404, detail="Noticia no encontrada")
+        if current_user.rol_id == 2 and noticia_destino.usuario_escritor_id != current_user.id_usuario:
+            raise HTTPException(status_code=403, detail="No tienes permisos para agregar imágenes a esta noticia")
+
+    url_anterior = db_imagen.url
+    for key, value in cambios.items():
         setattr(db_imagen, key, value)
+    await db.flush()
+
+    # Mantener Noticia.imagen al día si cambió la imagen principal
+    if noticia.imagen == url_anterior:
+        if noticia_destino is None:
+            noticia.imagen = db_imagen.url
+        else:
+            await recalcular_imagen_principal(db, noticia)
+    if noticia_destino is not None:
+        await actualizar_imagen_principal(db, noticia_destino)
     
-    db.commit()
-    db.refresh(db_imagen)
+    await db.commit()
+    await db.refresh(db_imagen)
     return db_imagen
 
 @router.delete("/{imagen_id}")
 async def eliminar_imagen(
     imagen_id: int,
+    background_tasks: BackgroundTasks,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_imagen = db.query(Imagen).filter(Imagen.id_imagen == imagen_id).first()
+    db_imagen = await db.get(Imagen, imagen_id)
     if not db_imagen:
         raise HTTPException(status_code=404, detail="Imagen no encontrada")
     
     # Verificar permisos
-    noticia = db.query(Noticia).filter(Noticia.id_noticia == db_imagen.noticia_id).first()
+    noticia = await db.get(Noticia, db_imagen.noticia_id)
     if current_user.rol_id not in [1, 2] or (
         current_user.rol_id == 2 and noticia.usuario_escritor_id != current_user.id_usuario
     ):
         raise HTTPException(status_code=403, detail="No tienes permisos para eliminar esta imagen")
     
-    # Eliminar archivo físico
-    if os.path.exists(db_imagen.url):
-        os.remove(db_imagen.url)
-    
-    db.delete(db_imagen)
-    db.commit()
+    url = db_imagen.url
+    era_principal = noticia.imagen == url
+    await db.delete(db_imagen)
+    await db.flush()
+
+    # Si era la imagen principal, la noticia pasa a usar la primera que le quede
+    if era_principal:
+        await recalcular_imagen_principal(db, noticia)
+
+    await db.commit()
+    # Eliminar archivo físico después de responder, salvo que otra fila tenga el mismo contenido
+    background_tasks.add_task(borrar_subida_sin_uso, url)
     return {"message": "Imagen eliminada correctamente"}
\ No newline at end of file
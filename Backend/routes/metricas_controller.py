@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException
+from db.database import engine, async_engine, POOL_CONFIG
+from db.pool import estadisticas_pool
+from db.instrumentacion import presupuesto_consultas
+from security.auth import get_current_user, AUTH_MODO
+from security.intentos_login import limitador_login
+from security.passwords import pool_hash
+from security.principal import cache_principal
+from services.cache_respuestas import cache_respuestas
+from security.revocacion import revocaciones
+from models.usuario import Usuario
+
+router = APIRouter(
+    prefix="/api/metricas",
+    tags=["metricas"]
+)
+
+def solo_admin(current_user: Usuario = Depends(get_current_user)) -> Usuario:
+    if current_user.rol_id != 1:  # Solo administradores
+        raise HTTPException(status_code=403, detail="No tienes permisos para ver las métricas")
+    return current_user
+
+@router.get("/pool")
+@presupuesto_consultas(0)
+def obtener_metricas_pool(current_user: Usuario = Depends(solo_admin)):
+    # Las métricas son por proceso: con varios workers de uvicorn cada uno reporta su propio pool
+    return {
+        "configuracion": POOL_CONFIG,
+        "estado": estadisticas_pool(engine),
+        "estado_async": estadisticas_pool(async_engine.sync_engine),
+    }
+
+@router.get("/hash")
+@presupuesto_consultas(0)
+def obtener_metricas_hash(current_user: Usuario = Depends(solo_admin)):
+    # Cola del pool de bcrypt (login, registro y cambios de contraseña), por proceso
+    return pool_hash.resumen()
+
+@router.get("/principal")
+@presupuesto_consultas(0)
+def obtener_metricas_principal(current_user: Usuario = Depends(solo_admin)):
+    # Aciertos/fallos de la cache de usuarios autenticados (get_current_user) y del
+    # filtro de revocaciones del modo sin estado, por proceso
+    return {
+        "modo": AUTH_MODO,
+        "cache": cache_principal.resumen(),
+        "revocaciones": revocaciones.resumen(),
+    }
+
+@router.get("/login")
+@presupuesto_consultas(0)
+def obtener_metricas_login(current_user: Usuario = Depends(solo_admin)):
+    # Intentos fallidos, bloqueos y rechazos por IP del limitador de login, por proceso
+    return limitador_login.resumen()
+
+@router.get("/respuestas")
+@presupuesto_consultas(0)
+def obtener_metricas_respuestas(current_user: Usuario = Depends(solo_admin)):
+    # Cache de respuestas serializadas (detalle y primeras páginas de noticias), por proceso
+    return cache_respuestas.resumen()
@@ -1,17 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from db.session import get_db
+from db.session import get_async_db, AsyncSessionLocal
+from db.cargador import CargadorLote, get_cargador_lectura
+from db.lecturas import leer_pagina, leer_uno
+from db.instrumentacion import presupuesto_consultas
+from db.validadores import responder_si_no_cambio, leer_validadores, calcular_etag
 from models.noticia import Noticia
-from models.imagen import Imagen
 from models.notificacion import Notificacion
-from dtos.noticia_dto import NoticiaCreate, NoticiaUpdate, NoticiaResponse
+from models.categoria import Categoria
+from dtos.noticia_dto import NoticiaCreate, NoticiaUpdate, NoticiaResponse, NoticiaExpandidaResponse, autor_publico
 from security.auth import get_current_user
 from models.usuario import Usuario
 from datetime import date
-import shutil
+from functools import partial
 import os
-from services.mail_service import enviar_correo_notificacion_borrador
+from services.cola_correos import encolar_correo, encolar_para_resumen
+from services.imagen_service import imagenes_principales, borrar_subida_sin_uso
+from services.cache_respuestas import cache_respuestas, respuesta_json, CACHE_RESPUESTAS_ACTIVA
+from utils.paginacion import recortar_pagina, HEADER_CURSOR
+from utils.serializacion import Serializador
+from utils.subidas import guardar_subida, confirmar_subida
 
 router = APIRouter(
     prefix="/api/noticias",
@@ -19,12 +30,66 @@ router = APIRouter(
 )
 
 UPLOAD_DIRECTORY = "uploads/noticias"
+PUBLICADA = 3
+
+# Solo las primeras páginas del listado (sin cursor) van a la cache de respuestas
+CACHE_LISTADO_SKIP_MAXIMO = int(os.getenv("CACHE_LISTADO_SKIP_MAXIMO", "30"))
+CACHE_LISTADO_LIMIT_MAXIMO = 50
+
+# Lo que muestran las tarjetas del listado; el contenido completo solo con fields=contenido o fields=all
+RESUMEN_NOTICIAS = ("id_noticia", "titulo", "introduccion", "imagen", "fecha_creacion", "categoria_id", "estado",
+                    "usuario_escritor_id", "escritor", "categoria")
+
+serializador_noticias = Serializador(
+    NoticiaExpandidaResponse,
+    resumen=RESUMEN_NOTICIAS,
+    dependencias={"escritor": "usuario_escritor_id", "revisor": "usuario_revisor_id", "categoria": "categoria_id"},
+)
+
+def claves_noticia(noticia_id: int) -> list:
+    return [f"noticia:{noticia_id}", "usuarios", "categorias"]
+
+CLAVES_LISTADO = ["noticias", "usuarios", "categorias"]
+
+async def responder_noticias(noticias: list, cargador: CargadorLote, campos: tuple = serializador_noticias.campos,
+                             imagenes: dict | None = None) -> list:
+    """Filas para serializar; `imagenes` ({id_noticia: url}) completa las noticias sin Noticia.imagen"""
+    con_escritor, con_revisor, con_categoria = ("escritor" in campos, "revisor" in campos, "categoria" in campos)
+    # Escritores, revisores y categorías de toda la página: una consulta IN (...) por tipo
+    for n in noticias:
+        if con_escritor:
+            cargador.pedir(Usuario, n.usuario_escritor_id)
+        if con_revisor:
+            cargador.pedir(Usuario, n.usuario_revisor_id)
+        if con_categoria:
+            cargador.pedir(Categoria, n.categoria_id)
+    await cargador.resolver()
+
+    # Filas listas para validar una sola vez al serializar (utils/serializacion.py)
+    serializador = serializador_noticias.parcial(campos)
+    respuesta = []
+    for n in noticias:
+        extra = {}
+        if imagenes and not n.imagen:
+            extra['imagen'] = imagenes.get(n.id_noticia)
+        if con_escritor:
+            extra['escritor'] = autor_publico(cargador.obtener(Usuario, n.usuario_escritor_id), n.usuario_escritor_id) \
+                if n.usuario_escritor_id is not None else None
+        if con_revisor:
+            extra['revisor'] = autor_publico(cargador.obtener(Usuario, n.usuario_revisor_id), n.usuario_revisor_id) \
+                if n.usuario_revisor_id is not None else None
+        if con_categoria:
+            categoria = cargador.obtener(Categoria, n.categoria_id)
+            extra['categoria'] = {'id': categoria.id_categoria, 'nombre': categoria.nombre} if categoria is not None else None
+        respuesta.append(serializador.fila(n, **extra))
+    return respuesta
 
 @router.post("/", response_model=NoticiaResponse)
 async def crear_noticia(
     request: Request,
+    background_tasks: BackgroundTasks,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Debug: mostrar info del usuario autenticado
     try:
@@ -60,15 +125,18 @@ async def crear_noticia(
     )
 
     db.add(nueva_noticia)
-    db.commit()
-    db.refresh(nueva_noticia)
+    await db.commit()
+    await db.refresh(nueva_noticia)
     print(f"[noticias] noticia creada id={nueva_noticia.id_noticia} por usuario={nueva_noticia.usuario_escritor_id}")
+    if nueva_noticia.estado == PUBLICADA and CACHE_RESPUESTAS_ACTIVA:
+        background_tasks.add_task(calentar_noticia, nueva_noticia.id_noticia)
 
     # Si es un borrador (estado=1), notificar a editores
     if estado == 1:
         try:
             # Obtener todos los editores (rol_id=3)
-            editores = db.query(Usuario).filter(Usuario.rol_id == 3).all()
+            result = await db.execute(select(Usuario).where(Usuario.rol_id == 3))
+            editores = result.scalars().all()
             if editores:
                 # Crear notificaciones en BD
                 for editor in editores:
@@ -79,12 +147,17 @@ async def crear_noticia(
                         noticia_id=nueva_noticia.id_noticia
                     )
                     db.add(notificacion)
-                db.commit()
 
-                # Enviar correos
-                destinatarios = [{"email": e.correo_usuario, "nombre": f"{e.nombre_usuario} {e.apellido_usuario}"} for e in editores]
+                # Un correo por editor a la cola, en la misma transacción que las notificaciones.
+                # Los que no pidieron aviso inmediato lo reciben en el resumen de la ventana actual.
                 escritor_nombre = f"{current_user.nombre_usuario} {current_user.apellido_usuario}"
-                enviar_correo_notificacion_borrador(destinatarios, titulo, escritor_nombre)
+                for editor in editores:
+                    destinatario = {"email": editor.correo_usuario, "nombre": f"{editor.nombre_usuario} {editor.apellido_usuario}"}
+                    if editor.correo_inmediato:
+                        encolar_correo(db, "borrador", destinatarios=[destinatario], titulo_noticia=titulo, escritor_nombre=escritor_nombre)
+                    else:
+                        encolar_para_resumen(db, destinatario, titulo_noticia=titulo, escritor_nombre=escritor_nombre)
+                await db.commit()
         except Exception as e:
             print(f"⚠️ Error notificando borrador: {e}")
             # No fallar la creación de la noticia por error en notificaciones
@@ -95,10 +168,11 @@ async def crear_noticia(
 async def actualizar_noticia(
     noticia_id: int,
     noticia_update: NoticiaUpdate,
+    background_tasks: BackgroundTasks,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_noticia = db.query(Noticia).filter(Noticia.id_noticia == noticia_id).first()
+    db_noticia = await db.get(Noticia, noticia_id)
     if not db_noticia:
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
     
@@ -107,21 +181,25 @@ async def actualizar_noticia(
     ):
         raise HTTPException(status_code=403, detail="No tienes permisos para editar esta noticia")
 
+    estado_anterior = db_noticia.estado
     update_data = noticia_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_noticia, key, value)
 
-    db.commit()
-    db.refresh(db_noticia)
+    await db.commit()
+    await db.refresh(db_noticia)
+    # Al publicarse, el detalle se arma después de responder para que los lectores lo encuentren en cache
+    if db_noticia.estado == PUBLICADA and estado_anterior != PUBLICADA and CACHE_RESPUESTAS_ACTIVA:
+        background_tasks.add_task(calentar_noticia, noticia_id)
     return db_noticia
 
 @router.delete("/{noticia_id}")
 async def eliminar_noticia(
     noticia_id: int,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_noticia = db.query(Noticia).filter(Noticia.id_noticia == noticia_id).first()
+    db_noticia = await db.get(Noticia, noticia_id)
     if not db_noticia:
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
     
@@ -130,55 +208,107 @@ async def eliminar_noticia(
     ):
         raise HTTPException(status_code=403, detail="No tienes permisos para eliminar esta noticia")
 
-    db.delete(db_noticia)
-    db.commit()
+    await db.delete(db_noticia)
+    await db.commit()
     return {"message": "Noticia eliminada correctamente"}
 
-@router.get("/", response_model=List[NoticiaResponse])
-async def obtener_noticias(
-    skip: int = 0,
-    limit: int = 10,
-    categoria_id: int = None,
-    estado: int = None,
-    db: Session = Depends(get_db)
-):
-    query = db.query(Noticia)
-    if categoria_id:
-        query = query.filter(Noticia.categoria_id == categoria_id)
-    if estado:
-        query = query.filter(Noticia.estado == estado)
-    
-    noticias = query.offset(skip).limit(limit).all()
-    # Ensure each noticia has an imagen URL: if noticia.imagen is empty, try to get the first Imagen row
-    for n in noticias:
+async def cargar_listado(db: AsyncSession, cargador: CargadorLote, skip: int, limit: int, cursor: str,
+                         categoria_id: int, estado: int, campos: tuple) -> tuple[bytes, dict]:
+    """Página del listado serializada y sus cabeceras propias (X-Next-Cursor)"""
+    # Solo las columnas de los campos pedidos; las demás ni se leen. Sentencia de Core ya compilada (db/lecturas.py)
+    # Con cursor se pagina por (fecha_creacion, id); skip se mantiene por compatibilidad
+    filas = await leer_pagina(db, Noticia, serializador_noticias.columnas(Noticia, campos),
+                              {"categoria_id": categoria_id or None, "estado": estado or None}, cursor, skip, limit)
+    pagina = Response()
+    noticias = recortar_pagina(filas, limit, pagina, 'fecha_creacion', 'id_noticia')
+    # Noticia.imagen se mantiene al día desde imagenes_controller; para las que aún no la tengan
+    # resolvemos la primera Imagen de toda la página en una sola consulta (antes era una por fila)
+    principales = None
+    if "imagen" in campos:
         try:
-            if not getattr(n, 'imagen', None):
-                img = db.query(Imagen).filter(Imagen.noticia_id == n.id_noticia).order_by(Imagen.id_imagen.asc()).first()
-                if img:
-                    n.imagen = img.url
+            principales = await imagenes_principales(db, [n.id_noticia for n in noticias if not n.imagen])
         except Exception:
             # don't fail the whole request if image lookup fails
             pass
-    return noticias
+    datos = await responder_noticias(noticias, cargador, campos, principales)
+    cabeceras = {HEADER_CURSOR: pagina.headers[HEADER_CURSOR]} if HEADER_CURSOR in pagina.headers else {}
+    return serializador_noticias.parcial(campos).json_lista(datos), cabeceras
+
+async def cargar_noticia(db: AsyncSession, cargador: CargadorLote, noticia_id: int) -> tuple[bytes, dict]:
+    noticia = await leer_uno(db, Noticia, None, noticia_id)
+    if not noticia:
+        raise HTTPException(status_code=404, detail="Noticia no encontrada")
+    datos = (await responder_noticias([noticia], cargador))[0]
+    return serializador_noticias.json(datos), {}
+
+async def calentar_noticia(noticia_id: int):
+    """Deja en la cache el detalle de una noticia recién publicada, antes de que lleguen los lectores"""
+    async with AsyncSessionLocal() as db:
+        db.info["usar_primario"] = True  # la réplica puede no tener aún la publicación
+        versiones, _ = await leer_validadores(db, claves_noticia(noticia_id))
+        await cache_respuestas.obtener_o_cargar(
+            ("noticia", calcular_etag(versiones, "")), claves_noticia(noticia_id),
+            partial(cargar_noticia, db, CargadorLote(db, filas=True), noticia_id),
+        )
+
+@router.get("/", response_model=List[NoticiaExpandidaResponse])
+@presupuesto_consultas(5)  # validadores + noticias + imágenes de la página + usuarios + categorías
+async def obtener_noticias(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str = None,
+    categoria_id: int = None,
+    estado: int = None,
+    fields: str = None,  # campos separados por coma o "all"; sin él, el resumen (RESUMEN_NOTICIAS)
+    db: AsyncSession = Depends(get_async_db),
+    cargador: CargadorLote = Depends(get_cargador_lectura)
+):
+    campos = serializador_noticias.campos_pedidos(fields)
+    # 304 si el cliente ya tiene esta página (ETag de db/validadores.py): sin más consultas
+    no_cambio = await responder_si_no_cambio(request, response, db, CLAVES_LISTADO, "noticias")
+    if no_cambio:
+        return no_cambio
 
-@router.get("/{noticia_id}", response_model=NoticiaResponse)
+    cargar = partial(cargar_listado, db, cargador, skip, limit, cursor, categoria_id, estado, campos)
+    if CACHE_RESPUESTAS_ACTIVA and not cursor and skip < CACHE_LISTADO_SKIP_MAXIMO and limit <= CACHE_LISTADO_LIMIT_MAXIMO:
+        # El ETag ya distingue filtros, página y versión de los datos
+        cuerpo, cabeceras = await cache_respuestas.obtener_o_cargar(("noticias", response.headers["ETag"]), CLAVES_LISTADO, cargar)
+    else:
+        cuerpo, cabeceras = await cargar()
+    return respuesta_json(cuerpo, response, cabeceras)
+
+@router.get("/{noticia_id}", response_model=NoticiaExpandidaResponse)
+@presupuesto_consultas(4)  # validadores + noticia + usuarios + categoría
 async def obtener_noticia(
     noticia_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    cargador: CargadorLote = Depends(get_cargador_lectura)
 ):
-    noticia = db.query(Noticia).filter(Noticia.id_noticia == noticia_id).first()
-    if not noticia:
-        raise HTTPException(status_code=404, detail="Noticia no encontrada")
-    return noticia
+    no_cambio = await responder_si_no_cambio(request, response, db, claves_noticia(noticia_id), "noticia")
+    if no_cambio:
+        return no_cambio
+
+    cargar = partial(cargar_noticia, db, cargador, noticia_id)
+    if CACHE_RESPUESTAS_ACTIVA:
+        # Una noticia en tendencia: una sola carga aunque lleguen muchos lectores a la vez
+        cuerpo, _ = await cache_respuestas.obtener_o_cargar(("noticia", response.headers["ETag"]), claves_noticia(noticia_id), cargar)
+    else:
+        cuerpo, _ = await cargar()
+    return respuesta_json(cuerpo, response)
 
 @router.post("/{noticia_id}/imagen")
 async def subir_imagen_noticia(
     noticia_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_noticia = db.query(Noticia).filter(Noticia.id_noticia == noticia_id).first()
+    db_noticia = await db.get(Noticia, noticia_id)
     if not db_noticia:
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
     
@@ -187,20 +317,22 @@ async def subir_imagen_noticia(
     ):
         raise HTTPException(status_code=403, detail="No tienes permisos para modificar esta noticia")
 
-    # Crear el directorio si no existe
-    os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
-    
-    # Generar nombre único para el archivo
-    file_extension = os.path.splitext(file.filename)[1]
-    file_name = f"noticia_{noticia_id}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIRECTORY, file_name)
-    
-    # Guardar el archivo
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Guardar el archivo con nombre por contenido (utils/subidas.py): cada versión tiene su URL.
+    # Hash, escritura y precompresión son bloqueantes: fuera del event loop
+    subida = await run_in_threadpool(guardar_subida, file, UPLOAD_DIRECTORY)
+    file_path = subida.ruta
     
     # Actualizar la ruta de la imagen en la base de datos
+    anterior = db_noticia.imagen
     db_noticia.imagen = file_path
-    db.commit()
+    try:
+        await db.commit()
+    finally:
+        # Si un borrado concurrente se llevó el archivo reutilizado, se repone
+        await run_in_threadpool(confirmar_subida, subida)
+
+    # La imagen anterior subida por esta ruta se borra si ya nadie la referencia
+    if anterior and anterior != file_path and anterior.startswith(UPLOAD_DIRECTORY):
+        background_tasks.add_task(borrar_subida_sin_uso, anterior)
     
-    return {"filename": file_name}
\ No newline at end of file
+    return {"filename": os.path.basename(file_path)}
\ No newline at end of file
@@ -1,22 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from db.session import get_db
+from db.session import get_async_db
+from db.lecturas import leer_pagina, leer_por_ids
+from db.instrumentacion import presupuesto_consultas
 from models.notificacion import Notificacion
-from dtos.notificacion_dto import NotificacionCreate, NotificacionUpdate, NotificacionResponse
+from models.noticia import Noticia
+from dtos.notificacion_dto import NotificacionCreate, NotificacionUpdate, NotificacionResponse, NotificacionExpandidaResponse, PreferenciaCorreo
 from security.auth import get_current_user
 from models.usuario import Usuario
+from utils.paginacion import recortar_pagina
+from utils.serializacion import Serializador
 
 router = APIRouter(
     prefix="/api/notificaciones",
     tags=["notificaciones"]
 )
 
+# usuario_id siempre es el del usuario autenticado: el resumen lo omite
+serializador_notificaciones = Serializador(
+    NotificacionExpandidaResponse,
+    resumen=("id_notificacion", "titulo", "mensaje", "leida", "fecha_creacion", "noticia_id", "noticia_titulo"),
+    dependencias={"noticia_titulo": "noticia_id"},
+)
+
 @router.post("/", response_model=NotificacionResponse)
 async def crear_notificacion(
     notificacion: NotificacionCreate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Solo administradores pueden crear notificaciones manualmente
     if current_user.rol_id != 1:
@@ -28,29 +40,59 @@ async def crear_notificacion(
     )
 
     db.add(nueva_notificacion)
-    db.commit()
-    db.refresh(nueva_notificacion)
+    await db.commit()
+    await db.refresh(nueva_notificacion)
     return nueva_notificacion
 
-@router.get("/", response_model=List[NotificacionResponse])
+@router.get("/", response_model=List[NotificacionExpandidaResponse])
+@presupuesto_consultas(2)  # notificaciones + títulos de noticias
 async def obtener_notificaciones_usuario(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),  # antes devolvía toda la bandeja
+    cursor: str = None,
+    fields: str = None,  # campos separados por coma o "all"; sin él, el resumen
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    campos = serializador_notificaciones.campos_pedidos(fields)
+    # Sentencia de Core ya compilada (db/lecturas.py): filas sin objetos del ORM, solo las columnas pedidas
+    filas = await leer_pagina(db, Notificacion, serializador_notificaciones.columnas(Notificacion, campos),
+                              {"usuario_id": current_user.id_usuario}, cursor, skip, limit)
+    notificaciones = recortar_pagina(filas, limit, response, 'fecha_creacion', 'id_notificacion')
+
+    serializador = serializador_notificaciones.parcial(campos)
+    if "noticia_titulo" not in campos:
+        return serializador.respuesta_lista([serializador.fila(n) for n in notificaciones], response)
+
+    # Títulos de las noticias referidas: una sola consulta IN (...) para toda la página, sin el contenido
+    noticias = await leer_por_ids(db, Noticia, ("titulo",), [n.noticia_id for n in notificaciones])
+    respuesta = []
+    for n in notificaciones:
+        noticia = noticias.get(n.noticia_id)
+        respuesta.append(serializador.fila(n, noticia_titulo=noticia.titulo if noticia else None))
+    return serializador.respuesta_lista(respuesta, response)
+
+@router.put("/preferencias", response_model=PreferenciaCorreo)
+async def actualizar_preferencia_correo(
+    preferencia: PreferenciaCorreo,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    notificaciones = db.query(Notificacion)\
-        .filter(Notificacion.usuario_id == current_user.id_usuario)\
-        .order_by(Notificacion.fecha_creacion.desc())\
-        .all()
-    return notificaciones
+    # Los editores eligen entre un correo por borrador o el resumen periódico
+    usuario = await db.get(Usuario, current_user.id_usuario)
+    usuario.correo_inmediato = preferencia.inmediato
+    await db.commit()
+    return PreferenciaCorreo(inmediato=usuario.correo_inmediato)
 
 @router.put("/{notificacion_id}", response_model=NotificacionResponse)
 async def actualizar_notificacion(
     notificacion_id: int,
     notificacion_update: NotificacionUpdate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_notificacion = db.query(Notificacion).filter(Notificacion.id_notificacion == notificacion_id).first()
+    db_notificacion = await db.get(Notificacion, notificacion_id)
     if not db_notificacion:
         raise HTTPException(status_code=404, detail="Notificación no encontrada")
 
@@ -62,17 +104,17 @@ async def actualizar_notificacion(
     for key, value in update_data.items():
         setattr(db_notificacion, key, value)
 
-    db.commit()
-    db.refresh(db_notificacion)
+    await db.commit()
+    await db.refresh(db_notificacion)
     return db_notificacion
 
 @router.delete("/{notificacion_id}")
 async def eliminar_notificacion(
     notificacion_id: int,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_notificacion = db.query(Notificacion).filter(Notificacion.id_notificacion == notificacion_id).first()
+    db_notificacion = await db.get(Notificacion, notificacion_id)
     if not db_notificacion:
         raise HTTPException(status_code=404, detail="Notificación no encontrada")
 
@@ -80,6 +122,6 @@ async def eliminar_notificacion(
     if current_user.rol_id != 1 and db_notificacion.usuario_id != current_user.id_usuario:
         raise HTTPException(status_code=403, detail="No tienes permisos para eliminar esta notificación")
 
-    db.delete(db_notificacion)
-    db.commit()
+    await db.delete(db_notificacion)
+    await db.commit()
     return {"message": "Notificación eliminada correctamente"}
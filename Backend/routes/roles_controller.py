@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from db.session import get_db
+from db.session import get_async_db
+from db.instrumentacion import presupuesto_consultas
 from models.rol import Rol
 from dtos.rol_dto import RolCreate, RolUpdate, RolResponse
 from security.auth import get_current_user
@@ -16,32 +18,35 @@ router = APIRouter(
 async def crear_rol(
     rol: RolCreate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user.rol_id != 1:  # Solo administradores
         raise HTTPException(status_code=403, detail="No tienes permisos para crear roles")
     
     nuevo_rol = Rol(**rol.dict())
     db.add(nuevo_rol)
-    db.commit()
-    db.refresh(nuevo_rol)
+    await db.commit()
+    await db.refresh(nuevo_rol)
     return nuevo_rol
 
 @router.get("/", response_model=List[RolResponse])
+@presupuesto_consultas(1)
 async def obtener_roles(
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    roles = db.query(Rol).offset(skip).limit(limit).all()
+    result = await db.execute(select(Rol).offset(skip).limit(limit))
+    roles = result.scalars().all()
     return roles
 
 @router.get("/{rol_id}", response_model=RolResponse)
+@presupuesto_consultas(1)
 async def obtener_rol(
     rol_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    rol = db.query(Rol).filter(Rol.id_rol == rol_id).first()
+    rol = await db.get(Rol, rol_id)
     if not rol:
         raise HTTPException(status_code=404, detail="Rol no encontrado")
     return rol
@@ -51,40 +56,41 @@ async def actualizar_rol(
     rol_id: int,
     rol_update: RolUpdate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user.rol_id != 1:  # Solo administradores
         raise HTTPException(status_code=403, detail="No tienes permisos para actualizar roles")
     
-    db_rol = db.query(Rol).filter(Rol.id_rol == rol_id).first()
+    db_rol = await db.get(Rol, rol_id)
     if not db_rol:
         raise HTTPException(status_code=404, detail="Rol no encontrado")
     
     for key, value in rol_update.dict(exclude_unset=True).items():
         setattr(db_rol, key, value)
     
-    db.commit()
-    db.refresh(db_rol)
+    await db.commit()
+    await db.refresh(db_rol)
     return db_rol
 
 @router.delete("/{rol_id}")
 async def eliminar_rol(
     rol_id: int,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user.rol_id != 1:  # Solo administradores
         raise HTTPException(status_code=403, detail="No tienes permisos para eliminar roles")
     
-    db_rol = db.query(Rol).filter(Rol.id_rol == rol_id).first()
+    db_rol = await db.get(Rol, rol_id)
     if not db_rol:
         raise HTTPException(status_code=404, detail="Rol no encontrado")
     
     # Verificar que no haya usuarios con este rol
-    usuarios_con_rol = db.query(Usuario).filter(Usuario.rol_id == rol_id).first()
+    result = await db.execute(select(Usuario.id_usuario).where(Usuario.rol_id == rol_id).limit(1))
+    usuarios_con_rol = result.first()
     if usuarios_con_rol:
         raise HTTPException(status_code=400, detail="No se puede eliminar un rol que está siendo usado por usuarios")
     
-    db.delete(db_rol)
-    db.commit()
+    await db.delete(db_rol)
+    await db.commit()
     return {"message": "Rol eliminado correctamente"}
\ No newline at end of file
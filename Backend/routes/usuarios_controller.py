@@ -3,19 +3,29 @@ from fastapi import (
     APIRouter, Depends, HTTPException, status,
     UploadFile, File, Form, Body, Request
 )
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from db import get_db
+from db.session import get_async_db
 from models.usuario import Usuario
 from models.schemas import UsuarioOut, TokenResponse, RecuperarPasswordRequest
-from security.passwords import encriptar_contrasena, verificar_contrasena
-from security.jwt import crear_token
+from security.passwords import encriptar_contrasena_async, verificar_contrasena_async
+from security.jwt import crear_token, claims_usuario
+from security.intentos_login import limitador_login, LOGIN_BLOQUEO_MINUTOS
+from security.ip_cliente import ip_cliente
+from security.tokens_recuperacion import (
+    RECUPERACION_LINK_PRUEBA, crear_token_recuperacion, buscar_token_recuperacion, token_vencido, consumir_tokens_recuperacion
+)
 from datetime import datetime, timedelta
-import uuid
+import os
 
-# Servicio de correo (usa Mailjet; ya lo tienes en services/mail_service.py)
-from services.mail_service import enviar_correo_bienvenida, enviar_correo_recuperacion
+# Cola de correos: el envío a Mailjet lo hace el trabajador de services/cola_correos.py
+from services.cola_correos import encolar_correo
+from utils.subidas import guardar_subida, confirmar_subida
 
 # Router principal (mantengo /auth para que queden las rutas originales)
 router = APIRouter(prefix="/auth", tags=["Autenticación"])
@@ -39,7 +49,11 @@ async def register(
     if db.query(Usuario).filter(Usuario.correo_usuario == correo_usuario).first():
         raise HTTPException(status_code=400, detail="Correo ya registrado")
 
-    hashed_password = encriptar_contrasena(contrasena_usuario)
+    # bcrypt en el pool acotado: no congela el event loop
+    hashed_password = await encriptar_contrasena_async(contrasena_usuario)
+
+    # Hash, escritura y precompresión de la foto: fuera del event loop
+    subida = await run_in_threadpool(guardar_subida, foto_usuario, "uploads") if foto_usuario else None
 
     # Crear usuario
     nuevo_usuario = Usuario(
@@ -48,23 +62,19 @@ async def register(
         correo_usuario=correo_usuario,
         contrasena_usuario=hashed_password,
         rol_id=rol_id,
-        foto_usuario=foto_usuario.filename if foto_usuario else None
+        # Nombre por contenido (utils/subidas.py); el frontend lo sirve desde /uploads/<foto>
+        foto_usuario=os.path.basename(subida.ruta) if subida else None
     )
 
     db.add(nuevo_usuario)
-    db.commit()
-    db.refresh(nuevo_usuario)
-
-    # Guardar foto si se subió
-    if foto_usuario:
-        with open(f"uploads/{foto_usuario.filename}", "wb") as f:
-            f.write(await foto_usuario.read())
-
-    # Enviar correo de bienvenida (no bloquea el registro)
+    # Correo de bienvenida a la cola, en la misma transacción que el usuario
+    encolar_correo(db, "bienvenida", destinatario=correo_usuario, nombre=nombre_usuario)
     try:
-        enviar_correo_bienvenida(destinatario=nuevo_usuario.correo_usuario, nombre=nuevo_usuario.nombre_usuario)
-    except Exception as e:
-        print(f"⚠️ Error enviando correo de bienvenida: {e}")
+        db.commit()
+    finally:
+        if subida:
+            await run_in_threadpool(confirmar_subida, subida)
+    db.refresh(nuevo_usuario)
 
     return UsuarioOut(
         id=nuevo_usuario.id_usuario,
@@ -78,13 +88,21 @@ async def register(
 
 # ----------------- Login -----------------
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
+    request: Request,
     correo_usuario: str = Form(...),
     contrasena_usuario: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    usuario = db.query(Usuario).filter(Usuario.correo_usuario == correo_usuario).first()
+    # Límite por IP antes de tocar la base o bcrypt (security/intentos_login.py);
+    # la IP del cliente, no la del proxy (security/ip_cliente.py)
+    ip = ip_cliente(request)
+    limitador_login.verificar_ip(ip)
+
+    result = await db.execute(select(Usuario).where(Usuario.correo_usuario == correo_usuario))
+    usuario = result.scalars().first()
     if not usuario:
+        limitador_login.registrar_fallo(ip)
         raise HTTPException(status_code=400, detail="Correo no registrado")
 
     # Verificar si la cuenta está bloqueada
@@ -93,26 +111,26 @@ def login(
         minutos = int(tiempo_restante.total_seconds() / 60)
         raise HTTPException(status_code=429, detail=f"Cuenta bloqueada. Intenta de nuevo en {minutos} minutos.")
 
-    if not verificar_contrasena(contrasena_usuario, usuario.contrasena_usuario):
-        # Incrementar intentos fallidos
-        usuario.intentos_fallidos += 1
-
-        if usuario.intentos_fallidos >= 3:
-            # Bloquear por 15 minutos
-            usuario.bloqueado_hasta = datetime.utcnow() + timedelta(minutes=15)
-            usuario.intentos_fallidos = 0  # Resetear intentos
-            db.commit()
-            raise HTTPException(status_code=429, detail="Demasiados intentos fallidos. Cuenta bloqueada por 15 minutos.")
-        else:
-            db.commit()
-            raise HTTPException(status_code=400, detail=f"Contraseña incorrecta. Intentos restantes: {3 - usuario.intentos_fallidos}")
-
-    # Login exitoso: resetear intentos fallidos
-    usuario.intentos_fallidos = 0
-    usuario.bloqueado_hasta = None
-    db.commit()
+    # La verificación espera en el pool de bcrypt sin ocupar un hilo del threadpool de Starlette
+    if not await verificar_contrasena_async(contrasena_usuario, usuario.contrasena_usuario):
+        # Los intentos se cuentan en memoria; la base solo se escribe si la cuenta se bloquea
+        intentos = limitador_login.registrar_fallo(ip, correo_usuario)
+
+        if limitador_login.debe_bloquear(intentos):
+            usuario.bloqueado_hasta = datetime.utcnow() + timedelta(minutes=LOGIN_BLOQUEO_MINUTOS)
+            await db.commit()
+            limitador_login.limpiar_cuenta(correo_usuario)
+            raise HTTPException(status_code=429, detail=f"Demasiados intentos fallidos. Cuenta bloqueada por {LOGIN_BLOQUEO_MINUTOS} minutos.")
+        raise HTTPException(status_code=400, detail=f"Contraseña incorrecta. Intentos restantes: {limitador_login.intentos_cuenta - intentos}")
+
+    # Login exitoso: la cuenta vuelve a empezar; solo se escribe si había un bloqueo vencido
+    limitador_login.limpiar_cuenta(correo_usuario)
+    if usuario.bloqueado_hasta is not None or usuario.intentos_fallidos:
+        usuario.intentos_fallidos = 0
+        usuario.bloqueado_hasta = None
+        await db.commit()
 
-    token = crear_token({"sub": usuario.id_usuario, "rol_id": usuario.rol_id})
+    token = crear_token(claims_usuario(usuario))
 
     return TokenResponse(
         access_token=token,
@@ -146,13 +164,16 @@ async def update_user(
     usuario.apellido_usuario = apellido_usuario
     usuario.correo_usuario = correo_usuario
 
+    subida = None
     if foto_usuario:
-        filename = foto_usuario.filename
-        with open(f"uploads/{filename}", "wb") as f:
-            f.write(await foto_usuario.read())
-        usuario.foto_usuario = filename
+        subida = await run_in_threadpool(guardar_subida, foto_usuario, "uploads")
+        usuario.foto_usuario = os.path.basename(subida.ruta)
 
-    db.commit()
+    try:
+        db.commit()
+    finally:
+        if subida:
+            await run_in_threadpool(confirmar_subida, subida)
     db.refresh(usuario)
 
     return UsuarioOut(
@@ -173,43 +194,36 @@ async def recuperar_password(req: RecuperarPasswordRequest, db: Session = Depend
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    # Generar token y expiración
-    token = str(uuid.uuid4())
-    usuario.reset_token = token
-    usuario.reset_token_expira = datetime.utcnow() + timedelta(hours=1)
+    # Generar token (en la base queda solo su hash, ver security/tokens_recuperacion.py)
+    token = crear_token_recuperacion(db, usuario.id_usuario)
+    # Correo con el token a la cola, en la misma transacción; el trabajador lo borra de la cola al enviarlo
+    encolar_correo(db, "recuperacion", destinatario=usuario.correo_usuario, nombre=usuario.nombre_usuario, token=token)
     db.commit()
 
-    # Elige la ruta que quieras usar en el enlace. Mantengo /auth/reset-password para coherencia.
-    link = f"http://127.0.0.1:8000/auth/reset-password/{token}"
-
-    # Enviar correo con token (usa tu servicio Mailjet)
-    try:
-        enviar_correo_recuperacion(destinatario=usuario.correo_usuario, nombre=usuario.nombre_usuario, token=token)
-    except Exception as e:
-        # si falla el envío real, imprimimos el link en consola para pruebas
-        print(f"⚠️ Error enviando correo de recuperación: {e}")
-        print("Link de prueba:", link)
-
-    return JSONResponse({"msg": "Se ha enviado un correo con las instrucciones para recuperar tu contraseña.", "link_prueba": link})
+    respuesta = {"msg": "Se ha enviado un correo con las instrucciones para recuperar tu contraseña."}
+    if RECUPERACION_LINK_PRUEBA:
+        # Solo en desarrollo: con el enlace en la respuesta cualquiera podría cambiar la contraseña ajena
+        respuesta["link_prueba"] = f"http://127.0.0.1:8000/auth/reset-password/{token}"
+    return JSONResponse(respuesta)
 
 
 # ----------------- Restablecer contraseña vía API (POST) -----------------
 @router.post("/reset-password")
-def reset_password_api(
+async def reset_password_api(
     token: str = Body(...),
     nueva_password: str = Body(...),
     db: Session = Depends(get_db)
 ):
-    usuario = db.query(Usuario).filter(Usuario.reset_token == token).first()
-    if not usuario:
+    fila = buscar_token_recuperacion(db, token)
+    if not fila:
         raise HTTPException(status_code=400, detail="Token inválido")
 
-    if usuario.reset_token_expira and usuario.reset_token_expira < datetime.utcnow():
+    if token_vencido(fila):
         raise HTTPException(status_code=400, detail="El token ha expirado. Solicita uno nuevo.")
 
-    usuario.contrasena_usuario = encriptar_contrasena(nueva_password)
-    usuario.reset_token = None
-    usuario.reset_token_expiration = None
+    usuario = db.get(Usuario, fila.usuario_id)
+    usuario.contrasena_usuario = await encriptar_contrasena_async(nueva_password)
+    consumir_tokens_recuperacion(db, usuario.id_usuario)
     db.commit()
 
     return {"msg": "Contraseña actualizada correctamente"}
@@ -219,12 +233,12 @@ def reset_password_api(
 # 1) GET que muestra el formulario (ruta bajo /auth)
 @router.get("/reset-password/{token}")
 async def mostrar_formulario_reset_auth(request: Request, token: str, db: Session = Depends(get_db)):
-    usuario = db.query(Usuario).filter(Usuario.reset_token == token).first()
-    if not usuario:
+    fila = buscar_token_recuperacion(db, token)
+    if not fila:
         # mostrar página simple de error
         return templates.TemplateResponse("reset_error.html", {"request": request, "mensaje": "Token inválido o usuario no existe."}, status_code=404)
 
-    if usuario.reset_token_expira and usuario.reset_token_expira < datetime.utcnow():
+    if token_vencido(fila):
         return templates.TemplateResponse("reset_error.html", {"request": request, "mensaje": "El enlace ha expirado."}, status_code=400)
 
     # muestra el formulario, pasamos token al template
@@ -240,20 +254,20 @@ async def procesar_reset_password_auth(
     confirmar_contrasena: str = Form(...),
     db: Session = Depends(get_db),
 ):
-    usuario = db.query(Usuario).filter(Usuario.reset_token == token).first()
-    if not usuario:
+    fila = buscar_token_recuperacion(db, token)
+    if not fila:
         return templates.TemplateResponse("reset_error.html", {"request": request, "mensaje": "Token inválido o usuario no existe."}, status_code=404)
 
-    if usuario.reset_token_expiration and usuario.reset_token_expira < datetime.utcnow():
+    if token_vencido(fila):
         return templates.TemplateResponse("reset_error.html", {"request": request, "mensaje": "El enlace ha expirado."}, status_code=400)
 
     if nueva_contrasena != confirmar_contrasena:
         # re-render con mensaje de error
         return templates.TemplateResponse("reset_password.html", {"request": request, "token": token, "error": "Las contraseñas no coinciden."})
 
-    usuario.contrasena_usuario = encriptar_contrasena(nueva_contrasena)
-    usuario.reset_token = None
-    usuario.reset_token_expira = None
+    usuario = db.get(Usuario, fila.usuario_id)
+    usuario.contrasena_usuario = await encriptar_contrasena_async(nueva_contrasena)
+    consumir_tokens_recuperacion(db, usuario.id_usuario)
     db.commit()
 
     return templates.TemplateResponse("reset_success.html", {"request": request, "mensaje": "Contraseña restablecida correctamente ✅"})
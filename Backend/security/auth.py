@@ -1,31 +1,34 @@
+import os
+from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from db.session import get_db
+from db.session import SessionLocal
 from models.usuario import Usuario
-from security.passwords import verificar_contrasena
 from security.jwt import verificar_token_jwt
-from typing import Optional
+from security.principal import UsuarioActual, cache_principal
+from security.revocacion import revocaciones
+
+load_dotenv()
+
+# "cache": el usuario se lee de la base (con cache por id) en cada petición.
+# "sin_estado": se arma con los claims del token, sin consultar la base; los cambios
+# de contraseña, rol o bloqueo cortan los tokens anteriores vía security/revocacion.py.
+AUTH_MODO = os.getenv("AUTH_MODO", "cache")
 
 security = HTTPBearer()
 
 def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Usuario:
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UsuarioActual:
     """
     Dependencia para obtener el usuario actual desde el token JWT.
+    Devuelve una copia inmutable de sus columnas, cacheada por id (security/principal.py),
+    o armada con los claims del token si AUTH_MODO=sin_estado.
     """
     token = credentials.credentials
     try:
         payload = verificar_token_jwt(token)
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        user_id = int(payload["sub"])
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,11 +36,31 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario no encontrado",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # Los tokens emitidos antes de este modo no traen los claims: van por la base
+    if AUTH_MODO == "sin_estado" and "rol_id" in payload and "nombre" in payload:
+        revocaciones.sincronizar_si_toca()
+        if revocaciones.revocado(user_id, payload.get("iat")):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Sesión revocada, inicia sesión de nuevo",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return UsuarioActual.desde_claims(payload)
+
+    user = cache_principal.obtener(user_id)
+    if user is not None:
+        return user
+
+    # Solo en fallo de cache: se lee del primario para no cachear una réplica atrasada
+    with SessionLocal() as db:
+        db.info["usar_primario"] = True
+        usuario = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+        if usuario is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuario no encontrado",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = UsuarioActual.desde_modelo(usuario)
+    cache_principal.guardar(user_id, user)
     return user
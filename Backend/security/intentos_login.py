@@ -0,0 +1,181 @@
+# security/intentos_login.py
+"""
+Límite de intentos fallidos de login, por cuenta y por IP.
+
+Los intentos se cuentan en una ventana deslizante fuera de la base: un
+ataque de relleno de credenciales ya no se convierte en un UPDATE + COMMIT
+sobre usuario por cada contraseña probada. Solo cuando una cuenta llega a
+LOGIN_INTENTOS_CUENTA se guarda bloqueado_hasta (una escritura por bloqueo).
+El límite por IP corta antes de consultar la base o calcular bcrypt, y
+cubre también los intentos con correos que no existen.
+
+El backend por defecto vive en memoria del proceso: con varios workers de
+uvicorn cada uno cuenta por su lado (el límite efectivo se multiplica por
+los workers). Con LOGIN_BACKEND_URL=redis://... los contadores se comparten
+entre procesos; necesita el paquete redis.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+load_dotenv()
+
+LOGIN_INTENTOS_CUENTA = int(os.getenv("LOGIN_INTENTOS_CUENTA", "3"))
+LOGIN_VENTANA_CUENTA_S = int(os.getenv("LOGIN_VENTANA_CUENTA_S", "900"))
+LOGIN_BLOQUEO_MINUTOS = int(os.getenv("LOGIN_BLOQUEO_MINUTOS", "15"))
+LOGIN_INTENTOS_IP = int(os.getenv("LOGIN_INTENTOS_IP", "20"))
+LOGIN_VENTANA_IP_S = int(os.getenv("LOGIN_VENTANA_IP_S", "300"))
+LOGIN_MAXIMO_CLAVES = int(os.getenv("LOGIN_MAXIMO_CLAVES", "100000"))
+LOGIN_BACKEND_URL = os.getenv("LOGIN_BACKEND_URL", "")
+
+
+class BackendMemoria:
+    """Ventanas deslizantes en memoria: por clave, los instantes de los intentos recientes"""
+
+    def __init__(self, maximo_claves: int = LOGIN_MAXIMO_CLAVES):
+        self.maximo_claves = maximo_claves
+        self._intentos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _vigentes(self, clave: str, ahora: float, ventana: float) -> deque:
+        intentos = self._intentos.get(clave)
+        if intentos is None:
+            return deque()
+        while intentos and intentos[0] <= ahora - ventana:
+            intentos.popleft()
+        return intentos
+
+    def registrar(self, clave: str, ahora: float, ventana: float) -> int:
+        """Anota un intento y devuelve cuántos hay en la ventana (incluido este)"""
+        with self._lock:
+            intentos = self._vigentes(clave, ahora, ventana)
+            intentos.append(ahora)
+            self._intentos[clave] = intentos
+            self._intentos.move_to_end(clave)
+            # Acota la memoria ante muchas IPs o correos distintos: se olvidan los menos recientes
+            while len(self._intentos) > self.maximo_claves:
+                self._intentos.popitem(last=False)
+            return len(intentos)
+
+    def contar(self, clave: str, ahora: float, ventana: float) -> int:
+        with self._lock:
+            intentos = self._vigentes(clave, ahora, ventana)
+            if not intentos:
+                self._intentos.pop(clave, None)
+            return len(intentos)
+
+    def borrar(self, clave: str):
+        with self._lock:
+            self._intentos.pop(clave, None)
+
+    def claves(self) -> int:
+        with self._lock:
+            return len(self._intentos)
+
+
+class BackendRedis:
+    """Las mismas ventanas en sorted sets de Redis, compartidas entre workers y servidores"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("LOGIN_BACKEND_URL apunta a Redis pero el paquete redis no está instalado")
+        self._redis = redis.Redis.from_url(url)
+
+    def registrar(self, clave: str, ahora: float, ventana: float) -> int:
+        clave = f"login:{clave}"
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(clave, 0, ahora - ventana)
+        pipe.zadd(clave, {repr(ahora): ahora})
+        pipe.zcard(clave)
+        pipe.expire(clave, int(ventana) + 1)
+        return pipe.execute()[2]
+
+    def contar(self, clave: str, ahora: float, ventana: float) -> int:
+        clave = f"login:{clave}"
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(clave, 0, ahora - ventana)
+        pipe.zcard(clave)
+        return pipe.execute()[1]
+
+    def borrar(self, clave: str):
+        self._redis.delete(f"login:{clave}")
+
+    def claves(self) -> int | None:
+        return None  # no se recorren las claves de Redis para las métricas
+
+
+def crear_backend(url: str = LOGIN_BACKEND_URL):
+    if url.startswith(("redis://", "rediss://")):
+        return BackendRedis(url)
+    if url:
+        raise ValueError(f"LOGIN_BACKEND_URL no soportado: {url}")
+    return BackendMemoria()
+
+
+class LimitadorLogin:
+    def __init__(
+        self,
+        backend,
+        intentos_cuenta: int = LOGIN_INTENTOS_CUENTA,
+        ventana_cuenta: float = LOGIN_VENTANA_CUENTA_S,
+        intentos_ip: int = LOGIN_INTENTOS_IP,
+        ventana_ip: float = LOGIN_VENTANA_IP_S,
+        reloj=time.time,
+    ):
+        self.backend = backend
+        self.intentos_cuenta = intentos_cuenta
+        self.ventana_cuenta = ventana_cuenta
+        self.intentos_ip = intentos_ip
+        self.ventana_ip = ventana_ip
+        self.reloj = reloj
+        self.fallos = 0
+        self.bloqueos = 0
+        self.rechazos_ip = 0
+
+    def verificar_ip(self, ip: str):
+        """429 si la IP ya agotó sus intentos fallidos en la ventana"""
+        if self.backend.contar(f"ip:{ip}", self.reloj(), self.ventana_ip) >= self.intentos_ip:
+            self.rechazos_ip += 1
+            raise HTTPException(status_code=429, detail="Demasiados intentos fallidos desde esta dirección. Intenta más tarde.",
+                                headers={"Retry-After": str(int(self.ventana_ip))})
+
+    def registrar_fallo(self, ip: str, correo: str | None = None) -> int:
+        """Anota un intento fallido; devuelve los intentos de la cuenta en la ventana (0 sin cuenta)"""
+        ahora = self.reloj()
+        self.fallos += 1
+        self.backend.registrar(f"ip:{ip}", ahora, self.ventana_ip)
+        if correo is None:
+            return 0
+        return self.backend.registrar(f"cuenta:{correo.lower()}", ahora, self.ventana_cuenta)
+
+    def debe_bloquear(self, intentos: int) -> bool:
+        if intentos >= self.intentos_cuenta:
+            self.bloqueos += 1
+            return True
+        return False
+
+    def limpiar_cuenta(self, correo: str):
+        """Después de un login correcto o de un bloqueo la cuenta vuelve a empezar"""
+        self.backend.borrar(f"cuenta:{correo.lower()}")
+
+    def resumen(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "claves": self.backend.claves(),
+            "fallos": self.fallos,
+            "bloqueos": self.bloqueos,
+            "rechazos_ip": self.rechazos_ip,
+            "intentos_cuenta": self.intentos_cuenta,
+            "ventana_cuenta_s": self.ventana_cuenta,
+            "intentos_ip": self.intentos_ip,
+            "ventana_ip_s": self.ventana_ip,
+        }
+
+
+limitador_login = LimitadorLogin(crear_backend())
@@ -0,0 +1,64 @@
+# security/ip_cliente.py
+"""
+IP real del cliente detrás de un proxy.
+
+En Railway (y detrás de cualquier balanceador) la conexión la abre el
+proxy: request.client.host es la IP del proxy para todos los clientes, y
+un límite por IP se convierte en un límite global. El proxy agrega la IP
+del cliente al final de X-Forwarded-For.
+
+PROXIES_CONFIABLES dice de quién se acepta ese header:
+  - vacío (por defecto): de nadie, se usa la IP de la conexión;
+  - IPs o redes separadas por coma (10.0.0.0/8,127.0.0.1): X-Forwarded-For
+    se recorre de derecha a izquierda saltando los proxies confiables; la
+    primera IP que no lo es es la del cliente;
+  - "*": la conexión siempre llega por un único proxy (Railway); se toma la
+    última IP de X-Forwarded-For, la que agregó ese proxy.
+
+Las IPs que el cliente escribe a la izquierda del header nunca se usan:
+falsificarlas no le cambia la IP con la que se lo cuenta.
+"""
+import ipaddress
+import os
+
+from dotenv import load_dotenv
+from fastapi import Request
+
+load_dotenv()
+
+PROXIES_CONFIABLES = os.getenv("PROXIES_CONFIABLES", "")
+
+
+class ResolutorIP:
+    def __init__(self, confiables: str = PROXIES_CONFIABLES):
+        self.todos = confiables.strip() == "*"
+        self.redes = () if self.todos else tuple(
+            ipaddress.ip_network(red.strip(), strict=False) for red in confiables.split(",") if red.strip()
+        )
+
+    def confiable(self, ip: str) -> bool:
+        if self.todos:
+            return True
+        try:
+            direccion = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return any(direccion in red for red in self.redes)
+
+    def ip(self, request: Request) -> str:
+        ip = request.client.host if request.client else "desconocida"
+        if not self.confiable(ip):
+            return ip
+        saltos = [s.strip() for s in ",".join(request.headers.getlist("x-forwarded-for")).split(",") if s.strip()]
+        for salto in reversed(saltos):
+            ip = salto
+            if self.todos or not self.confiable(salto):
+                break
+        return ip
+
+
+resolutor_ip = ResolutorIP()
+
+
+def ip_cliente(request: Request) -> str:
+    return resolutor_ip.ip(request)
@@ -1,3 +1,4 @@
+import calendar
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 import os
@@ -17,11 +18,28 @@ def crear_token(data: dict, expires_delta: timedelta | None = None) -> str:
     if "sub" not in to_encode:
         raise ValueError("El token debe contener un 'sub' con el id del usuario")
 
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    # python-jose exige que "sub" sea texto; el id se vuelve a convertir a int en get_current_user
+    to_encode["sub"] = str(to_encode["sub"])
+
+    ahora = datetime.utcnow()
+    expire = ahora + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # iat permite revocar los tokens emitidos antes de un cambio (security/revocacion.py);
+    # con microsegundos para distinguir un login del cambio de contraseña del mismo segundo
+    iat = calendar.timegm(ahora.utctimetuple()) + ahora.microsecond / 1_000_000
+    to_encode.update({"exp": expire, "iat": iat})
 
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def claims_usuario(usuario) -> dict:
+    """Claims con los que AUTH_MODO=sin_estado arma el usuario actual sin consultar la base"""
+    return {
+        "sub": usuario.id_usuario,
+        "rol_id": usuario.rol_id,
+        "nombre": usuario.nombre_usuario,
+        "apellido": usuario.apellido_usuario,
+        "correo": usuario.correo_usuario,
+    }
+
 def verificar_token_jwt(token: str) -> Optional[dict]:
     """Verifica y decodifica un JWT"""
     try:
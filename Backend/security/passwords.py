@@ -1,8 +1,25 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
+load_dotenv()
+
 # Configuración de bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt libera el GIL mientras calcula el hash: con hilos basta para no bloquear el event loop.
+# HASH_HILOS limita cuántos hashes corren a la vez (idealmente <= núcleos del servidor) y
+# HASH_COLA_MAXIMA cuántos pueden esperar; por encima se responde 503 en vez de acumular latencia.
+HASH_HILOS = int(os.getenv("HASH_HILOS", str(min(4, os.cpu_count() or 1))))
+HASH_COLA_MAXIMA = int(os.getenv("HASH_COLA_MAXIMA", "64"))
+
+
 def encriptar_contrasena(password: str) -> str:
     """Genera un hash seguro de la contraseña"""
     return pwd_context.hash(password)
@@ -10,3 +27,78 @@ def encriptar_contrasena(password: str) -> str:
 def verificar_contrasena(plain_password: str, hashed_password: str) -> bool:
     """Verifica que la contraseña ingresada coincida con el hash almacenado"""
     return pwd_context.verify(plain_password, hashed_password)
+
+
+class PoolHash:
+    """Pool de hilos acotado para bcrypt, con métricas de cola"""
+
+    def __init__(self, hilos: int, cola_maxima: int):
+        self.hilos = hilos
+        self.cola_maxima = cola_maxima
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pendientes = 0  # en cola + en curso
+        self.en_curso = 0
+        self.cola_maxima_observada = 0
+        self.completadas = 0
+        self.rechazadas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.duracion_total = 0.0
+
+    def _tarea(self, encolada: float, funcion, args):
+        inicio = time.perf_counter()
+        with self._lock:
+            self.en_curso += 1
+            espera = inicio - encolada
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+        try:
+            return funcion(*args)
+        finally:
+            with self._lock:
+                self.en_curso -= 1
+                self.completadas += 1
+                self.duracion_total += time.perf_counter() - inicio
+
+    async def ejecutar(self, funcion, *args):
+        with self._lock:
+            if self.pendientes >= self.hilos + self.cola_maxima:
+                self.rechazadas += 1
+                raise HTTPException(status_code=503, detail="Servidor ocupado, intenta de nuevo en unos segundos",
+                                    headers={"Retry-After": "1"})
+            self.pendientes += 1
+            self.cola_maxima_observada = max(self.cola_maxima_observada, self.pendientes - self.en_curso)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._tarea, time.perf_counter(), funcion, args)
+        finally:
+            with self._lock:
+                self.pendientes -= 1
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "hilos": self.hilos,
+                "cola_maxima": self.cola_maxima,
+                "en_curso": self.en_curso,
+                "en_cola": self.pendientes - self.en_curso,
+                "cola_maxima_observada": self.cola_maxima_observada,
+                "completadas": self.completadas,
+                "rechazadas": self.rechazadas,
+                "espera_promedio_ms": round(self.espera_total * 1000 / self.completadas, 2) if self.completadas else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima * 1000, 2),
+                "duracion_promedio_ms": round(self.duracion_total * 1000 / self.completadas, 2) if self.completadas else 0.0,
+            }
+
+
+pool_hash = PoolHash(HASH_HILOS, HASH_COLA_MAXIMA)
+
+
+async def encriptar_contrasena_async(password: str) -> str:
+    """encriptar_contrasena en el pool de bcrypt (para handlers async)"""
+    return await pool_hash.ejecutar(encriptar_contrasena, password)
+
+async def verificar_contrasena_async(plain_password: str, hashed_password: str) -> bool:
+    """verificar_contrasena en el pool de bcrypt (para handlers async)"""
+    return await pool_hash.ejecutar(verificar_contrasena, plain_password, hashed_password)
@@ -0,0 +1,95 @@
+# security/principal.py
+"""
+Cache del usuario autenticado para get_current_user.
+
+Guarda una copia inmutable de las columnas del usuario por id_usuario, así
+las peticiones autenticadas no consultan la tabla usuario cada vez. Cualquier
+commit que modifique o borre un Usuario (update_user, reset de contraseña,
+cambio de rol, bloqueo por intentos...) lo saca de la cache. Con varios
+workers, los demás procesos pueden ver el dato viejo hasta PRINCIPAL_CACHE_TTL.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.usuario import Usuario
+from utils.cache_lru import CacheLRU
+
+load_dotenv()
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_MAXIMO = int(os.getenv("PRINCIPAL_CACHE_MAXIMO", "10000"))
+
+
+@dataclass(frozen=True)
+class UsuarioActual:
+    """Columnas de Usuario que usan las rutas; se comparte entre peticiones, por eso es inmutable"""
+    id_usuario: int
+    nombre_usuario: str | None
+    apellido_usuario: str | None
+    correo_usuario: str | None
+    rol_id: int
+    foto_usuario: str | None = None
+    correo_inmediato: bool = True
+    bloqueado_hasta: datetime | None = None
+
+    @classmethod
+    def desde_modelo(cls, usuario: Usuario) -> "UsuarioActual":
+        return cls(
+            id_usuario=usuario.id_usuario,
+            nombre_usuario=usuario.nombre_usuario,
+            apellido_usuario=usuario.apellido_usuario,
+            correo_usuario=usuario.correo_usuario,
+            foto_usuario=usuario.foto_usuario,
+            rol_id=usuario.rol_id,
+            correo_inmediato=bool(usuario.correo_inmediato),
+            bloqueado_hasta=usuario.bloqueado_hasta,
+        )
+
+    @classmethod
+    def desde_claims(cls, payload: dict) -> "UsuarioActual":
+        """Usuario armado con los claims del token (AUTH_MODO=sin_estado); sin foto ni preferencias"""
+        return cls(
+            id_usuario=int(payload["sub"]),
+            nombre_usuario=payload.get("nombre"),
+            apellido_usuario=payload.get("apellido"),
+            correo_usuario=payload.get("correo"),
+            rol_id=payload["rol_id"],
+        )
+
+
+cache_principal = CacheLRU(PRINCIPAL_CACHE_MAXIMO, ttl=PRINCIPAL_CACHE_TTL)
+
+
+def invalidar_usuario(*ids):
+    cache_principal.invalidar(*ids)
+
+
+# Invalidación automática: se anotan los usuarios tocados en cada flush y se
+# sacan de la cache recién en el commit, para que otra petición no vuelva a
+# cachear la fila vieja entre el flush y el commit.
+@event.listens_for(Session, "after_flush")
+def _anotar_usuarios_modificados(session, flush_context):
+    # is_modified descarta asignaciones sin cambio real (p. ej. el login reinicia intentos_fallidos = 0)
+    modificados = (obj for obj in session.dirty if isinstance(obj, Usuario) and session.is_modified(obj))
+    borrados = (obj for obj in session.deleted if isinstance(obj, Usuario))
+    ids = {obj.id_usuario for obj in chain(modificados, borrados)}
+    if ids:
+        session.info.setdefault("usuarios_modificados", set()).update(ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_usuarios_modificados(session):
+    ids = session.info.pop("usuarios_modificados", None)
+    if ids:
+        invalidar_usuario(*ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_usuarios_modificados(session):
+    session.info.pop("usuarios_modificados", None)
@@ -0,0 +1,196 @@
+# security/revocacion.py
+"""
+Revocación de tokens para el modo sin estado (AUTH_MODO=sin_estado).
+
+En ese modo get_current_user arma el usuario con los claims del JWT sin
+consultar la base, así que un cambio de contraseña, un bloqueo o un cambio
+de rol no se notaría hasta que el token expire. Para cortarlo, esos cambios
+guardan en token_revocado "los tokens de este usuario emitidos antes de X ya
+no valen", en la misma transacción que el cambio.
+
+Cada worker mantiene esas revocaciones en memoria detrás de un filtro de
+Bloom: casi todas las peticiones son de usuarios sin revocaciones y se
+resuelven con el filtro, sin tocar el dict ni la base. Las revocaciones de
+otros workers se leen de la tabla cada REVOCACION_SINCRONIZAR_S segundos.
+Una revocación deja de importar cuando ya expiraron todos los tokens
+anteriores a ella (ACCESS_TOKEN_EXPIRE_MINUTES), y ahí se borra.
+
+revocado_desde y el iat de los tokens (security/jwt.py) tienen resolución de
+microsegundos: un login justo después de un cambio de contraseña, aunque sea
+en el mismo segundo, emite un token válido.
+
+Con AUTH_MODO=cache nadie lee token_revocado (el usuario sale de la base en
+cada petición) y no se escribe.
+
+Cada sincronización relee todas las revocaciones vigentes (la tabla solo
+guarda las de esa ventana, una fila por usuario) en vez de pedir las
+posteriores a la última vista: una transacción que confirma tarde puede
+traer un revocado_desde anterior a otro ya leído, y con una marca de agua
+ese worker no la vería nunca.
+"""
+import calendar
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, event, inspect, insert, select
+from sqlalchemy.orm import Session
+
+from db.session import SessionLocal
+from models.token_revocado import TokenRevocado
+from models.usuario import Usuario
+from security.jwt import ACCESS_TOKEN_EXPIRE_MINUTES
+from utils.bloom import FiltroBloom
+
+load_dotenv()
+
+REVOCACION_SINCRONIZAR_S = float(os.getenv("REVOCACION_SINCRONIZAR_S", "5"))
+# Las revocaciones solo se guardan en el modo que las lee (security/auth.AUTH_MODO)
+REVOCACION_ACTIVA = os.getenv("AUTH_MODO", "cache") == "sin_estado"
+VIGENCIA_REVOCACION = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+# Cambios de Usuario que invalidan los tokens ya emitidos
+COLUMNAS_QUE_REVOCAN = ("contrasena_usuario", "rol_id", "bloqueado_hasta")
+
+
+def _epoch(fecha: datetime) -> float:
+    """Segundos desde 1970 con microsegundos, como el iat de security/jwt.crear_token"""
+    return calendar.timegm(fecha.utctimetuple()) + fecha.microsecond / 1_000_000
+
+
+class RegistroRevocaciones:
+    def __init__(self, capacidad: int = 1024):
+        self._lock = threading.Lock()
+        self._sincronizando = threading.Lock()
+        self._desde = {}  # id_usuario -> epoch desde el que sus tokens no valen
+        self._filtro = FiltroBloom(capacidad)
+        self._ultima_sincronizacion = None
+        self.consultas = 0
+        self.resueltas_por_filtro = 0
+        self.falsos_positivos = 0
+        self.rechazados = 0
+
+    def registrar(self, id_usuario: int, desde: datetime):
+        epoch = _epoch(desde)
+        with self._lock:
+            anterior = self._desde.get(id_usuario)
+            if anterior is not None and anterior >= epoch:
+                return
+            self._desde[id_usuario] = epoch
+            if anterior is None:
+                if self._filtro.lleno:
+                    self._reconstruir(self._filtro.capacidad * 2)
+                else:
+                    self._filtro.agregar(id_usuario)
+
+    def _reconstruir(self, capacidad: int):
+        filtro = FiltroBloom(max(capacidad, 1024))
+        for id_usuario in self._desde:
+            filtro.agregar(id_usuario)
+        self._filtro = filtro
+
+    def revocado(self, id_usuario: int, iat) -> bool:
+        """True si el token (emitido en `iat`) es anterior a una revocación del usuario"""
+        self.consultas += 1
+        if id_usuario not in self._filtro:
+            self.resueltas_por_filtro += 1
+            return False
+        desde = self._desde.get(id_usuario)
+        if desde is None:
+            self.falsos_positivos += 1
+            return False
+        if iat is None or iat < desde:
+            self.rechazados += 1
+            return True
+        return False
+
+    def sincronizar(self, db):
+        """Trae las revocaciones vigentes de la tabla y olvida (y borra) las vencidas"""
+        limite = datetime.utcnow() - VIGENCIA_REVOCACION
+        # registrar() se queda con la más reciente por usuario: releer las ya vistas no cambia nada
+        consulta = select(TokenRevocado.id_usuario, TokenRevocado.revocado_desde).where(
+            TokenRevocado.revocado_desde >= limite
+        )
+        for id_usuario, revocado_desde in db.execute(consulta):
+            self.registrar(id_usuario, revocado_desde)
+
+        with self._lock:
+            vigentes = {i: d for i, d in self._desde.items() if d >= _epoch(limite)}
+            if len(vigentes) != len(self._desde):
+                self._desde = vigentes
+                self._reconstruir(len(vigentes) * 2)
+        db.execute(delete(TokenRevocado).where(TokenRevocado.revocado_desde < limite))
+        db.commit()
+
+    def sincronizar_si_toca(self):
+        """Sincroniza como mucho cada REVOCACION_SINCRONIZAR_S; un solo hilo a la vez"""
+        ahora = time.monotonic()
+        if self._ultima_sincronizacion is not None and ahora - self._ultima_sincronizacion < REVOCACION_SINCRONIZAR_S:
+            return
+        if not self._sincronizando.acquire(blocking=False):
+            return
+        try:
+            with SessionLocal() as db:
+                db.info["usar_primario"] = True
+                self.sincronizar(db)
+            self._ultima_sincronizacion = ahora
+        finally:
+            self._sincronizando.release()
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "revocaciones": len(self._desde),
+                "filtro_bytes": self._filtro.bytes,
+                "filtro_hashes": self._filtro.hashes,
+                "consultas": self.consultas,
+                "resueltas_por_filtro": self.resueltas_por_filtro,
+                "falsos_positivos": self.falsos_positivos,
+                "rechazados": self.rechazados,
+            }
+
+
+revocaciones = RegistroRevocaciones()
+
+
+def _revoca(usuario: Usuario) -> bool:
+    estado = inspect(usuario)
+    for columna in COLUMNAS_QUE_REVOCAN:
+        historial = estado.attrs[columna].history
+        if not historial.has_changes():
+            continue
+        # Desbloquear (bloqueado_hasta = None) no invalida nada
+        if columna == "bloqueado_hasta" and not historial.added[0]:
+            continue
+        return True
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _guardar_revocaciones(session, flush_context):
+    if not REVOCACION_ACTIVA:
+        return
+    ids = {u.id_usuario for u in session.dirty if isinstance(u, Usuario) and _revoca(u)}
+    ids |= {u.id_usuario for u in session.deleted if isinstance(u, Usuario)}
+    if not ids:
+        return
+    # Con microsegundos: caen los tokens emitidos antes del cambio, no los de un login posterior
+    desde = datetime.utcnow()
+    conexion = session.connection()
+    for id_usuario in ids:
+        conexion.execute(delete(TokenRevocado).where(TokenRevocado.id_usuario == id_usuario))
+        conexion.execute(insert(TokenRevocado).values(id_usuario=id_usuario, revocado_desde=desde))
+    session.info.setdefault("revocaciones", {}).update({i: desde for i in ids})
+
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_revocaciones(session):
+    # En este worker la revocación vale desde ya; los demás la leen al sincronizar
+    for id_usuario, desde in session.info.pop("revocaciones", {}).items():
+        revocaciones.registrar(id_usuario, desde)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_revocaciones(session):
+    session.info.pop("revocaciones", None)
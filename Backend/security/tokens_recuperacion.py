@@ -0,0 +1,109 @@
+# security/tokens_recuperacion.py
+"""
+Tokens de recuperación de contraseña.
+
+El token viaja solo en el enlace del correo; en la tabla token_recuperacion
+se guarda su sha256, así una copia de la base no sirve para cambiar
+contraseñas. El correo pendiente en la cola (correo_pendiente) lleva el
+token solo hasta que se envía: el trabajador lo borra de sus datos al
+enviarlo o descartarlo (services/cola_correos.py). La búsqueda es por igualdad sobre el hash (índice único) y cada
+usuario tiene como mucho un token vigente: pedir otro o usarlo borra los
+anteriores.
+
+Los tokens que nadie usó se borran por lotes con el barrido periódico de
+este módulo (arranca con la app, ver lifespan en main.py), para que la
+tabla no crezca.
+"""
+import hashlib
+import json
+import logging
+import os
+import secrets
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+
+from db.session import AsyncSessionLocal
+from models.token_recuperacion import TokenRecuperacion
+from services.tarea_periodica import TareaPeriodica
+
+load_dotenv()
+
+logger = logging.getLogger("sn52.tokens")
+
+RECUPERACION_VIGENCIA_MINUTOS = int(os.getenv("RECUPERACION_VIGENCIA_MINUTOS", "60"))
+RECUPERACION_BARRIDO_ACTIVO = os.getenv("RECUPERACION_BARRIDO_ACTIVO", "1") == "1"
+RECUPERACION_BARRIDO_MINUTOS = float(os.getenv("RECUPERACION_BARRIDO_MINUTOS", "15"))
+RECUPERACION_BARRIDO_LOTE = int(os.getenv("RECUPERACION_BARRIDO_LOTE", "1000"))
+# Solo para desarrollo: /auth/recuperar-password devuelve el enlace con el token en la respuesta
+RECUPERACION_LINK_PRUEBA = os.getenv("RECUPERACION_LINK_PRUEBA", "0") == "1"
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def crear_token_recuperacion(db, usuario_id: int) -> str:
+    """Genera un token nuevo para el usuario y descarta los anteriores. No hace commit."""
+    db.execute(delete(TokenRecuperacion).where(TokenRecuperacion.usuario_id == usuario_id))
+    token = secrets.token_urlsafe(32)
+    db.add(TokenRecuperacion(
+        token_hash=hash_token(token),
+        usuario_id=usuario_id,
+        expira=datetime.utcnow() + timedelta(minutes=RECUPERACION_VIGENCIA_MINUTOS),
+        fecha_creacion=datetime.utcnow(),
+    ))
+    return token
+
+
+def buscar_token_recuperacion(db, token: str) -> TokenRecuperacion | None:
+    """Fila del token (vigente o vencido: el llamador decide el mensaje), o None si no existe"""
+    return db.scalars(select(TokenRecuperacion).where(TokenRecuperacion.token_hash == hash_token(token))).first()
+
+
+def token_vencido(fila: TokenRecuperacion) -> bool:
+    return fila.expira < datetime.utcnow()
+
+
+def consumir_tokens_recuperacion(db, usuario_id: int):
+    """Borra los tokens del usuario después de cambiar la contraseña. No hace commit."""
+    db.execute(delete(TokenRecuperacion).where(TokenRecuperacion.usuario_id == usuario_id))
+
+
+async def purgar_tokens_vencidos(session_factory=AsyncSessionLocal, lote: int = RECUPERACION_BARRIDO_LOTE) -> int:
+    """Borra los tokens vencidos de a `lote` filas por transacción; devuelve cuántos borró"""
+    total = 0
+    while True:
+        async with session_factory() as db:
+            ids = (await db.scalars(
+                select(TokenRecuperacion.id_token)
+                .where(TokenRecuperacion.expira < datetime.utcnow())
+                .order_by(TokenRecuperacion.expira)
+                .limit(lote)
+            )).all()
+            if ids:
+                await db.execute(delete(TokenRecuperacion).where(TokenRecuperacion.id_token.in_(ids)))
+                await db.commit()
+        total += len(ids)
+        if len(ids) < lote:
+            return total
+
+
+class BarridoTokens(TareaPeriodica):
+    """Corre purgar_tokens_vencidos cada RECUPERACION_BARRIDO_MINUTOS"""
+
+    logger = logger
+    mensaje_error = "Error en el barrido de tokens de recuperación"
+
+    def __init__(self, intervalo_minutos: float = RECUPERACION_BARRIDO_MINUTOS):
+        super().__init__(intervalo_minutos * 60)
+
+    async def paso(self):
+        borrados = await purgar_tokens_vencidos()
+        if borrados:
+            logger.info(json.dumps({"evento": "tokens_recuperacion_purgados", "cantidad": borrados}))
+        # purgar_tokens_vencidos ya borra todo lo vencido: siempre se espera al siguiente barrido
+
+
+barrido_tokens = BarridoTokens()
@@ -0,0 +1,135 @@
+# Backend/services/cache_respuestas.py
+"""
+Cache en memoria de respuestas JSON ya serializadas (detalle de noticia y
+primeras páginas del listado).
+
+La clave incluye el ETag de db/validadores.py, que cambia con cada
+escritura: una entrada nunca se sirve después de que su noticia cambió, ni
+siquiera si la escritura la hizo otro worker. Además, al hacer commit de un
+cambio se borran en este proceso las entradas afectadas para liberar
+memoria enseguida.
+
+Si llegan varias peticiones por la misma clave mientras no está en cache
+(una noticia que se vuelve tendencia), solo la primera consulta la base y
+serializa; las demás esperan ese resultado (single-flight).
+"""
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from fastapi import Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+CACHE_RESPUESTAS_MAXIMO = int(os.getenv("CACHE_RESPUESTAS_MAXIMO", "512"))  # entradas
+CACHE_RESPUESTAS_ACTIVA = os.getenv("CACHE_RESPUESTAS_ACTIVA", "1") == "1"
+
+
+class CacheRespuestas:
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self._datos = OrderedDict()  # clave -> (cuerpo, cabeceras, etiquetas)
+        self._en_vuelo = {}  # clave -> asyncio.Future del cargador en curso
+        self._lock = threading.Lock()  # las invalidaciones pueden llegar desde hilos (sesiones síncronas)
+        self.aciertos = 0
+        self.fallos = 0
+        self.esperas = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            self._datos.move_to_end(clave)
+            return entrada[0], entrada[1]
+
+    def guardar(self, clave, cuerpo: bytes, cabeceras: dict, etiquetas):
+        with self._lock:
+            self._datos[clave] = (cuerpo, cabeceras, frozenset(etiquetas))
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    async def obtener_o_cargar(self, clave, etiquetas, cargador):
+        """
+        (cuerpo, cabeceras) de la cache o de `cargador` (corrutina sin argumentos).
+        Con varias peticiones simultáneas por la misma clave, el cargador corre una sola vez.
+        """
+        entrada = self.obtener(clave)
+        if entrada is not None:
+            self.aciertos += 1
+            return entrada
+
+        en_vuelo = self._en_vuelo.get(clave)
+        if en_vuelo is not None:
+            self.esperas += 1
+            try:
+                return await asyncio.shield(en_vuelo)
+            except Exception:
+                # Falló (o se canceló) la petición que cargaba: esta lo intenta por su cuenta
+                return await cargador()
+
+        self.fallos += 1
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_vuelo[clave] = futuro
+        try:
+            cuerpo, cabeceras = await cargador()
+        except BaseException as error:
+            futuro.set_exception(error if isinstance(error, Exception) else RuntimeError("carga cancelada"))
+            futuro.exception()  # marcada como leída aunque nadie esperara
+            raise
+        finally:
+            self._en_vuelo.pop(clave, None)
+        self.guardar(clave, cuerpo, cabeceras, etiquetas)
+        futuro.set_result((cuerpo, cabeceras))
+        return cuerpo, cabeceras
+
+    def invalidar(self, *etiquetas):
+        """Borra las entradas que dependen de alguna de las etiquetas (claves de validador_cache)"""
+        etiquetas = set(etiquetas)
+        with self._lock:
+            borrar = [clave for clave, (_, _, suyas) in self._datos.items() if suyas & etiquetas]
+            for clave in borrar:
+                del self._datos[clave]
+            self.invalidaciones += len(borrar)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = self.fallos = self.esperas = self.invalidaciones = 0
+
+    def resumen(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "activa": CACHE_RESPUESTAS_ACTIVA,
+                "entradas": len(self._datos),
+                "bytes": sum(len(cuerpo) for cuerpo, _, _ in self._datos.values()),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "esperas_single_flight": self.esperas,
+                "invalidaciones": self.invalidaciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+            }
+
+
+cache_respuestas = CacheRespuestas(CACHE_RESPUESTAS_MAXIMO)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_respuestas(session):
+    # db/validadores.py anota en cada flush las claves que incrementó
+    claves = session.info.pop("validadores_modificados", None)
+    if claves:
+        cache_respuestas.invalidar(*claves)
+
+
+def respuesta_json(cuerpo: bytes, response: Response, cabeceras: dict | None = None) -> Response:
+    """Respuesta con el JSON ya serializado y los validadores que la ruta puso en `response`"""
+    validadores = {k: v for k, v in response.headers.items() if k in ("etag", "last-modified", "cache-control")}
+    return Response(content=cuerpo, media_type="application/json", headers={**validadores, **(cabeceras or {})})
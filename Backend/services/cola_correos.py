@@ -0,0 +1,270 @@
+# Backend/services/cola_correos.py
+"""
+Cola persistente (outbox) de correos salientes.
+
+Los handlers no llaman a Mailjet: guardan el correo en la tabla
+correo_pendiente dentro de la misma transacción que el registro, la
+noticia o el token, y el trabajador de este módulo lo envía en segundo plano.
+Si Mailjet falla se reintenta con espera exponencial; después de
+CORREOS_MAX_INTENTOS el correo queda en estado "fallido" (dead letter)
+para revisarlo a mano.
+
+El trabajador arranca con la app (lifespan en main.py). Con varios workers
+de uvicorn cada uno tiene el suyo: el SELECT ... FOR UPDATE SKIP LOCKED
+evita que dos procesos tomen el mismo correo. También se puede correr
+aparte con `python -m services.cola_correos` y poner CORREOS_WORKER_ACTIVO=0
+en la API.
+
+Resumen para editores: los borradores de los editores sin correo_inmediato
+se guardan en estado "agrupando" hasta el fin de la ventana
+(RESUMEN_BORRADORES_MINUTOS). Al cerrarla el trabajador los junta en un
+solo correo por editor.
+"""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import select, delete
+
+from db.session import AsyncSessionLocal
+from models.correo_pendiente import CorreoPendiente
+from services.tarea_periodica import TareaPeriodica
+from services.mail_service import (
+    enviar_lote, mensaje_bienvenida, mensaje_recuperacion, mensaje_borrador, mensaje_resumen_borradores,
+    MAILJET_MAX_MENSAJES
+)
+
+load_dotenv()
+
+logger = logging.getLogger("sn52.correos")
+
+PENDIENTE = "pendiente"
+ENVIANDO = "enviando"
+ENVIADO = "enviado"
+FALLIDO = "fallido"
+AGRUPANDO = "agrupando"  # borrador retenido hasta el próximo resumen del editor
+
+# Tipo de correo -> función que arma el mensaje de Mailjet a partir de los datos guardados
+CONSTRUCTORES = {
+    "bienvenida": mensaje_bienvenida,
+    "recuperacion": mensaje_recuperacion,
+    "borrador": mensaje_borrador,
+    "resumen_borradores": mensaje_resumen_borradores,
+}
+
+CORREOS_WORKER_ACTIVO = os.getenv("CORREOS_WORKER_ACTIVO", "1") == "1"
+CORREOS_INTERVALO = float(os.getenv("CORREOS_INTERVALO", "2"))  # segundos entre sondeos si la cola está vacía
+# Por defecto un lote del trabajador cabe en una sola llamada a Mailjet
+CORREOS_LOTE = int(os.getenv("CORREOS_LOTE", str(MAILJET_MAX_MENSAJES)))
+CORREOS_MAX_INTENTOS = int(os.getenv("CORREOS_MAX_INTENTOS", "6"))
+CORREOS_BACKOFF_BASE = float(os.getenv("CORREOS_BACKOFF_BASE", "30"))  # segundos
+CORREOS_BACKOFF_MAXIMO = float(os.getenv("CORREOS_BACKOFF_MAXIMO", "3600"))
+# Si un proceso muere con correos en "enviando", otro los retoma pasado este tiempo
+CORREOS_LEASE = float(os.getenv("CORREOS_LEASE", "120"))
+# Ventana del resumen de borradores para editores
+RESUMEN_BORRADORES_MINUTOS = int(os.getenv("RESUMEN_BORRADORES_MINUTOS", "60"))
+# Los correos enviados se borran después de estos días
+CORREOS_RETENCION_DIAS = int(os.getenv("CORREOS_RETENCION_DIAS", "7"))
+# Datos que solo hacen falta para armar el mensaje: no se guardan una vez enviado (o descartado)
+# el correo. El token de recuperación en la tabla bastaría para cambiar la contraseña.
+DATOS_SECRETOS = ("token",)
+
+
+def encolar_correo(db, tipo: str, **datos) -> CorreoPendiente:
+    """
+    Agrega un correo a la cola usando la sesión del handler (síncrona o async).
+    No hace commit: el correo se guarda con el commit del propio handler.
+    """
+    if tipo not in CONSTRUCTORES:
+        raise ValueError(f"Tipo de correo desconocido: {tipo}")
+    correo = CorreoPendiente(
+        tipo=tipo,
+        datos=json.dumps(datos, ensure_ascii=False),
+        estado=PENDIENTE,
+        intentos=0,
+        proximo_intento=datetime.utcnow(),
+        fecha_creacion=datetime.utcnow(),
+    )
+    db.add(correo)
+    return correo
+
+
+def fin_ventana_resumen(ahora: datetime, minutos: int = RESUMEN_BORRADORES_MINUTOS) -> datetime:
+    """Cierre de la ventana de resumen que contiene `ahora` (ventanas alineadas: 10:00, 11:00...)"""
+    origen = datetime(2000, 1, 1)
+    ventana = timedelta(minutes=minutos)
+    return origen + ((ahora - origen) // ventana + 1) * ventana
+
+
+def encolar_para_resumen(db, destinatario: dict, titulo_noticia: str, escritor_nombre: str) -> CorreoPendiente:
+    """Retiene el aviso de un borrador hasta el resumen del editor (destinatario: dict con 'email' y 'nombre')"""
+    correo = encolar_correo(db, "borrador", destinatarios=[destinatario], titulo_noticia=titulo_noticia, escritor_nombre=escritor_nombre)
+    correo.estado = AGRUPANDO
+    correo.proximo_intento = fin_ventana_resumen(datetime.utcnow())
+    return correo
+
+
+def calcular_espera(intentos: int, base: float = CORREOS_BACKOFF_BASE, maximo: float = CORREOS_BACKOFF_MAXIMO) -> float:
+    """Segundos hasta el siguiente intento: base, 2*base, 4*base... con tope"""
+    return min(base * (2 ** max(intentos - 1, 0)), maximo)
+
+
+class TrabajadorCorreos(TareaPeriodica):
+    """Saca correos de la cola y los envía a Mailjet con reintentos"""
+
+    logger = logger
+    mensaje_error = "Error procesando la cola de correos"
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        lote: int = CORREOS_LOTE,
+        intervalo: float = CORREOS_INTERVALO,
+        max_intentos: int = CORREOS_MAX_INTENTOS,
+        backoff_base: float = CORREOS_BACKOFF_BASE,
+        backoff_maximo: float = CORREOS_BACKOFF_MAXIMO,
+    ):
+        super().__init__(intervalo)
+        self.session_factory = session_factory
+        self.lote = lote
+        self.max_intentos = max_intentos
+        self.backoff_base = backoff_base
+        self.backoff_maximo = backoff_maximo
+        self._ultima_purga = None
+
+    async def tomar_lote(self) -> list:
+        """Marca como "enviando" los correos vencidos; otros procesos se saltan las filas bloqueadas"""
+        ahora = datetime.utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(CorreoPendiente)
+                .where(
+                    CorreoPendiente.estado.in_([PENDIENTE, ENVIANDO]),
+                    CorreoPendiente.proximo_intento <= ahora,
+                )
+                .order_by(CorreoPendiente.proximo_intento)
+                .limit(self.lote)
+                .with_for_update(skip_locked=True)
+            )
+            correos = result.scalars().all()
+            for correo in correos:
+                correo.estado = ENVIANDO
+                correo.proximo_intento = ahora + timedelta(seconds=CORREOS_LEASE)
+            await db.commit()
+        return correos
+
+    async def agrupar_resumenes(self) -> int:
+        """Convierte los borradores retenidos de ventanas cerradas en un correo de resumen por editor"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(CorreoPendiente)
+                .where(CorreoPendiente.estado == AGRUPANDO, CorreoPendiente.proximo_intento <= datetime.utcnow())
+                .order_by(CorreoPendiente.id_correo)
+                .with_for_update(skip_locked=True)
+            )
+            retenidos = result.scalars().all()
+            if not retenidos:
+                return 0
+
+            resumenes = {}
+            for correo in retenidos:
+                datos = json.loads(correo.datos)
+                editor = datos["destinatarios"][0]
+                resumen = resumenes.setdefault(
+                    editor["email"], {"destinatario": editor["email"], "nombre": editor["nombre"], "borradores": []}
+                )
+                resumen["borradores"].append({"titulo": datos["titulo_noticia"], "escritor": datos["escritor_nombre"]})
+                await db.delete(correo)
+            for resumen in resumenes.values():
+                encolar_correo(db, "resumen_borradores", **resumen)
+            await db.commit()
+        return len(resumenes)
+
+    @staticmethod
+    def borrar_secretos(correo: CorreoPendiente):
+        datos = json.loads(correo.datos)
+        if any(clave in datos for clave in DATOS_SECRETOS):
+            correo.datos = json.dumps({k: v for k, v in datos.items() if k not in DATOS_SECRETOS}, ensure_ascii=False)
+
+    def registrar_fallo(self, correo: CorreoPendiente, error: str):
+        """Programa el siguiente intento con espera exponencial o lo manda a dead letter"""
+        correo.intentos += 1
+        correo.ultimo_error = error[:500]
+        if correo.intentos >= self.max_intentos:
+            correo.estado = FALLIDO
+            self.borrar_secretos(correo)
+            logger.warning(json.dumps({"evento": "correo_fallido", "id": correo.id_correo, "tipo": correo.tipo, "intentos": correo.intentos, "error": correo.ultimo_error}))
+        else:
+            espera = calcular_espera(correo.intentos, self.backoff_base, self.backoff_maximo)
+            correo.estado = PENDIENTE
+            correo.proximo_intento = datetime.utcnow() + timedelta(seconds=espera)
+            logger.info(json.dumps({"evento": "correo_reintento", "id": correo.id_correo, "tipo": correo.tipo, "intentos": correo.intentos, "espera_s": espera}))
+
+    def registrar_envio(self, correo: CorreoPendiente):
+        correo.estado = ENVIADO
+        correo.intentos += 1
+        self.borrar_secretos(correo)
+        correo.ultimo_error = None
+        correo.fecha_envio = datetime.utcnow()
+
+    async def enviar(self, correos: list):
+        """Envía los correos en lotes de Mailjet y actualiza el estado de cada uno"""
+        por_enviar, mensajes = [], []
+        for correo in correos:
+            try:
+                mensajes.append(CONSTRUCTORES[correo.tipo](**json.loads(correo.datos)))
+                por_enviar.append(correo)
+            except Exception as e:
+                self.registrar_fallo(correo, f"No se pudo armar el mensaje: {e}")
+        if not mensajes:
+            return
+
+        # Un solo POST por cada MAILJET_MAX_MENSAJES; requests es síncrono, lo sacamos del event loop
+        resultados = await asyncio.to_thread(enviar_lote, mensajes)
+        for correo, resultado in zip(por_enviar, resultados):
+            if resultado.ok:
+                self.registrar_envio(correo)
+            else:
+                self.registrar_fallo(correo, resultado.error)
+
+    async def procesar_lote(self) -> int:
+        """Envía un lote de la cola; devuelve cuántos correos tomó"""
+        correos = await self.tomar_lote()
+        if not correos:
+            return 0
+        await self.enviar(correos)
+        async with self.session_factory() as db:
+            for correo in correos:
+                db.add(correo)
+            await db.commit()
+        return len(correos)
+
+    async def purgar_enviados(self):
+        """Borra los correos enviados hace más de CORREOS_RETENCION_DIAS"""
+        limite = datetime.utcnow() - timedelta(days=CORREOS_RETENCION_DIAS)
+        async with self.session_factory() as db:
+            await db.execute(
+                delete(CorreoPendiente).where(CorreoPendiente.estado == ENVIADO, CorreoPendiente.fecha_envio < limite)
+            )
+            await db.commit()
+
+    async def paso(self) -> int:
+        await self.agrupar_resumenes()
+        procesados = await self.procesar_lote()
+        if self._ultima_purga is None or datetime.utcnow() - self._ultima_purga > timedelta(hours=1):
+            await self.purgar_enviados()
+            self._ultima_purga = datetime.utcnow()
+        # Si hubo correos puede haber más: se sigue sin esperar
+        return procesados
+
+
+trabajador_correos = TrabajadorCorreos()
+
+
+if __name__ == "__main__":
+    # Trabajador independiente: python -m services.cola_correos
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    asyncio.run(trabajador_correos.ejecutar())
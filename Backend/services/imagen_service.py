@@ -0,0 +1,86 @@
+# Backend/services/imagen_service.py
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import AsyncSessionLocal
+from models.imagen import Imagen
+from models.noticia import Noticia
+from utils.subidas import apartar_subida, restaurar_subida, descartar_subida
+
+
+async def imagenes_principales(db: AsyncSession, noticia_ids: list) -> dict:
+    """
+    Devuelve {noticia_id: url} con la primera imagen de cada noticia,
+    resolviendo toda la página en una sola consulta (usa ix_imagen_noticia_id).
+    """
+    if not noticia_ids:
+        return {}
+
+    primeras = (
+        select(Imagen.noticia_id, func.min(Imagen.id_imagen).label("id_imagen"))
+        .where(Imagen.noticia_id.in_(noticia_ids))
+        .group_by(Imagen.noticia_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(Imagen.noticia_id, Imagen.url).join(primeras, Imagen.id_imagen == primeras.c.id_imagen)
+    )
+    return {noticia_id: url for noticia_id, url in result.all()}
+
+
+async def recalcular_imagen_principal(db: AsyncSession, noticia: Noticia):
+    """
+    La imagen principal de una noticia es su primera imagen (la de menor id_imagen),
+    igual que en imagenes_principales y en la migración b1bcd52042c3. Se usa cuando se
+    borra o mueve la principal: pasa a ser la primera que le quede, o None.
+    """
+    principales = await imagenes_principales(db, [noticia.id_noticia])
+    noticia.imagen = principales.get(noticia.id_noticia)
+
+
+async def actualizar_imagen_principal(db: AsyncSession, noticia: Noticia):
+    """
+    Aplica la misma regla cuando la noticia gana una imagen (nueva o movida desde otra
+    noticia). Una portada subida aparte (POST /api/noticias/{id}/imagen, fuera de la
+    galería) se respeta.
+    """
+    if noticia.imagen:
+        de_galeria = await db.execute(
+            select(Imagen.id_imagen)
+            .where(Imagen.noticia_id == noticia.id_noticia, Imagen.url == noticia.imagen)
+            .limit(1)
+        )
+        if de_galeria.first() is None:
+            return
+    await recalcular_imagen_principal(db, noticia)
+
+
+async def ruta_en_uso(db: AsyncSession, ruta: str) -> bool:
+    """
+    True si alguna imagen o noticia sigue apuntando a `ruta`. Los archivos subidos se
+    nombran por contenido (utils/subidas.py): el mismo archivo puede estar en varias filas.
+    """
+    imagen = await db.execute(select(Imagen.id_imagen).where(Imagen.url == ruta).limit(1))
+    if imagen.first() is not None:
+        return True
+    noticia = await db.execute(select(Noticia.id_noticia).where(Noticia.imagen == ruta).limit(1))
+    return noticia.first() is not None
+
+
+async def borrar_subida_sin_uso(ruta: str, session_factory=AsyncSessionLocal):
+    """
+    Borra el archivo subido si ninguna fila lo usa. Se llama después del commit del
+    borrado (tarea en segundo plano): primero aparta el archivo y recién entonces
+    vuelve a mirar la base, así una subida que lo reutilizó y ya hizo commit lo
+    mantiene, y una que todavía no lo hizo lo repone en confirmar_subida().
+    """
+    apartado = await run_in_threadpool(apartar_subida, ruta)
+    if apartado is None:
+        return
+    async with session_factory() as db:
+        db.sync_session.info["usar_primario"] = True  # la réplica puede no ver el commit de la subida
+        en_uso = await ruta_en_uso(db, ruta)
+    if en_uso:
+        await run_in_threadpool(restaurar_subida, apartado, ruta)
+    else:
+        await run_in_threadpool(descartar_subida, apartado, ruta)
@@ -1,8 +1,13 @@
  # Backend/services/mail_service.py
-from mailjet_rest import Client
 import os
+from dataclasses import dataclass, field
+
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from services.plantillas_correo import renderizar
+
 # Cargar variables desde el archivo .env
 load_dotenv()
 
@@ -12,137 +17,188 @@ MAILJET_SECRET_KEY = os.getenv("MAILJET_SECRET_KEY")
 if not MAILJET_API_KEY or not MAILJET_SECRET_KEY:
     raise ValueError("⚠️ Faltan las claves de Mailjet en el archivo .env")
 
-# Inicializar cliente de Mailjet
-mailjet = Client(auth=(MAILJET_API_KEY, MAILJET_SECRET_KEY), version='v3.1')
+# URL base de la API; en pruebas apunta al Mailjet falso (tests/fakes/mailjet_falso.py)
+MAILJET_API_URL = os.getenv("MAILJET_API_URL", "https://api.mailjet.com/")
+# Límite de la API v3.1 de Mailjet: hasta 50 mensajes por llamada a /send
+MAILJET_MAX_MENSAJES = int(os.getenv("MAILJET_MAX_MENSAJES", "50"))
+MAILJET_TIMEOUT = float(os.getenv("MAILJET_TIMEOUT", "15"))
+MAILJET_POOL = int(os.getenv("MAILJET_POOL", "4"))  # conexiones keep-alive reutilizables
+
+# Sesión HTTP compartida: reutiliza las conexiones TLS con Mailjet entre envíos
+# (el cliente de mailjet_rest abría una conexión nueva en cada llamada)
+sesion_mailjet = requests.Session()
+sesion_mailjet.auth = (MAILJET_API_KEY, MAILJET_SECRET_KEY)
+_adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=MAILJET_POOL)
+sesion_mailjet.mount("https://", _adaptador)
+sesion_mailjet.mount("http://", _adaptador)
+
+
+class ErrorEnvioCorreo(Exception):
+    """Mailjet rechazó el envío o no respondió; la cola de correos lo reintenta"""
+
+
+@dataclass
+class ResultadoEnvio:
+    """Resultado de un mensaje dentro de un envío por lotes"""
+    ok: bool
+    error: str | None = None
+    ids: list = field(default_factory=list)  # MessageUUID de cada destinatario
+
+
+def _enviar_llamada(mensajes: list) -> list:
+    """Una llamada a /send con hasta MAILJET_MAX_MENSAJES mensajes"""
+    try:
+        response = sesion_mailjet.post(
+            f"{MAILJET_API_URL.rstrip('/')}/v3.1/send", json={"Messages": mensajes}, timeout=MAILJET_TIMEOUT
+        )
+    except requests.RequestException as e:
+        return [ResultadoEnvio(ok=False, error=f"Sin respuesta de Mailjet: {e}") for _ in mensajes]
+
+    try:
+        respuestas = response.json().get("Messages")
+    except ValueError:
+        respuestas = None
+
+    # Mailjet devuelve un estado por mensaje (también con 400 si solo algunos fallan).
+    # Sin esa lista (401, 5xx...) todo el lote falla con el mismo error.
+    if not isinstance(respuestas, list) or len(respuestas) != len(mensajes):
+        error = f"Mailjet respondió {response.status_code}: {response.text[:200]}"
+        return [ResultadoEnvio(ok=False, error=error) for _ in mensajes]
+
+    resultados = []
+    for respuesta in respuestas:
+        if respuesta.get("Status") == "success":
+            ids = [to.get("MessageUUID") for to in respuesta.get("To", [])]
+            resultados.append(ResultadoEnvio(ok=True, ids=ids))
+        else:
+            errores = "; ".join(e.get("ErrorMessage", "") for e in respuesta.get("Errors", []))
+            resultados.append(ResultadoEnvio(ok=False, error=f"Mailjet rechazó el mensaje: {errores or respuesta.get('Status')}"))
+    return resultados
+
+
+def enviar_lote(mensajes: list) -> list:
+    """
+    Envía muchos mensajes empaquetándolos en el arreglo Messages de Mailjet
+    (MAILJET_MAX_MENSAJES por llamada). Devuelve un ResultadoEnvio por mensaje,
+    en el mismo orden; no lanza excepciones.
+    """
+    resultados = []
+    for inicio in range(0, len(mensajes), MAILJET_MAX_MENSAJES):
+        resultados.extend(_enviar_llamada(mensajes[inicio:inicio + MAILJET_MAX_MENSAJES]))
+    return resultados
+
+
+def enviar_mensajes(mensajes: list) -> list:
+    """Envía los mensajes y lanza ErrorEnvioCorreo si alguno falló"""
+    resultados = enviar_lote(mensajes)
+    errores = [r.error for r in resultados if not r.ok]
+    if errores:
+        raise ErrorEnvioCorreo(errores[0])
+    return resultados
+
+
+REMITENTE = {
+    "Email": "dilanramirezv2007@gmail.com",  # Tu remitente Mailjet verificado
+    "Name": "SN-52 Noticias"
+}
+# 🔗 URL del frontend para los enlaces de los correos
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
+
+# Los cuerpos HTML están en templates/correos/ (services/plantillas_correo.py)
 
 
 # 📩 --- Correo de bienvenida ---
-def enviar_correo_bienvenida(destinatario: str, nombre: str):
-    data = {
-        'Messages': [
-            {
-                "From": {
-                    "Email": "dilanramirezv2007@gmail.com",  # Tu remitente Mailjet verificado
-                    "Name": "SN-52 Noticias"
-                },
-                "To": [{"Email": destinatario, "Name": nombre}],
-                "Subject": "🎉 ¡Bienvenido a SN-52!",
-                "HTMLPart": f"""
-                <html>
-                  <body style="font-family: Arial, sans-serif; color: #333; padding: 20px;">
-                    <div style="max-width: 600px; margin: auto; border: 1px solid #ddd; border-radius: 10px; padding: 20px;">
-                      <h2 style="color: #004aad;">👋 ¡Hola {nombre}!</h2>
-                      <p>Tu registro en <strong>SN-52</strong> fue exitoso.</p>
-                      <p>Gracias por unirte a nuestro periódico digital. A partir de ahora podrás estar al día con las noticias y novedades del SENA.</p>
-                      <p>Con aprecio,<br><strong>El equipo de SN-52</strong></p>
-                    </div>
-                  </body>
-                </html>
-                """
-            }
-        ]
+def mensaje_bienvenida(destinatario: str, nombre: str) -> dict:
+    return {
+        "From": REMITENTE,
+        "To": [{"Email": destinatario, "Name": nombre}],
+        "Subject": "🎉 ¡Bienvenido a SN-52!",
+        "HTMLPart": renderizar("bienvenida.html", {"nombre": nombre}, cache=False),
     }
+
+
+# 🔐 --- Correo de recuperación de contraseña ---
+def mensaje_recuperacion(destinatario: str, nombre: str, token: str) -> dict:
+    reset_link = f"{FRONTEND_URL}/reset-password?token={token}"
+    return {
+        "From": REMITENTE,
+        "To": [{"Email": destinatario, "Name": nombre}],
+        "Subject": "🔑 Recuperación de contraseña - SN-52",
+        # Lleva el token: no se guarda en la cache de render
+        "HTMLPart": renderizar("recuperacion.html", {"nombre": nombre, "reset_link": reset_link}, cache=False),
+    }
+
+
+# 📝 --- Correo de notificación de borrador ---
+def mensaje_borrador(destinatarios: list, titulo_noticia: str, escritor_nombre: str) -> dict:
+    """
+    Mensaje para los editores cuando un escritor guarda un borrador.
+    destinatarios: lista de dicts con 'email' y 'nombre'
+    """
+    # El cuerpo no depende del editor: todos los correos del mismo borrador salen de la cache
+    html = renderizar("borrador.html", {
+        "titulo_noticia": titulo_noticia,
+        "escritor_nombre": escritor_nombre,
+        "url_panel": f"{FRONTEND_URL}/dashboard",
+    })
+    return {
+        "From": REMITENTE,
+        "To": [{"Email": d["email"], "Name": d["nombre"]} for d in destinatarios],
+        "Subject": f"📝 Nuevo borrador disponible para revisión - {titulo_noticia}",
+        "HTMLPart": html,
+    }
+
+
+# 🗞️ --- Resumen de borradores para un editor ---
+def mensaje_resumen_borradores(destinatario: str, nombre: str, borradores: list) -> dict:
+    """
+    Un solo correo con todos los borradores guardados en la ventana del resumen.
+    borradores: lista de dicts con 'titulo' y 'escritor'
+    """
+    html = renderizar("resumen_borradores.html", {
+        "nombre": nombre,
+        "borradores": borradores,
+        "url_panel": f"{FRONTEND_URL}/dashboard",
+    }, cache=False)
+    return {
+        "From": REMITENTE,
+        "To": [{"Email": destinatario, "Name": nombre}],
+        "Subject": f"📝 {len(borradores)} borrador(es) pendientes de revisión - SN-52",
+        "HTMLPart": html,
+    }
+
+
+# --- Envío directo (síncrono) ---
+# Los handlers ya no los usan: encolan con services/cola_correos.py. Se mantienen
+# para scripts y pruebas manuales (test_mail.py).
+def enviar_correo_bienvenida(destinatario: str, nombre: str):
     try:
-        response = mailjet.send.create(data=data)
-        print("✅ Correo de bienvenida enviado:", response.status_code)
-        return response.json()
+        respuesta = enviar_mensajes([mensaje_bienvenida(destinatario, nombre)])
+        print("✅ Correo de bienvenida enviado")
+        return respuesta
     except Exception as e:
         print("⚠️ Error al enviar correo de bienvenida:", e)
         return None
 
 
-# 🔐 --- Correo de recuperación de contraseña ---
 def enviar_correo_recuperacion(destinatario: str, nombre: str, token: str):
-    reset_link = f"http://localhost:5173/reset-password?token={token}"  # 🔗 Puedes cambiarlo por la URL real de tu frontend
-
-    data = {
-        'Messages': [
-            {
-                "From": {
-                    "Email": "dilanramirezv2007@gmail.com",
-                    "Name": "SN-52 Noticias"
-                },
-                "To": [{"Email": destinatario, "Name": nombre}],
-                "Subject": "🔑 Recuperación de contraseña - SN-52",
-                "HTMLPart": f"""
-                <html>
-                  <body style="font-family: Arial, sans-serif; color: #333; padding: 20px;">
-                    <div style="max-width: 600px; margin: auto; border: 1px solid #ddd; border-radius: 10px; padding: 20px;">
-                      <h2 style="color: #004aad;">🔒 Recuperar tu contraseña</h2>
-                      <p>Hola {nombre},</p>
-                      <p>Recibimos una solicitud para restablecer tu contraseña en <strong>SN-52</strong>.</p>
-                      <p>Haz clic en el siguiente enlace para continuar con el proceso:</p>
-                      <a href="{reset_link}"
-                         style="background-color:#004aad; color:white; padding:10px 20px; border-radius:5px; text-decoration:none; font-weight:bold;">
-                         Restablecer contraseña
-                      </a>
-                      <p style="margin-top:20px;">Este enlace expirará en 1 hora.</p>
-                      <p>Si no solicitaste este cambio, puedes ignorar este mensaje.</p>
-                      <br>
-                      <p>Con aprecio,<br><strong>El equipo de SN-52</strong></p>
-                    </div>
-                  </body>
-                </html>
-                """
-            }
-        ]
-    }
     try:
-        response = mailjet.send.create(data=data)
-        print("✅ Correo de recuperación enviado:", response.status_code)
-        return response.json()
+        respuesta = enviar_mensajes([mensaje_recuperacion(destinatario, nombre, token)])
+        print("✅ Correo de recuperación enviado")
+        return respuesta
     except Exception as e:
         print("⚠️ Error al enviar correo de recuperación:", e)
         return None
 
 
-# 📝 --- Correo de notificación de borrador ---
 def enviar_correo_notificacion_borrador(destinatarios: list, titulo_noticia: str, escritor_nombre: str):
-    """
-    Envía notificación por email a editores cuando un escritor guarda un borrador.
-    destinatarios: lista de dicts con 'email' y 'nombre'
-    """
     if not destinatarios:
         print("⚠️ No hay destinatarios para notificación de borrador")
         return None
-
-    to_list = [{"Email": d["email"], "Name": d["nombre"]} for d in destinatarios]
-
-    data = {
-        'Messages': [
-            {
-                "From": {
-                    "Email": "dilanramirezv2007@gmail.com",
-                    "Name": "SN-52 Noticias"
-                },
-                "To": to_list,
-                "Subject": f"📝 Nuevo borrador disponible para revisión - {titulo_noticia}",
-                "HTMLPart": f"""
-                <html>
-                  <body style="font-family: Arial, sans-serif; color: #333; padding: 20px;">
-                    <div style="max-width: 600px; margin: auto; border: 1px solid #ddd; border-radius: 10px; padding: 20px;">
-                      <h2 style="color: #004aad;">📝 Nuevo borrador para revisión</h2>
-                      <p>Hola,</p>
-                      <p>El escritor <strong>{escritor_nombre}</strong> ha guardado un nuevo borrador titulado:</p>
-                      <p style="font-size: 18px; font-weight: bold; color: #004aad;">"{titulo_noticia}"</p>
-                      <p>Por favor, revisa el borrador en el panel de administración y proporciona retroalimentación al escritor.</p>
-                      <a href="http://localhost:5173/dashboard"
-                         style="background-color:#004aad; color:white; padding:10px 20px; border-radius:5px; text-decoration:none; font-weight:bold;">
-                         Ir al panel de administración
-                      </a>
-                      <br><br>
-                      <p>Con aprecio,<br><strong>El equipo de SN-52</strong></p>
-                    </div>
-                  </body>
-                </html>
-                """
-            }
-        ]
-    }
     try:
-        response = mailjet.send.create(data=data)
-        print(f"✅ Correo de notificación de borrador enviado a {len(destinatarios)} editores:", response.status_code)
-        return response.json()
+        respuesta = enviar_mensajes([mensaje_borrador(destinatarios, titulo_noticia, escritor_nombre)])
+        print(f"✅ Correo de notificación de borrador enviado a {len(destinatarios)} editores")
+        return respuesta
     except Exception as e:
         print("⚠️ Error al enviar correo de notificación de borrador:", e)
         return None
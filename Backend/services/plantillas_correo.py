@@ -0,0 +1,127 @@
+# Backend/services/plantillas_correo.py
+"""
+Render de los correos con las plantillas Jinja2 de templates/correos/.
+
+Las plantillas se compilan una sola vez al importar el módulo (al arrancar
+la app o el trabajador de la cola); auto_reload está apagado para que Jinja
+no revise los archivos en cada render. Los fragmentos estáticos de
+_fragmentos.html (botones) se renderizan una vez por argumentos y se
+reutilizan con {{ fragmento(...) }}, en vez de importar y llamar la macro en
+cada correo. Los cuerpos que se repiten, como el aviso de un borrador que
+llega igual a todos los editores, se guardan en una cache LRU por plantilla
+y contexto.
+
+Costo por mensaje: python benchmarks/bench_plantillas_correo.py
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+DIRECTORIO_PLANTILLAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "correos")
+PLANTILLAS = ("bienvenida.html", "recuperacion.html", "borrador.html", "resumen_borradores.html")
+CACHE_RENDER_MAXIMO = int(os.getenv("CORREOS_CACHE_RENDER", "256"))
+
+entorno = Environment(
+    loader=FileSystemLoader(DIRECTORIO_PLANTILLAS),
+    autoescape=select_autoescape(["html"]),  # títulos y nombres vienen de los usuarios
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+
+@lru_cache(maxsize=64)
+def fragmento(macro: str, *args) -> Markup:
+    """HTML de una macro de _fragmentos.html, renderizado una sola vez por argumentos"""
+    return Markup(getattr(entorno.get_template("_fragmentos.html").module, macro)(*args))
+
+
+entorno.globals["fragmento"] = fragmento
+
+# Compilación única: un error de sintaxis en una plantilla falla al arrancar, no al enviar
+plantillas = {nombre: entorno.get_template(nombre) for nombre in PLANTILLAS}
+
+
+class CacheRender:
+    """LRU de cuerpos ya renderizados, con contadores para el benchmark y las métricas"""
+
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.renders = 0
+        self.tiempo_render = 0.0
+
+    def obtener(self, clave):
+        with self._lock:
+            html = self._datos.get(clave)
+            if html is None:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return html
+
+    def guardar(self, clave, html: str):
+        with self._lock:
+            self._datos[clave] = html
+            self._datos.move_to_end(clave)
+            if len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def registrar_render(self, segundos: float):
+        with self._lock:
+            self.renders += 1
+            self.tiempo_render += segundos
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = self.fallos = self.renders = 0
+            self.tiempo_render = 0.0
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "renders": self.renders,
+                "render_promedio_us": round(self.tiempo_render * 1e6 / self.renders, 2) if self.renders else 0.0,
+            }
+
+
+cache_render = CacheRender(CACHE_RENDER_MAXIMO)
+
+
+def renderizar(nombre: str, contexto: dict, cache: bool = True) -> str:
+    """
+    Renderiza templates/correos/<nombre> con el contexto dado.
+    cache=False para cuerpos que nunca se repiten (p. ej. los que llevan un token).
+    """
+    clave = None
+    if cache:
+        clave = (nombre, json.dumps(contexto, sort_keys=True, ensure_ascii=False))
+        html = cache_render.obtener(clave)
+        if html is not None:
+            return html
+
+    inicio = time.perf_counter()
+    html = plantillas[nombre].render(contexto)
+    cache_render.registrar_render(time.perf_counter() - inicio)
+
+    if clave is not None:
+        cache_render.guardar(clave, html)
+    return html
+
+
+def estadisticas_render() -> dict:
+    return cache_render.resumen()
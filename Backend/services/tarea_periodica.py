@@ -0,0 +1,52 @@
+# Backend/services/tarea_periodica.py
+"""
+Tareas de fondo que corren en el event loop mientras vive la app
+(lifespan en main.py): el trabajador de la cola de correos y el barrido de
+tokens de recuperación.
+
+Cada subclase implementa paso(). Si devuelve algo verdadero (quedó trabajo)
+se vuelve a llamar enseguida; si no, se espera `intervalo` segundos, y
+detener() corta la espera. Un error se registra y no mata la tarea.
+"""
+import asyncio
+import logging
+
+
+class TareaPeriodica:
+
+    logger = logging.getLogger("sn52.tareas")
+    mensaje_error = "Error en la tarea periódica"
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self._tarea = None
+        self._detener = asyncio.Event()
+
+    async def paso(self):
+        raise NotImplementedError
+
+    async def ejecutar(self):
+        while not self._detener.is_set():
+            try:
+                hay_mas = await self.paso()
+            except Exception:
+                # Un error de base de datos no debe matar la tarea
+                self.logger.exception(self.mensaje_error)
+                hay_mas = False
+            if not hay_mas:
+                try:
+                    await asyncio.wait_for(self._detener.wait(), timeout=self.intervalo)
+                except asyncio.TimeoutError:
+                    pass
+
+    def iniciar(self):
+        if self._tarea is None:
+            self._detener.clear()
+            self._tarea = asyncio.create_task(self.ejecutar())
+        return self._tarea
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._detener.set()
+            await self._tarea
+            self._tarea = None
@@ -0,0 +1,104 @@
+"""
+Fixtures para probar las rutas de la API en proceso contra una base SQLite sembrada.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from db.database import engine, async_engine
+from db.session import SessionLocal
+from models.categoria import Categoria
+from models.comentario import Comentario
+from models.imagen import Imagen
+from models.noticia import Noticia
+from models.notificacion import Notificacion
+from models.rol import Rol
+from models.usuario import Usuario
+from security.auth import get_current_user
+
+CANTIDAD = 12  # filas por tabla: suficiente para que un N+1 rompa cualquier presupuesto
+
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app as aplicacion
+    return aplicacion
+
+
+@pytest.fixture(scope="session")
+def datos(app):
+    """Siembra roles, usuarios, categorías, noticias, imágenes, comentarios y notificaciones"""
+    db = SessionLocal()
+    try:
+        for i, nombre in enumerate(["admin", "escritor", "editor"], start=1):
+            db.add(Rol(id_rol=i, nombre=nombre, fecha_creacion=date.today()))
+        usuarios = [
+            Usuario(id_usuario=i, nombre_usuario=f"Usuario{i}", apellido_usuario="Prueba",
+                    correo_usuario=f"u{i}@sn52.test", contrasena_usuario="x", rol_id=1 if i == 1 else 2 + i % 2)
+            for i in range(1, CANTIDAD + 1)
+        ]
+        db.add_all(usuarios)
+        db.add_all([Categoria(id_categoria=i, nombre=f"Categoria{i}", estado=True) for i in range(1, 4)])
+        hoy = date.today()
+        for i in range(1, CANTIDAD + 1):
+            # Ninguna tiene Noticia.imagen: obliga a resolver la imagen principal de toda la página
+            db.add(Noticia(id_noticia=i, titulo=f"Noticia {i}", introduccion="intro", contenido="contenido",
+                           categoria_id=1 + i % 3, estado=3, fecha_creacion=hoy - timedelta(days=i),
+                           usuario_escritor_id=i, usuario_revisor_id=CANTIDAD + 1 - i))
+            db.add(Imagen(id_imagen=i, noticia_id=i, url=f"uploads/imagenes/{i}.png", tipo_archivo="png",
+                          fecha_creacion=hoy))
+            db.add(Comentario(id_comentario=i, noticia_id=1, usuario_id=i, contenido=f"comentario {i}",
+                              estado=True, fecha_creacion=hoy - timedelta(days=i)))
+            db.add(Notificacion(id_notificacion=i, usuario_id=1, noticia_id=i, titulo=f"Aviso {i}",
+                                mensaje="mensaje", fecha_creacion=datetime.utcnow() - timedelta(minutes=i)))
+        db.commit()
+        return {"usuario_id": 1}  # administrador, dueño de las notificaciones
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def cliente(app, datos):
+    # La autenticación no cuenta para el presupuesto de la ruta: usamos un usuario ya cargado
+    db = SessionLocal()
+    try:
+        usuario = db.get(Usuario, datos["usuario_id"])
+        db.expunge(usuario)
+    finally:
+        db.close()
+
+    app.dependency_overrides[get_current_user] = lambda: usuario
+    with TestClient(app) as cliente:
+        yield cliente
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def contar_consultas():
+    """
+    Context manager que captura las sentencias SQL ejecutadas (sync y async):
+
+        with contar_consultas() as consultas:
+            cliente.get("/api/noticias/")
+        assert len(consultas) <= 4
+    """
+    @contextmanager
+    def contador():
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append((statement, parameters))
+
+        engines = [engine, async_engine.sync_engine]
+        for e in engines:
+            event.listen(e, "before_cursor_execute", registrar)
+        try:
+            yield consultas
+        finally:
+            for e in engines:
+                event.remove(e, "before_cursor_execute", registrar)
+
+    return contador
@@ -0,0 +1,48 @@
+"""
+Al guardar un borrador las notificaciones se crean enseguida y el correo depende de la preferencia del editor.
+"""
+import json
+
+from sqlalchemy import select
+
+from db.session import SessionLocal
+from models.correo_pendiente import CorreoPendiente
+from models.notificacion import Notificacion
+from models.usuario import Usuario
+from services.cola_correos import AGRUPANDO, PENDIENTE
+
+
+def test_borrador_respeta_preferencia_de_cada_editor(cliente):
+    with SessionLocal() as db:
+        editores = db.scalars(select(Usuario).where(Usuario.rol_id == 3).order_by(Usuario.id_usuario)).all()
+        inmediato = editores[0]
+        inmediato.correo_inmediato = True
+        db.commit()
+        correos_editores = {e.correo_usuario for e in editores}
+        correo_inmediato = inmediato.correo_usuario
+
+    respuesta = cliente.post("/api/noticias/", json={"titulo": "Borrador", "contenido": "texto", "categoria_id": 1, "estado": 1})
+    assert respuesta.status_code == 200
+    noticia_id = respuesta.json()["id_noticia"]
+
+    with SessionLocal() as db:
+        avisos = db.scalars(select(Notificacion).where(Notificacion.noticia_id == noticia_id)).all()
+        assert len(avisos) == len(correos_editores)
+
+        estados = {}
+        for correo in db.scalars(select(CorreoPendiente).where(CorreoPendiente.tipo == "borrador")):
+            datos = json.loads(correo.datos)
+            if datos["titulo_noticia"] == "Borrador":
+                estados[datos["destinatarios"][0]["email"]] = correo.estado
+    assert set(estados) == correos_editores
+    assert estados.pop(correo_inmediato) == PENDIENTE
+    assert set(estados.values()) == {AGRUPANDO}
+
+
+def test_editor_cambia_su_preferencia(cliente, datos):
+    respuesta = cliente.put("/api/notificaciones/preferencias", json={"inmediato": True})
+    assert respuesta.json() == {"inmediato": True}
+    with SessionLocal() as db:
+        assert db.get(Usuario, datos["usuario_id"]).correo_inmediato is True
+        db.get(Usuario, datos["usuario_id"]).correo_inmediato = False
+        db.commit()
@@ -0,0 +1,56 @@
+"""
+Detalle y primeras páginas de noticias desde la cache de respuestas serializadas.
+"""
+import pytest
+
+from services.cache_respuestas import cache_respuestas
+
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    cache_respuestas.limpiar()
+    yield
+    cache_respuestas.limpiar()
+
+
+def test_segunda_lectura_sale_de_la_cache(cliente, contar_consultas):
+    primera = cliente.get("/api/noticias/6")
+    with contar_consultas() as consultas:
+        segunda = cliente.get("/api/noticias/6")
+
+    assert segunda.status_code == 200
+    assert segunda.json() == primera.json()
+    assert segunda.headers["ETag"] == primera.headers["ETag"]
+    assert len(consultas) == 1  # solo los validadores
+    assert cache_respuestas.resumen()["aciertos"] == 1
+
+
+def test_listado_cachea_tambien_el_cursor(cliente):
+    primera = cliente.get("/api/noticias/?limit=3")
+    segunda = cliente.get("/api/noticias/?limit=3")
+
+    assert segunda.headers["X-Next-Cursor"] == primera.headers["X-Next-Cursor"]
+    assert segunda.json() == primera.json()
+    # Con cursor no se cachea
+    cliente.get(f"/api/noticias/?limit=3&cursor={primera.headers['X-Next-Cursor']}")
+    assert cache_respuestas.resumen()["entradas"] == 1
+
+
+def test_actualizar_invalida_y_no_sirve_lo_viejo(cliente):
+    cliente.get("/api/noticias/7")
+    assert cliente.put("/api/noticias/7", json={"titulo": "Nuevo título"}).status_code == 200
+
+    assert cache_respuestas.resumen()["invalidaciones"] >= 1
+    assert cliente.get("/api/noticias/7").json()["titulo"] == "Nuevo título"
+
+
+def test_publicar_calienta_el_detalle(cliente, contar_consultas):
+    creada = cliente.post("/api/noticias/", json={"titulo": "Por publicar", "contenido": "texto", "categoria_id": 1, "estado": 2})
+    noticia_id = creada.json()["id_noticia"]
+
+    assert cliente.put(f"/api/noticias/{noticia_id}", json={"estado": 3}).status_code == 200
+
+    with contar_consultas() as consultas:
+        respuesta = cliente.get(f"/api/noticias/{noticia_id}")
+    assert respuesta.json()["estado"] == 3
+    assert len(consultas) == 1
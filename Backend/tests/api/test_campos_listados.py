@@ -0,0 +1,78 @@
+"""
+Proyecciones de los listados: resumen por defecto, `fields=` y columnas no pedidas
+que no llegan a leerse de la base.
+"""
+from models.noticia import Noticia
+from models.usuario import Usuario
+from services.cache_respuestas import cache_respuestas
+
+CATEGORIA = 2  # solo noticias sembradas: las que crean otras pruebas van a la categoría 1
+
+
+def consulta_principal(consultas, tabla: str) -> str:
+    return next(sql for sql, _ in consultas if f"FROM {tabla}" in sql and "validador_cache" not in sql)
+
+
+def test_noticias_resumen_sin_contenido(cliente, contar_consultas):
+    cache_respuestas.limpiar()
+    with contar_consultas() as consultas:
+        noticias = cliente.get(f"/api/noticias/?limit=3&categoria_id={CATEGORIA}").json()
+
+    assert set(noticias[0]) == {"id_noticia", "titulo", "introduccion", "imagen", "fecha_creacion", "categoria_id",
+                                "estado", "usuario_escritor_id", "escritor", "categoria"}
+    assert noticias[0]["imagen"]  # resuelta desde la tabla imagen
+    sql = consulta_principal(consultas, Noticia.__tablename__)
+    assert "contenido" not in sql and "usuario_revisor_id" not in sql
+
+
+def test_noticias_fields(cliente, contar_consultas):
+    cache_respuestas.limpiar()
+    with contar_consultas() as consultas:
+        noticias = cliente.get(f"/api/noticias/?limit=3&categoria_id={CATEGORIA}&fields=titulo,contenido").json()
+    assert noticias[0] == {"titulo": "Noticia 1", "contenido": "contenido"}
+    # Sin escritor, categoría ni imagen: ni esas consultas ni esas columnas
+    assert len(consultas) == 2  # validadores + noticias
+    assert "introduccion" not in consulta_principal(consultas, Noticia.__tablename__)
+
+    completa = cliente.get(f"/api/noticias/?limit=1&categoria_id={CATEGORIA}&fields=all").json()[0]
+    assert "contenido" in completa and completa["revisor"]["id"] == 12
+
+
+def test_fields_desconocido(cliente):
+    respuesta = cliente.get("/api/comentarios/noticia/1?fields=contenido,clave")
+    assert respuesta.status_code == 400
+    assert "clave" in respuesta.json()["detail"]
+
+
+def test_resumen_comentarios_y_notificaciones(cliente, contar_consultas):
+    with contar_consultas() as consultas:
+        comentarios = cliente.get("/api/comentarios/noticia/1?limit=3&fields=id_comentario,contenido").json()
+    assert comentarios[0] == {"id_comentario": 1, "contenido": "comentario 1"}
+    assert not any(f"FROM {Usuario.__tablename__}" in sql for sql, _ in consultas)
+
+    assert set(cliente.get("/api/comentarios/noticia/1?limit=3").json()[0]) == {"id_comentario", "contenido", "fecha_creacion", "usuario"}
+    notificacion = cliente.get("/api/notificaciones/?limit=3").json()[0]
+    assert "usuario_id" not in notificacion and notificacion["noticia_titulo"] == "Noticia 1"
+
+
+def test_noticias_sin_correo_de_autores(cliente):
+    # Listado y detalle son públicos: el autor va sin correo
+    cache_respuestas.limpiar()
+    noticia = cliente.get(f"/api/noticias/?limit=1&categoria_id={CATEGORIA}&fields=all").json()[0]
+    assert set(noticia["escritor"]) == set(noticia["revisor"]) == {"id", "nombre", "foto"}
+
+    detalle = cliente.get(f"/api/noticias/{noticia['id_noticia']}?fields=all").json()
+    assert set(detalle["escritor"]) == set(detalle["revisor"]) == {"id", "nombre", "foto"}
+    assert "@" not in cliente.get("/api/noticias/?fields=all").text
+
+
+def test_relacionadas_solo_columnas_mostradas(cliente, contar_consultas):
+    cache_respuestas.limpiar()
+    with contar_consultas() as consultas:
+        cliente.get(f"/api/noticias/?limit=3&categoria_id={CATEGORIA}&fields=all")
+        cliente.get("/api/comentarios/noticia/1")
+    usuarios = [sql for sql, _ in consultas if f"FROM {Usuario.__tablename__} " in sql + " "]
+    assert len(usuarios) == 2
+    for sql in usuarios:
+        assert "contrasena_usuario" not in sql and "correo_usuario" not in sql and "bloqueado_hasta" not in sql
+    assert "fecha_creacion" not in consulta_principal(consultas, "categoria")
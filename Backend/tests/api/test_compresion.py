@@ -0,0 +1,94 @@
+"""
+Compresión de respuestas (utils/compresion.py): gzip según Accept-Encoding,
+ETag débil para la representación comprimida y variantes precomprimidas de /uploads.
+"""
+import asyncio
+import gzip
+import zlib
+
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.responses import StreamingResponse
+from starlette.routing import Mount
+
+from utils.compresion import MiddlewareCompresion, StaticPrecomprimidos, elegir_codificacion, precomprimir
+
+
+def test_elegir_codificacion():
+    assert elegir_codificacion(None, ("br", "gzip")) is None
+    assert elegir_codificacion("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert elegir_codificacion("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+    assert elegir_codificacion("*", ("gzip",)) == "gzip"
+    assert elegir_codificacion("gzip;q=0, identity", ("gzip",)) is None
+
+
+def test_listado_comprimido_con_etag_debil(cliente):
+    url = "/api/noticias/?fields=all&limit=12"
+    plano = cliente.get(url, headers={"Accept-Encoding": "identity"})
+    comprimido = cliente.get(url, headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plano.headers
+    assert comprimido.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in comprimido.headers["vary"]
+    assert comprimido.content == plano.content  # httpx ya lo descomprimió
+    assert int(comprimido.headers["content-length"]) < len(plano.content)
+
+    etag = comprimido.headers["etag"]
+    assert etag == f"W/{plano.headers['etag'].removeprefix('W/')}"
+    assert cliente.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
+
+
+def test_respuesta_chica_sin_comprimir(cliente):
+    respuesta = cliente.get("/api/comentarios/noticia/1?fields=id_comentario&limit=1", headers={"Accept-Encoding": "gzip"})
+    assert respuesta.status_code == 200
+    assert "content-encoding" not in respuesta.headers
+
+
+def test_streaming_comprimido_por_partes():
+    partes = [f"linea {i}\n".encode() * 200 for i in range(5)]
+    enviados = []
+
+    async def flujo(scope, receive, send):
+        async def generar():
+            for parte in partes:
+                yield parte
+        await StreamingResponse(generar(), media_type="text/plain")(scope, receive, send)
+
+    async def receive():
+        await asyncio.Event().wait()  # el cliente no se desconecta
+
+    async def send(message):
+        enviados.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(MiddlewareCompresion(flujo, minimo=100)(scope, receive, send))
+
+    inicio, *cuerpos = enviados
+    cabeceras = Headers(raw=inicio["headers"])
+    assert cabeceras["content-encoding"] == "gzip" and "content-length" not in cabeceras
+    # Un mensaje comprimido por cada parte (más el cierre): no se juntó el cuerpo antes de enviarlo
+    assert len(cuerpos) == len(partes) + 1 and all(c["body"] for c in cuerpos[:-1])
+    assert zlib.decompress(b"".join(c["body"] for c in cuerpos), 16 + zlib.MAX_WBITS) == b"".join(partes)
+
+
+def test_uploads_sirve_variante_precomprimida(tmp_path):
+    original = tmp_path / "logo.svg"
+    original.write_text("<svg xmlns='http://www.w3.org/2000/svg'>" + "<rect width='1' height='1'/>" * 100 + "</svg>")
+    assert precomprimir(str(original)) and (tmp_path / "logo.svg.gz").exists()
+
+    aplicacion = MiddlewareCompresion(Starlette(routes=[
+        Mount("/uploads", StaticPrecomprimidos(directory=str(tmp_path))),
+    ]))
+    cliente = TestClient(aplicacion)
+
+    respuesta = cliente.get("/uploads/logo.svg", headers={"Accept-Encoding": "gzip"})
+    assert respuesta.headers["content-encoding"] == "gzip"
+    assert respuesta.headers["content-type"].startswith("image/svg+xml")
+    assert int(respuesta.headers["content-length"]) == (tmp_path / "logo.svg.gz").stat().st_size
+    assert respuesta.content == original.read_bytes()
+    assert gzip.decompress((tmp_path / "logo.svg.gz").read_bytes()) == original.read_bytes()
+
+    sin_gzip = cliente.get("/uploads/logo.svg", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in sin_gzip.headers
+    assert sin_gzip.content == original.read_bytes()
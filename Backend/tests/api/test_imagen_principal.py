@@ -0,0 +1,58 @@
+"""
+Noticia.imagen sigue una sola regla: la primera imagen de la galería (menor id_imagen).
+"""
+import pytest
+
+from db.session import SessionLocal
+from models.imagen import Imagen
+from models.noticia import Noticia
+from models.usuario import Usuario
+
+NOTICIA = 11  # sembrada con una imagen (id 11) y sin Noticia.imagen
+
+
+@pytest.fixture
+def en_tmp(tmp_path, monkeypatch):
+    (tmp_path / "uploads").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def principal() -> str | None:
+    with SessionLocal() as db:
+        return db.get(Noticia, NOTICIA).imagen
+
+
+def subir(cliente, contenido: bytes) -> dict:
+    respuesta = cliente.post(f"/api/imagenes/?noticia_id={NOTICIA}", files={"file": ("foto.png", contenido, "image/png")})
+    assert respuesta.status_code == 200
+    return respuesta.json()
+
+
+def test_subir_no_reemplaza_la_primera_imagen(cliente, en_tmp):
+    with SessionLocal() as db:
+        primera = db.get(Imagen, NOTICIA).url
+
+    segunda = subir(cliente, b"segunda")
+    assert principal() == primera  # la galería ya tenía imagen: sigue la de menor id
+    subir(cliente, b"tercera")
+    assert principal() == primera
+
+    # Al borrar la primera, pasa a ser la siguiente por id, no la última subida
+    assert cliente.delete(f"/api/imagenes/{NOTICIA}").status_code == 200
+    assert principal() == segunda["url"]
+
+
+def test_mover_imagen_exige_permisos_en_la_noticia_destino(app, cliente):
+    from security.auth import get_current_user
+
+    with SessionLocal() as db:
+        escritor = db.get(Usuario, 10)  # rol escritor, dueño solo de la noticia 10
+        db.expunge(escritor)
+    app.dependency_overrides[get_current_user] = lambda: escritor
+
+    assert cliente.put("/api/imagenes/10", json={"noticia_id": 8}).status_code == 403
+    assert cliente.put("/api/imagenes/10", json={"noticia_id": 999}).status_code == 404
+    with SessionLocal() as db:
+        assert db.get(Imagen, 10).noticia_id == 10
+        assert db.get(Noticia, 8).imagen is None
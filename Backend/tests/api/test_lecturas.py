@@ -0,0 +1,44 @@
+"""
+Lecturas de Core (db/lecturas.py): filas en vez de objetos del ORM, sentencias
+reutilizadas entre peticiones y paginación igual a la de ordenar_por_cursor.
+"""
+import asyncio
+
+from db.lecturas import leer_pagina, leer_por_ids, sentencias_lectura
+from db.session import AsyncSessionLocal
+from models.comentario import Comentario
+from models.noticia import Noticia
+from utils.paginacion import HEADER_CURSOR
+
+
+def test_filas_sin_identity_map(datos):
+    async def leer():
+        async with AsyncSessionLocal() as db:
+            filas = await leer_pagina(db, Comentario, ("contenido",), {"noticia_id": 1, "estado": True}, None, 0, 3)
+            titulos = await leer_por_ids(db, Noticia, ("titulo",), [1, 2, None])
+            return filas, titulos, len(db.identity_map)
+
+    filas, titulos, en_sesion = asyncio.run(leer())
+    assert len(filas) == 4  # limit + 1
+    assert filas[0].contenido == "comentario 1" and filas[0].id_comentario == 1
+    assert not hasattr(filas[0], "usuario_id")  # solo lo pedido, más id y fecha para el cursor
+    assert titulos[2].titulo == "Noticia 2" and set(titulos) == {1, 2}
+    assert en_sesion == 0
+
+
+def test_sentencia_reutilizada_entre_paginas(cliente):
+    url = "/api/comentarios/noticia/1?limit=2&fields=id_comentario"
+    primera = cliente.get(url)
+    antes = sentencias_lectura.resumen()
+
+    ids = [c["id_comentario"] for c in primera.json()]
+    cursor = primera.headers[HEADER_CURSOR]
+    while cursor:
+        pagina = cliente.get(f"{url}&cursor={cursor}")
+        ids += [c["id_comentario"] for c in pagina.json()]
+        cursor = pagina.headers.get(HEADER_CURSOR)
+
+    assert ids == sorted(set(ids))  # sin repetidos ni saltos, del más nuevo al más viejo
+    despues = sentencias_lectura.resumen()
+    assert despues["entradas"] - antes["entradas"] <= 1  # la forma "con cursor" se arma una sola vez
+    assert despues["aciertos"] > antes["aciertos"]
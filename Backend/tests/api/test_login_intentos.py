@@ -0,0 +1,86 @@
+"""
+Los intentos fallidos de login no escriben en usuario; solo el bloqueo lo hace.
+"""
+import pytest
+
+import routes.usuarios_controller
+import security.ip_cliente
+from db.session import SessionLocal
+from models.usuario import Usuario
+from security.intentos_login import BackendMemoria, LimitadorLogin
+from security.ip_cliente import ResolutorIP
+from security.passwords import encriptar_contrasena
+
+CORREO = "intentos@sn52.test"
+
+
+@pytest.fixture
+def cuenta(cliente, monkeypatch):
+    monkeypatch.setattr(routes.usuarios_controller, "limitador_login",
+                        LimitadorLogin(BackendMemoria(), intentos_cuenta=3, intentos_ip=5))
+    with SessionLocal() as db:
+        db.add(Usuario(nombre_usuario="Intentos", apellido_usuario="Prueba", correo_usuario=CORREO,
+                       contrasena_usuario=encriptar_contrasena("correcta"), rol_id=2))
+        db.commit()
+    yield
+    with SessionLocal() as db:
+        db.query(Usuario).filter(Usuario.correo_usuario == CORREO).delete()
+        db.commit()
+
+
+def login(cliente, contrasena, correo=CORREO, headers=None):
+    return cliente.post("/auth/login", data={"correo_usuario": correo, "contrasena_usuario": contrasena},
+                        headers=headers)
+
+
+def escrituras_usuario(consultas) -> list:
+    return [sql for sql, _ in consultas if sql.startswith("UPDATE usuario")]
+
+
+def test_fallos_sin_escritura_hasta_el_bloqueo(cliente, cuenta, contar_consultas):
+    with contar_consultas() as consultas:
+        primero = login(cliente, "mala")
+        segundo = login(cliente, "mala")
+    assert (primero.status_code, segundo.status_code) == (400, 400)
+    assert "Intentos restantes: 1" in segundo.json()["detail"]
+    assert escrituras_usuario(consultas) == []
+
+    with contar_consultas() as consultas:
+        bloqueo = login(cliente, "mala")
+    assert bloqueo.status_code == 429
+    assert len(escrituras_usuario(consultas)) == 1
+
+    # Bloqueada: ni la contraseña correcta entra
+    assert login(cliente, "correcta").status_code == 429
+
+
+def test_login_correcto_no_escribe_y_reinicia_la_cuenta(cliente, cuenta, contar_consultas):
+    login(cliente, "mala")
+    login(cliente, "mala")
+    with contar_consultas() as consultas:
+        assert login(cliente, "correcta").status_code == 200
+    assert escrituras_usuario(consultas) == []
+
+    assert "Intentos restantes: 2" in login(cliente, "mala").json()["detail"]
+
+
+def test_limite_por_ip_corta_antes_de_consultar(cliente, cuenta, contar_consultas):
+    for i in range(5):
+        assert login(cliente, "x", correo=f"noexiste{i}@sn52.test").status_code == 400
+
+    with contar_consultas() as consultas:
+        respuesta = login(cliente, "correcta")
+    assert respuesta.status_code == 429
+    assert consultas == []
+
+
+def test_dos_clientes_detras_del_mismo_proxy(cliente, cuenta, monkeypatch):
+    # Todas las conexiones llegan desde el proxy (en TestClient, "testclient"); cada cliente con su X-Forwarded-For
+    monkeypatch.setattr(security.ip_cliente, "resolutor_ip", ResolutorIP("*"))
+    atacante = {"X-Forwarded-For": "203.0.113.7"}
+    for i in range(5):
+        assert login(cliente, "x", correo=f"noexiste{i}@sn52.test", headers=atacante).status_code == 400
+    assert login(cliente, "correcta", headers=atacante).status_code == 429
+
+    # Otro usuario que entra por el mismo proxy no queda afectado por el límite del atacante
+    assert login(cliente, "correcta", headers={"X-Forwarded-For": "198.51.100.20"}).status_code == 200
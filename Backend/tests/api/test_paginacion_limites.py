@@ -0,0 +1,27 @@
+"""
+limit y skip acotados en los listados: nada de 500 con limit=0 ni LIMIT -1 en la base.
+"""
+import pytest
+from fastapi import Response
+
+from utils.paginacion import HEADER_CURSOR, recortar_pagina
+
+LISTADOS = ["/api/noticias/", "/api/comentarios/noticia/1", "/api/notificaciones/"]
+
+
+@pytest.mark.parametrize("url", LISTADOS)
+@pytest.mark.parametrize("parametros", ["limit=0", "limit=-1", "limit=101", "skip=-1"])
+def test_fuera_de_rango_es_422(cliente, url, parametros):
+    assert cliente.get(f"{url}?{parametros}").status_code == 422
+
+
+@pytest.mark.parametrize("url", LISTADOS)
+def test_limites_validos(cliente, url):
+    assert cliente.get(f"{url}?limit=1").status_code == 200
+    assert cliente.get(f"{url}?limit=100").status_code == 200
+
+
+def test_recortar_pagina_sin_filas():
+    response = Response()
+    assert recortar_pagina([object()], 0, response, "fecha_creacion", "id") == []
+    assert HEADER_CURSOR not in response.headers
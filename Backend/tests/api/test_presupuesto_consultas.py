@@ -0,0 +1,64 @@
+"""
+Presupuesto de consultas por ruta.
+
+Cada ruta GET de la API declara su máximo con @presupuesto_consultas(n) junto
+a su definición. Estas pruebas la llaman en proceso contra la base sembrada y
+fallan (mostrando las sentencias) si hace más consultas, por ejemplo al
+reintroducir un N+1 como el de la imagen por noticia o el autor por comentario.
+"""
+import pytest
+from fastapi.routing import APIRoute
+
+from services.cache_respuestas import cache_respuestas
+
+# Ruta -> URL concreta para llamarla con los datos sembrados en conftest.py
+URLS = {
+    "/api/noticias/": "/api/noticias/?limit=10",
+    "/api/noticias/{noticia_id}": "/api/noticias/1",
+    "/api/comentarios/noticia/{noticia_id}": "/api/comentarios/noticia/1?limit=10",
+    "/api/comentarios/{comentario_id}": "/api/comentarios/1",
+    "/api/imagenes/noticia/{noticia_id}": "/api/imagenes/noticia/1",
+    "/api/imagenes/{imagen_id}": "/api/imagenes/1",
+    "/api/notificaciones/": "/api/notificaciones/?limit=10",
+    "/api/roles/": "/api/roles/",
+    "/api/roles/{rol_id}": "/api/roles/1",
+    "/api/metricas/pool": "/api/metricas/pool",
+    "/api/metricas/hash": "/api/metricas/hash",
+    "/api/metricas/principal": "/api/metricas/principal",
+    "/api/metricas/login": "/api/metricas/login",
+    "/api/metricas/respuestas": "/api/metricas/respuestas",
+}
+
+
+def rutas_get(app):
+    return [
+        r for r in app.routes
+        if isinstance(r, APIRoute) and "GET" in r.methods and r.path.startswith("/api/")
+    ]
+
+
+def formatear(consultas) -> str:
+    return "\n".join(f"  {i}. {sql}  {parametros!r}" for i, (sql, parametros) in enumerate(consultas, start=1))
+
+
+def test_todas_las_rutas_get_declaran_presupuesto(app):
+    sin_presupuesto = [r.path for r in rutas_get(app) if not hasattr(r.endpoint, "presupuesto_consultas")]
+    assert not sin_presupuesto, f"Rutas sin @presupuesto_consultas: {sin_presupuesto}"
+
+    sin_url = [r.path for r in rutas_get(app) if r.path not in URLS]
+    assert not sin_url, f"Agrega una URL de prueba en URLS para: {sin_url}"
+
+
+@pytest.mark.parametrize("ruta", sorted(URLS))
+def test_ruta_respeta_su_presupuesto(app, cliente, contar_consultas, ruta):
+    endpoint = next(r.endpoint for r in rutas_get(app) if r.path == ruta)
+    presupuesto = endpoint.presupuesto_consultas
+    cache_respuestas.limpiar()  # se mide la carga completa, no un acierto de la cache
+
+    with contar_consultas() as consultas:
+        respuesta = cliente.get(URLS[ruta])
+
+    assert respuesta.status_code == 200, respuesta.text
+    assert len(consultas) <= presupuesto, (
+        f"{ruta} hizo {len(consultas)} consultas (presupuesto: {presupuesto}):\n{formatear(consultas)}"
+    )
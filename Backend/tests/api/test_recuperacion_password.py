@@ -0,0 +1,100 @@
+"""
+Tokens de recuperación: solo el hash en la base, un token vigente por usuario y barrido por lotes.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from db.session import SessionLocal
+from models.correo_pendiente import CorreoPendiente
+from models.token_recuperacion import TokenRecuperacion
+from models.usuario import Usuario
+from security.passwords import verificar_contrasena
+from security.tokens_recuperacion import hash_token, purgar_tokens_vencidos
+
+ID_USUARIO = 2  # sembrado en tests/api/conftest.py
+
+
+def pedir_token(cliente) -> str:
+    respuesta = cliente.post("/auth/recuperar-password", json={"email": f"u{ID_USUARIO}@sn52.test"})
+    assert respuesta.status_code == 200, respuesta.text
+    assert "link_prueba" not in respuesta.json()  # RECUPERACION_LINK_PRUEBA apagado
+    # El token solo está en el correo que espera en la cola
+    with SessionLocal() as db:
+        correo = db.scalars(
+            select(CorreoPendiente).where(CorreoPendiente.tipo == "recuperacion")
+            .order_by(CorreoPendiente.id_correo.desc())
+        ).first()
+    return json.loads(correo.datos)["token"]
+
+
+def tokens_guardados() -> list:
+    with SessionLocal() as db:
+        return db.scalars(select(TokenRecuperacion).where(TokenRecuperacion.usuario_id == ID_USUARIO)).all()
+
+
+def test_guarda_solo_el_hash_y_un_token_por_usuario(cliente):
+    pedir_token(cliente)
+    token = pedir_token(cliente)
+
+    guardados = tokens_guardados()
+    assert [t.token_hash for t in guardados] == [hash_token(token)]
+    assert guardados[0].expira > datetime.utcnow()
+
+
+def test_reset_cambia_la_contrasena_y_consume_el_token(cliente):
+    token = pedir_token(cliente)
+    assert cliente.get(f"/auth/reset-password/{token}").status_code == 200
+
+    respuesta = cliente.post("/auth/reset-password", json={"token": token, "nueva_password": "nueva-clave"})
+    assert respuesta.status_code == 200, respuesta.text
+    with SessionLocal() as db:
+        assert verificar_contrasena("nueva-clave", db.get(Usuario, ID_USUARIO).contrasena_usuario)
+    assert tokens_guardados() == []
+
+    reuso = cliente.post("/auth/reset-password", json={"token": token, "nueva_password": "otra"})
+    assert reuso.status_code == 400
+
+
+def test_token_vencido(cliente):
+    token = pedir_token(cliente)
+    with SessionLocal() as db:
+        fila = db.scalars(select(TokenRecuperacion).where(TokenRecuperacion.token_hash == hash_token(token))).one()
+        fila.expira = datetime.utcnow() - timedelta(minutes=1)
+        db.commit()
+
+    respuesta = cliente.post("/auth/reset-password", json={"token": token, "nueva_password": "nueva"})
+    assert respuesta.status_code == 400
+    assert "expirado" in respuesta.json()["detail"]
+
+
+@pytest.fixture
+def sesiones(tmp_path):
+    url = tmp_path / "tokens.db"
+    engine = create_engine(f"sqlite:///{url}")
+    # Sin la tabla usuario: la clave foránea no se crea en esta base aislada
+    TokenRecuperacion.__table__.create(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    yield engine, async_sessionmaker(async_engine, expire_on_commit=False)
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+def test_barrido_borra_vencidos_por_lotes(sesiones):
+    engine, AsyncSesion = sesiones
+    ahora = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(TokenRecuperacion.__table__.insert(), [
+            {"token_hash": hash_token(str(i)), "usuario_id": i, "expira": ahora - timedelta(minutes=i + 1)}
+            for i in range(5)
+        ] + [{"token_hash": hash_token("vigente"), "usuario_id": 99, "expira": ahora + timedelta(hours=1)}])
+
+    assert asyncio.run(purgar_tokens_vencidos(AsyncSesion, lote=2)) == 5
+
+    with engine.connect() as conn:
+        quedan = conn.execute(select(TokenRecuperacion.__table__.c.token_hash)).scalars().all()
+    assert quedan == [hash_token("vigente")]
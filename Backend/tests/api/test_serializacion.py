@@ -0,0 +1,41 @@
+"""
+Listados serializados una sola vez (utils/serializacion.py): mismo JSON que el
+response_model y las cabeceras de la ruta (cursor, ETag) intactas.
+"""
+from dtos.comentario_dto import ComentarioResponse
+from dtos.notificacion_dto import NotificacionExpandidaResponse
+from utils.paginacion import HEADER_CURSOR
+
+
+def test_comentarios_con_usuario_y_cabeceras(cliente):
+    respuesta = cliente.get("/api/comentarios/noticia/1?limit=5&fields=all")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"] == "application/json"
+    assert "ETag" in respuesta.headers and HEADER_CURSOR in respuesta.headers
+
+    comentarios = respuesta.json()
+    assert len(comentarios) == 5
+    # Listado público: del autor solo las columnas que se muestran (db/cargador.COLUMNAS_RELACIONADAS), sin correo
+    assert comentarios[0]["usuario"] == {"id": 1, "nombre": "Usuario1 Prueba", "correo": None, "foto": None}
+    assert [ComentarioResponse.model_validate(c).model_dump(mode="json") for c in comentarios] == comentarios
+
+    siguiente = cliente.get(f"/api/comentarios/noticia/1?limit=5&fields=all&cursor={respuesta.headers[HEADER_CURSOR]}").json()
+    assert siguiente[0]["id_comentario"] == comentarios[-1]["id_comentario"] + 1
+
+
+def test_notificaciones_con_titulo_de_noticia(cliente):
+    respuesta = cliente.get("/api/notificaciones/?limit=3&fields=all")
+    assert respuesta.status_code == 200
+    assert HEADER_CURSOR in respuesta.headers
+
+    notificaciones = respuesta.json()
+    assert [n["id_notificacion"] for n in notificaciones] == [1, 2, 3]
+    assert notificaciones[0]["noticia_titulo"] == "Noticia 1"
+    assert [NotificacionExpandidaResponse.model_validate(n).model_dump(mode="json") for n in notificaciones] == notificaciones
+
+
+def test_rutas_sin_serializador_usan_orjson(cliente):
+    # Las demás rutas pasan por ORJSONResponse (clase por defecto de la app)
+    respuesta = cliente.get("/api/comentarios/1")
+    assert respuesta.status_code == 200
+    assert respuesta.content.startswith(b'{"id_comentario":1,')  # orjson no deja espacios
@@ -0,0 +1,115 @@
+"""
+Subidas con nombre por contenido (utils/subidas.py): caché immutable, ETag fuerte
+y Range en /uploads, y borrado coordinado con las subidas que reutilizan el mismo
+archivo.
+"""
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from db.session import AsyncSessionLocal, SessionLocal
+from models.noticia import Noticia
+from services.imagen_service import borrar_subida_sin_uso
+from utils.subidas import LARGO_HASH, apartar_subida, confirmar_subida, guardar_subida
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 8
+
+
+@pytest.fixture
+def en_tmp(tmp_path, monkeypatch):
+    # Las rutas escriben en uploads/ relativo al directorio de trabajo
+    (tmp_path / "uploads").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def subir(cliente, contenido: bytes, nombre="foto.PNG"):
+    respuesta = cliente.post("/api/noticias/12/imagen", files={"file": (nombre, contenido, "image/png")})
+    assert respuesta.status_code == 200
+    return respuesta.json()["filename"]
+
+
+def test_nombre_por_contenido_y_reemplazo(cliente, en_tmp):
+    nombre = subir(cliente, PNG)
+    assert nombre == hashlib.sha256(PNG).hexdigest()[:LARGO_HASH] + ".png"
+    assert subir(cliente, PNG, nombre="otra.png") == nombre  # mismo contenido, mismo archivo
+
+    nuevo = subir(cliente, PNG + b"v2")
+    assert nuevo != nombre
+    assert cliente.get("/api/noticias/12?fields=all").json()["imagen"] == f"uploads/noticias/{nuevo}"
+    # El archivo anterior ya no lo usa nadie
+    assert not (en_tmp / "uploads" / "noticias" / nombre).exists()
+    # Ni el anterior ni temporales de la subida
+    assert sorted(p.name for p in (en_tmp / "uploads" / "noticias").iterdir()) == [nuevo]
+
+
+def archivo(contenido: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(contenido), filename="foto.png")
+
+
+def usar_en_noticia(ruta: str):
+    with SessionLocal() as db:
+        db.get(Noticia, 12).imagen = ruta
+        db.commit()
+
+
+def test_borrado_antes_del_commit_de_la_subida(datos, en_tmp):
+    confirmar_subida(guardar_subida(archivo(PNG), "uploads/noticias"))
+
+    # Otra subida del mismo contenido reutiliza el archivo; antes de su commit, un
+    # borrado (que todavía no ve ninguna fila) se lo lleva
+    subida = guardar_subida(archivo(PNG), "uploads/noticias")
+    asyncio.run(borrar_subida_sin_uso(subida.ruta))
+    assert not os.path.exists(subida.ruta)
+
+    usar_en_noticia(subida.ruta)
+    confirmar_subida(subida)  # lo repone desde su temporal
+    assert open(subida.ruta, "rb").read() == PNG
+    assert os.listdir("uploads/noticias") == [os.path.basename(subida.ruta)]
+
+
+def test_subida_confirmada_mientras_se_borra(datos, en_tmp):
+    confirmar_subida(guardar_subida(archivo(PNG), "uploads/noticias"))
+    subida = guardar_subida(archivo(PNG), "uploads/noticias")
+
+    def sesion_despues_de_la_subida():
+        # El borrado ya apartó el archivo; la subida hace commit antes de que mire la base
+        assert not os.path.exists(subida.ruta)
+        usar_en_noticia(subida.ruta)
+        confirmar_subida(subida)
+        return AsyncSessionLocal()
+
+    asyncio.run(borrar_subida_sin_uso(subida.ruta, session_factory=sesion_despues_de_la_subida))
+    assert open(subida.ruta, "rb").read() == PNG
+    assert os.listdir("uploads/noticias") == [os.path.basename(subida.ruta)]
+
+
+def test_uploads_inmutable_con_etag_fuerte_y_range(cliente, en_tmp):
+    nombre = subir(cliente, PNG)
+    url = f"/uploads/noticias/{nombre}"
+
+    respuesta = cliente.get(url)
+    assert respuesta.content == PNG
+    assert respuesta.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = respuesta.headers["etag"]
+    assert etag == f'"{nombre.split(".")[0]}"'
+    assert cliente.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    parcial = cliente.get(url, headers={"Range": "bytes=8-15"})
+    assert parcial.status_code == 206
+    assert parcial.content == PNG[8:16]
+    assert parcial.headers["content-range"] == f"bytes 8-15/{len(PNG)}"
+    assert parcial.headers["etag"] == etag
+    # If-Range con otro ETag: el archivo cambió, se manda entero
+    assert cliente.get(url, headers={"Range": "bytes=8-15", "If-Range": '"otro"'}).status_code == 200
+
+
+def test_nombre_viejo_se_revalida(cliente, en_tmp):
+    (en_tmp / "uploads" / "noticia_3.jpg").write_bytes(b"jpg")
+    respuesta = cliente.get("/uploads/noticia_3.jpg")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["cache-control"] == "public, no-cache"
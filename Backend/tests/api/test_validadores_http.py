@@ -0,0 +1,85 @@
+"""
+GET condicional: ETag/Last-Modified en noticias y comentarios, 304 sin más consultas
+y validadores que cambian con cada escritura.
+"""
+from db.session import SessionLocal
+from models.usuario import Usuario
+
+
+def revalidar(cliente, url, etag):
+    return cliente.get(url, headers={"If-None-Match": etag})
+
+
+def test_304_con_el_etag_actual(cliente, contar_consultas):
+    url = "/api/noticias/?limit=5"
+    # Sin comprimir: la versión gzip lleva el mismo ETag en su forma débil (utils/compresion.py)
+    primera = cliente.get(url, headers={"Accept-Encoding": "identity"})
+    assert primera.status_code == 200
+    assert primera.headers["Cache-Control"] == "public, no-cache"
+    etag = primera.headers["ETag"]
+    assert etag.startswith('"')  # fuerte
+
+    with contar_consultas() as consultas:
+        segunda = revalidar(cliente, url, etag)
+    assert segunda.status_code == 304
+    assert segunda.content == b""
+    assert segunda.headers["ETag"] == etag
+    assert len(consultas) == 1  # solo los validadores
+
+    # Otra página u otros filtros son otro contenido
+    assert cliente.get("/api/noticias/?limit=6").headers["ETag"] != etag
+
+
+def test_actualizar_noticia_cambia_los_validadores(cliente):
+    lista = cliente.get("/api/noticias/?limit=5")
+    detalle = cliente.get("/api/noticias/3")
+    otra = cliente.get("/api/noticias/4")
+
+    assert cliente.put("/api/noticias/3", json={"titulo": "Editada"}).status_code == 200
+
+    assert revalidar(cliente, "/api/noticias/?limit=5", lista.headers["ETag"]).status_code == 200
+    nuevo = revalidar(cliente, "/api/noticias/3", detalle.headers["ETag"])
+    assert nuevo.status_code == 200 and nuevo.json()["titulo"] == "Editada"
+    assert "Last-Modified" in nuevo.headers
+    # El detalle de otra noticia sigue valiendo
+    assert revalidar(cliente, "/api/noticias/4", otra.headers["ETag"]).status_code == 304
+
+
+def test_comentarios_crear_y_eliminar(cliente):
+    url = "/api/comentarios/noticia/2?limit=10"
+    etag = cliente.get(url).headers["ETag"]
+    otra_noticia = cliente.get("/api/comentarios/noticia/3?limit=10").headers["ETag"]
+
+    creado = cliente.post("/api/comentarios/", json={"contenido": "nuevo", "noticia_id": 2})
+    assert creado.status_code == 200
+    despues_de_crear = revalidar(cliente, url, etag)
+    assert despues_de_crear.status_code == 200
+    assert revalidar(cliente, "/api/comentarios/noticia/3?limit=10", otra_noticia).status_code == 304
+
+    etag = despues_de_crear.headers["ETag"]
+    assert cliente.delete(f"/api/comentarios/{creado.json()['id_comentario']}").status_code == 200
+    assert revalidar(cliente, url, etag).status_code == 200
+
+
+def test_if_modified_since(cliente):
+    cliente.put("/api/noticias/5", json={"introduccion": "otra"})
+    respuesta = cliente.get("/api/noticias/5")
+    ultima = respuesta.headers["Last-Modified"]
+
+    assert cliente.get("/api/noticias/5", headers={"If-Modified-Since": ultima}).status_code == 304
+    assert cliente.get("/api/noticias/5", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+
+
+def test_cambiar_el_nombre_de_un_autor_invalida(cliente):
+    url = "/api/comentarios/noticia/1?limit=10"
+    etag = cliente.get(url).headers["ETag"]
+
+    with SessionLocal() as db:
+        db.get(Usuario, 5).intentos_fallidos = 2  # no se muestra: no invalida
+        db.commit()
+    assert revalidar(cliente, url, etag).status_code == 304
+
+    with SessionLocal() as db:
+        db.get(Usuario, 5).nombre_usuario = "Renombrado"
+        db.commit()
+    assert revalidar(cliente, url, etag).status_code == 200
@@ -0,0 +1,51 @@
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Las pruebas de backend corren en proceso contra SQLite (no necesitan MySQL ni el servidor levantado)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sn52_'), 'pruebas.db')}")
+os.environ.setdefault("DB_POOL_PROFILE", "pruebas")
+# Claves falsas: ninguna prueba envía correos reales, Mailjet se reemplaza por tests/fakes/mailjet_falso.py
+os.environ.setdefault("MAILJET_API_KEY", "pruebas")
+os.environ.setdefault("MAILJET_SECRET_KEY", "pruebas")
+MAILJET_FALSO_PUERTO = _puerto_libre()
+os.environ.setdefault("MAILJET_API_URL", f"http://127.0.0.1:{MAILJET_FALSO_PUERTO}/")
+# Las pruebas manejan el trabajador de la cola a mano
+os.environ.setdefault("CORREOS_WORKER_ACTIVO", "0")
+os.environ.setdefault("RECUPERACION_BARRIDO_ACTIVO", "0")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture(scope="session")
+def _servidor_mailjet():
+    import uvicorn
+    from tests.fakes.mailjet_falso import app, estado
+
+    servidor = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=MAILJET_FALSO_PUERTO, log_level="warning"))
+    hilo = threading.Thread(target=servidor.run, daemon=True)
+    hilo.start()
+    while not servidor.started:
+        time.sleep(0.01)
+    yield estado
+    servidor.should_exit = True
+    hilo.join(timeout=5)
+
+
+@pytest.fixture
+def mailjet_falso(_servidor_mailjet):
+    """Mailjet falso levantado en MAILJET_API_URL, limpio para cada prueba"""
+    _servidor_mailjet.reiniciar()
+    return _servidor_mailjet
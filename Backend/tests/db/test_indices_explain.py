@@ -0,0 +1,134 @@
+"""
+EXPLAIN de cada consulta frecuente: falla si alguna deja de usar su índice.
+Por defecto corre en SQLite en memoria; con EXPLAIN_DATABASE_URL apunta a un MySQL de pruebas.
+"""
+import importlib.util
+import os
+
+import pytest
+from sqlalchemy import create_engine, select, true
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from models.comentario import Comentario
+from models.imagen import Imagen
+from models.noticia import Noticia
+from models.notificacion import Notificacion
+from models.token_recuperacion import TokenRecuperacion
+from models.usuario import Usuario
+
+TABLAS = [Noticia.__table__, Comentario.__table__, Notificacion.__table__, Imagen.__table__, Usuario.__table__,
+          TokenRecuperacion.__table__]
+
+noticias = Noticia.__table__
+comentario = Comentario.__table__
+notificaciones = Notificacion.__table__
+imagen = Imagen.__table__
+usuario = Usuario.__table__
+token_recuperacion = TokenRecuperacion.__table__
+
+# (consulta de routes/, índice que debe usar)
+CONSULTAS_FRECUENTES = {
+    "noticias por categoria y estado": (
+        select(noticias)
+        .where(noticias.c.categoria_id == 1, noticias.c.estado == 3)
+        .order_by(noticias.c.fecha_creacion.desc(), noticias.c.id_noticia.desc())
+        .limit(11),
+        "ix_noticias_categoria_estado_fecha",
+    ),
+    "noticias por estado": (
+        select(noticias)
+        .where(noticias.c.estado == 3)
+        .order_by(noticias.c.fecha_creacion.desc(), noticias.c.id_noticia.desc())
+        .limit(11),
+        "ix_noticias_estado_fecha",
+    ),
+    "comentarios de una noticia": (
+        select(comentario)
+        .where(comentario.c.noticia_id == 1, comentario.c.estado == true())
+        .order_by(comentario.c.fecha_creacion.desc(), comentario.c.id_comentario.desc())
+        .limit(51),
+        "ix_comentario_noticia_estado_fecha",
+    ),
+    "bandeja de notificaciones": (
+        select(notificaciones)
+        .where(notificaciones.c.usuario_id == 1)
+        .order_by(notificaciones.c.fecha_creacion.desc(), notificaciones.c.id_notificacion.desc())
+        .limit(21),
+        "ix_notificaciones_usuario_fecha",
+    ),
+    "imagen principal de una noticia": (
+        select(imagen)
+        .where(imagen.c.noticia_id == 1)
+        .order_by(imagen.c.id_imagen.asc())
+        .limit(1),
+        "ix_imagen_noticia_id",
+    ),
+    "token de recuperación por hash": (
+        select(token_recuperacion).where(token_recuperacion.c.token_hash == "abc"),
+        "ix_token_recuperacion_token_hash",
+    ),
+    "barrido de tokens de recuperación vencidos": (
+        select(token_recuperacion.c.id_token)
+        .where(token_recuperacion.c.expira < "2026-01-01")
+        .order_by(token_recuperacion.c.expira)
+        .limit(1000),
+        "ix_token_recuperacion_expira",
+    ),
+    "editores a notificar": (
+        select(usuario).where(usuario.c.rol_id == 3),
+        "ix_usuario_rol_id",
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(os.getenv("EXPLAIN_DATABASE_URL", "sqlite://"))
+    with engine.begin() as conn:
+        for tabla in TABLAS:
+            tabla.drop(conn, checkfirst=True)
+            # Sin claves foráneas: no afectan al plan y así no hacen falta las demás tablas
+            conn.execute(CreateTable(tabla, include_foreign_key_constraints=[]))
+            for indice in tabla.indexes:
+                conn.execute(CreateIndex(indice))
+    yield engine
+    with engine.begin() as conn:
+        for tabla in TABLAS:
+            tabla.drop(conn, checkfirst=True)
+    engine.dispose()
+
+
+def indices_usados(conn, consulta) -> str:
+    compilada = consulta.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    if conn.dialect.name == "sqlite":
+        filas = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compilada}").fetchall()
+        return " | ".join(str(fila[-1]) for fila in filas)
+    filas = conn.exec_driver_sql(f"EXPLAIN {compilada}").mappings().fetchall()
+    return " | ".join(f"{fila['table']}:{fila['key']}" for fila in filas)
+
+
+@pytest.mark.parametrize("nombre", CONSULTAS_FRECUENTES)
+def test_consulta_usa_su_indice(engine, nombre):
+    consulta, indice = CONSULTAS_FRECUENTES[nombre]
+    with engine.connect() as conn:
+        plan = indices_usados(conn, consulta)
+    assert indice in plan, f"'{nombre}' ya no usa {indice}. Plan: {plan}"
+
+
+def test_migracion_crea_los_mismos_indices_que_los_modelos():
+    ruta = os.path.join(os.path.dirname(__file__), "..", "..", "migraciones", "versions",
+                        "e28cd4dca3ec_indices_consultas_frecuentes.py")
+    spec = importlib.util.spec_from_file_location("migracion_indices", ruta)
+    migracion = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migracion)
+
+    en_modelos = {
+        indice.name: (tabla.name, [c.name for c in indice.columns])
+        for tabla in TABLAS for indice in tabla.indexes
+    }
+    # Índices que una migración posterior reemplazó
+    reemplazados = {"ix_usuario_reset_token"}  # 5c3e9a17f0b2: tabla token_recuperacion
+    for nombre, tabla, columnas in migracion.INDICES:
+        if nombre in reemplazados:
+            continue
+        assert en_modelos.get(nombre) == (tabla, columnas), f"{nombre} no coincide con los modelos"
@@ -0,0 +1,33 @@
+"""
+Log de consultas lentas: el SQL y los tipos de los parámetros, nunca sus valores.
+"""
+import json
+import logging
+
+from sqlalchemy import create_engine, text
+
+import db.instrumentacion
+from db.instrumentacion import instalar_instrumentacion
+
+
+def test_consulta_lenta_sin_valores(monkeypatch, caplog):
+    monkeypatch.setattr(db.instrumentacion, "UMBRAL_CONSULTA_LENTA", 0)
+    engine = create_engine("sqlite://")
+    instalar_instrumentacion(engine)
+    with caplog.at_level(logging.WARNING, logger="sn52.sql"), engine.connect() as conn:
+        conn.execute(text("SELECT :correo, :hash"), {"correo": "ana@sn52.test", "hash": "$2b$12$secreto"})
+
+    registro = json.loads(caplog.records[-1].getMessage())
+    assert registro["evento"] == "consulta_lenta"
+    assert registro["parametros"] == {"filas": 1, "tipos": ["str", "str"]}
+    assert "sn52.test" not in caplog.text and "secreto" not in caplog.text
+
+
+def test_valores_solo_con_sql_log_parametros(monkeypatch, caplog):
+    monkeypatch.setattr(db.instrumentacion, "UMBRAL_CONSULTA_LENTA", 0)
+    monkeypatch.setattr(db.instrumentacion, "LOG_PARAMETROS", True)
+    engine = create_engine("sqlite://")
+    instalar_instrumentacion(engine)
+    with caplog.at_level(logging.WARNING, logger="sn52.sql"), engine.connect() as conn:
+        conn.execute(text("SELECT :valor"), {"valor": "visible"})
+    assert "visible" in caplog.text
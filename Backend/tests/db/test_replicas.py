@@ -0,0 +1,140 @@
+"""
+Ruteo de lecturas a réplicas con dos archivos SQLite haciendo de primario y réplica.
+Para probar con MySQL basta con cambiar las URLs por las de los dos contenedores.
+"""
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from starlette.requests import Request
+
+from db.session import RegistroEscrituras, RoutingSession
+
+BaseReplica = declarative_base()
+
+
+class Nota(BaseReplica):
+    __tablename__ = "nota"
+    id = Column(Integer, primary_key=True)
+    origen = Column(String(20))
+
+
+@pytest.fixture
+def engines(tmp_path):
+    primario = create_engine(f"sqlite:///{tmp_path / 'primario.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, origen in ((primario, "primario"), (replica, "replica")):
+        BaseReplica.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(Nota.__table__.insert(), {"id": 1, "origen": origen})
+    yield primario, replica
+    primario.dispose()
+    replica.dispose()
+
+
+def crear_sesiones(primario, replica, ventana=5):
+    registro = RegistroEscrituras(ventana)
+    return sessionmaker(
+        class_=RoutingSession, bind=primario,
+        primario=primario, replicas=[replica], registro=registro
+    )
+
+
+def origen_de(db, nota_id=1):
+    return db.execute(select(Nota.origen).where(Nota.id == nota_id)).scalar()
+
+
+def test_lecturas_van_a_la_replica(engines):
+    SessionLocal = crear_sesiones(*engines)
+    with SessionLocal() as db:
+        assert origen_de(db) == "replica"
+
+
+def test_escrituras_van_al_primario_y_la_sesion_se_queda_en_el_primario(engines):
+    primario, replica = engines
+    SessionLocal = crear_sesiones(primario, replica)
+    with SessionLocal() as db:
+        db.add(Nota(id=2, origen="nueva"))
+        db.flush()
+        # Después de escribir, la misma sesión lee del primario
+        assert origen_de(db) == "primario"
+        db.commit()
+
+    with primario.connect() as conn:
+        assert conn.execute(select(Nota.origen).where(Nota.id == 2)).scalar() == "nueva"
+    with replica.connect() as conn:
+        assert conn.execute(select(Nota.origen).where(Nota.id == 2)).scalar() is None
+
+
+def test_select_for_update_va_al_primario(engines):
+    SessionLocal = crear_sesiones(*engines)
+    with SessionLocal() as db:
+        assert db.execute(select(Nota.origen).where(Nota.id == 1).with_for_update()).scalar() == "primario"
+
+
+def test_cliente_que_escribio_lee_del_primario_durante_la_ventana(engines):
+    SessionLocal = crear_sesiones(*engines, ventana=0.2)
+
+    with SessionLocal() as db:
+        db.fijar_cliente("token:abc")
+        db.add(Nota(id=3, origen="nueva"))
+        db.commit()
+
+    with SessionLocal() as db:
+        db.fijar_cliente("token:abc")
+        assert origen_de(db, 3) == "nueva"
+
+    # Otro cliente sigue leyendo de la réplica
+    with SessionLocal() as db:
+        db.fijar_cliente("token:otro")
+        assert origen_de(db) == "replica"
+
+    time.sleep(0.25)
+    with SessionLocal() as db:
+        db.fijar_cliente("token:abc")
+        assert origen_de(db) == "replica"
+
+
+def peticion(metodo: str) -> Request:
+    return Request({"type": "http", "method": metodo, "headers": [], "client": ("10.0.0.1", 1234)})
+
+
+def test_peticion_que_escribe_lee_del_primario_desde_el_principio(engines):
+    SessionLocal = crear_sesiones(*engines)
+
+    # Un PUT/DELETE lee antes de escribir (permisos, estado anterior): esas lecturas van al primario
+    for metodo in ("POST", "PUT", "PATCH", "DELETE"):
+        with SessionLocal() as db:
+            db.fijar_peticion(peticion(metodo))
+            assert origen_de(db) == "primario"
+            assert db.get(Nota, 1).origen == "primario"
+
+    with SessionLocal() as db:
+        db.fijar_peticion(peticion("GET"))
+        assert origen_de(db) == "replica"
+
+
+def test_async_session_usa_el_mismo_ruteo(engines, tmp_path):
+    async def probar():
+        primario = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primario.db'}")
+        replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+        AsyncSessionLocal = async_sessionmaker(
+            bind=primario, class_=AsyncSession, sync_session_class=RoutingSession,
+            primario=primario.sync_engine, replicas=[replica.sync_engine],
+            registro=RegistroEscrituras(5)
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                assert (await db.execute(select(Nota.origen))).scalar() == "replica"
+                db.add(Nota(id=4, origen="nueva"))
+                await db.flush()
+                assert (await db.execute(select(Nota.origen).where(Nota.id == 4))).scalar() == "nueva"
+                await db.commit()
+        finally:
+            await primario.dispose()
+            await replica.dispose()
+
+    asyncio.run(probar())
@@ -0,0 +1,105 @@
+"""
+Mailjet falso para pruebas y desarrollo local.
+
+Imita POST /v3.1/send y guarda los mensajes en memoria. Se le pueden
+inyectar fallos para probar los reintentos de la cola de correos:
+
+    uvicorn tests.fakes.mailjet_falso:app --port 8025
+    MAILJET_API_URL=http://127.0.0.1:8025/ uvicorn main:app
+
+    curl -X POST "http://127.0.0.1:8025/falso/fallos?cantidad=3&status=503"
+    curl -X POST "http://127.0.0.1:8025/falso/rechazar?email=malo@sn52.test"
+    curl http://127.0.0.1:8025/falso/mensajes
+"""
+import threading
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class EstadoMailjet:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.mensajes = []
+            self.peticiones = 0
+            self.fallos_restantes = 0
+            self.status_fallo = 500
+            self.rechazados = set()
+            self.tamanos_lote = []
+
+    def fallar(self, cantidad: int, status: int = 500):
+        """Las próximas `cantidad` peticiones responden `status` (-1 = fallar siempre)"""
+        with self._lock:
+            self.fallos_restantes = cantidad
+            self.status_fallo = status
+
+    def rechazar(self, email: str):
+        """Los mensajes dirigidos a `email` vuelven con Status "error", como un destinatario inválido"""
+        with self._lock:
+            self.rechazados.add(email)
+
+
+estado = EstadoMailjet()
+app = FastAPI(title="Mailjet falso")
+
+
+@app.post("/v3.1/send")
+async def enviar(request: Request):
+    cuerpo = await request.json()
+    mensajes = cuerpo.get("Messages", [])
+    with estado._lock:
+        estado.peticiones += 1
+        if estado.fallos_restantes:
+            if estado.fallos_restantes > 0:
+                estado.fallos_restantes -= 1
+            return JSONResponse({"ErrorMessage": "Fallo inyectado"}, status_code=estado.status_fallo)
+        if len(mensajes) > 50:
+            return JSONResponse({"ErrorMessage": "Too many messages"}, status_code=400)
+        estado.tamanos_lote.append(len(mensajes))
+
+        respuestas = []
+        for mensaje in mensajes:
+            destinatarios = [to["Email"] for to in mensaje.get("To", [])]
+            if estado.rechazados.intersection(destinatarios):
+                respuestas.append({
+                    "Status": "error",
+                    "Errors": [{"ErrorCode": "mj-0013", "StatusCode": 400, "ErrorMessage": "Destinatario rechazado"}],
+                })
+                continue
+            estado.mensajes.append(mensaje)
+            respuestas.append({
+                "Status": "success",
+                "To": [{"Email": email, "MessageUUID": str(uuid.uuid4()), "MessageID": 0} for email in destinatarios],
+            })
+
+    # Como Mailjet: si algún mensaje falla la respuesta es 400 pero trae el estado de cada uno
+    status = 400 if any(r["Status"] != "success" for r in respuestas) else 200
+    return JSONResponse({"Messages": respuestas}, status_code=status)
+
+
+@app.get("/falso/mensajes")
+def mensajes():
+    return {"peticiones": estado.peticiones, "mensajes": estado.mensajes}
+
+
+@app.post("/falso/fallos")
+def fallos(cantidad: int = 1, status: int = 500):
+    estado.fallar(cantidad, status)
+    return {"fallos_restantes": estado.fallos_restantes}
+
+
+@app.post("/falso/rechazar")
+def rechazar(email: str):
+    estado.rechazar(email)
+    return {"rechazados": sorted(estado.rechazados)}
+
+
+@app.post("/falso/reiniciar")
+def reiniciar():
+    estado.reiniciar()
+    return {"ok": True}
@@ -0,0 +1,91 @@
+"""
+Cache del usuario autenticado: una consulta por usuario hasta que un commit lo modifica.
+"""
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+import main  # noqa: F401  registra todos los modelos (sus relaciones se resuelven entre sí)
+from db import Base
+from db.database import engine
+from db.session import SessionLocal
+from models.usuario import Usuario
+from security.auth import get_current_user
+from security.jwt import crear_token
+from security.principal import cache_principal
+
+ID_PRUEBA = 9001
+
+
+@pytest.fixture
+def usuario():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.merge(Usuario(id_usuario=ID_PRUEBA, nombre_usuario="Caché", apellido_usuario="Prueba",
+                         correo_usuario="cache@sn52.test", contrasena_usuario="x", rol_id=2))
+        db.commit()
+    cache_principal.limpiar()
+    yield HTTPAuthorizationCredentials(scheme="Bearer", credentials=crear_token({"sub": ID_PRUEBA}))
+    with SessionLocal() as db:
+        db.query(Usuario).filter(Usuario.id_usuario == ID_PRUEBA).delete()
+        db.commit()
+
+
+@pytest.fixture
+def consultas():
+    sentencias = []
+
+    def registrar(conn, cursor, statement, *args):
+        # Solo la consulta de get_current_user (query().first() -> LIMIT); no los db.get de la prueba
+        if "FROM usuario" in statement and "LIMIT" in statement:
+            sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    yield sentencias
+    event.remove(engine, "before_cursor_execute", registrar)
+
+
+def test_solo_consulta_la_primera_vez(usuario, consultas):
+    antes = cache_principal.resumen()
+    primero = get_current_user(usuario)
+    segundo = get_current_user(usuario)
+
+    assert primero is segundo and primero.nombre_usuario == "Caché"
+    assert len(consultas) == 1
+    despues = cache_principal.resumen()
+    assert despues["aciertos"] - antes["aciertos"] == 1
+    assert despues["fallos"] - antes["fallos"] == 1
+
+
+def test_un_commit_que_cambia_el_usuario_lo_invalida(usuario, consultas):
+    assert get_current_user(usuario).rol_id == 2
+
+    # Cambio de rol
+    with SessionLocal() as db:
+        db.get(Usuario, ID_PRUEBA).rol_id = 3
+        db.commit()
+
+    assert get_current_user(usuario).rol_id == 3
+    assert len(consultas) == 2
+
+
+def test_asignaciones_sin_cambio_no_invalidan(usuario, consultas):
+    get_current_user(usuario)
+    with SessionLocal() as db:
+        db.get(Usuario, ID_PRUEBA).intentos_fallidos = 0  # como hace el login exitoso
+        db.commit()
+
+    get_current_user(usuario)
+    assert len(consultas) == 1
+
+
+def test_usuario_borrado_deja_de_autenticar(usuario):
+    get_current_user(usuario)
+    with SessionLocal() as db:
+        db.delete(db.get(Usuario, ID_PRUEBA))
+        db.commit()
+
+    with pytest.raises(HTTPException) as error:
+        get_current_user(usuario)
+    assert error.value.status_code == 401
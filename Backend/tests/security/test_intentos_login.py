@@ -0,0 +1,75 @@
+"""
+Ventanas deslizantes del limitador de login, con un reloj manual.
+"""
+import pytest
+from fastapi import HTTPException
+
+from security.intentos_login import BackendMemoria, LimitadorLogin
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj():
+    return Reloj()
+
+
+@pytest.fixture
+def limitador(reloj):
+    return LimitadorLogin(BackendMemoria(), intentos_cuenta=3, ventana_cuenta=60, intentos_ip=5, ventana_ip=30, reloj=reloj)
+
+
+def test_bloquea_al_llegar_al_limite_de_la_cuenta(limitador):
+    intentos = [limitador.registrar_fallo("1.1.1.1", "Ana@sn52.test") for _ in range(3)]
+
+    assert intentos == [1, 2, 3]
+    assert not limitador.debe_bloquear(intentos[1])
+    assert limitador.debe_bloquear(intentos[2])
+
+
+def test_la_ventana_se_desliza(limitador, reloj):
+    limitador.registrar_fallo("1.1.1.1", "ana@sn52.test")
+    reloj.ahora += 40
+    limitador.registrar_fallo("1.1.1.1", "ana@sn52.test")
+    reloj.ahora += 30  # el primer intento ya salió de la ventana de 60 s
+
+    assert limitador.registrar_fallo("1.1.1.1", "ana@sn52.test") == 2
+
+
+def test_limpiar_cuenta_reinicia_el_conteo(limitador):
+    limitador.registrar_fallo("1.1.1.1", "ana@sn52.test")
+    limitador.registrar_fallo("1.1.1.1", "ana@sn52.test")
+    limitador.limpiar_cuenta("ana@sn52.test")
+
+    assert limitador.registrar_fallo("1.1.1.1", "ana@sn52.test") == 1
+
+
+def test_limite_por_ip_aunque_cambie_la_cuenta(limitador, reloj):
+    for i in range(5):
+        limitador.verificar_ip("2.2.2.2")
+        limitador.registrar_fallo("2.2.2.2", f"usuario{i}@sn52.test")
+
+    with pytest.raises(HTTPException) as error:
+        limitador.verificar_ip("2.2.2.2")
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "30"
+    limitador.verificar_ip("3.3.3.3")  # otras IPs siguen entrando
+
+    reloj.ahora += 31
+    limitador.verificar_ip("2.2.2.2")
+
+
+def test_backend_memoria_acota_las_claves(reloj):
+    backend = BackendMemoria(maximo_claves=3)
+    for i in range(10):
+        backend.registrar(f"ip:{i}", reloj(), 60)
+
+    assert backend.claves() == 3
+    assert backend.contar("ip:9", reloj(), 60) == 1
+    assert backend.contar("ip:0", reloj(), 60) == 0
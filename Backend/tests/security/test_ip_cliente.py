@@ -0,0 +1,31 @@
+"""
+IP del cliente detrás de proxies confiables (X-Forwarded-For).
+"""
+from starlette.requests import Request
+
+from security.ip_cliente import ResolutorIP
+
+
+def peticion(par: str, reenviado: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", reenviado.encode())] if reenviado else []
+    return Request({"type": "http", "method": "POST", "headers": headers, "client": (par, 443)})
+
+
+def test_sin_proxies_confiables_se_ignora_el_header():
+    assert ResolutorIP("").ip(peticion("10.0.0.2", "1.1.1.1")) == "10.0.0.2"
+
+
+def test_salta_los_proxies_confiables_de_derecha_a_izquierda():
+    resolutor = ResolutorIP("10.0.0.0/8, 127.0.0.1")
+    # El cliente escribió 6.6.6.6 a mano; el primer proxy agregó su IP real
+    assert resolutor.ip(peticion("10.0.0.2", "6.6.6.6, 1.1.1.1, 10.0.0.9")) == "1.1.1.1"
+    # Una conexión directa que no viene de un proxy confiable no puede elegir su IP
+    assert resolutor.ip(peticion("2.2.2.2", "1.1.1.1")) == "2.2.2.2"
+    # Sin header, la del proxy
+    assert resolutor.ip(peticion("10.0.0.2")) == "10.0.0.2"
+
+
+def test_comodin_toma_la_ip_que_agrego_el_proxy():
+    resolutor = ResolutorIP("*")
+    assert resolutor.ip(peticion("100.64.0.1", "6.6.6.6, 1.1.1.1")) == "1.1.1.1"
+    assert resolutor.ip(peticion("100.64.0.1")) == "100.64.0.1"
@@ -0,0 +1,54 @@
+"""
+Pool acotado de bcrypt: los hashes no bloquean el event loop y el exceso se rechaza con 503.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from security.passwords import PoolHash, encriptar_contrasena_async, verificar_contrasena_async
+
+
+def test_hash_y_verificacion_async():
+    async def flujo():
+        hash_ = await encriptar_contrasena_async("secreta")
+        return await verificar_contrasena_async("secreta", hash_), await verificar_contrasena_async("otra", hash_)
+
+    assert asyncio.run(flujo()) == (True, False)
+
+
+def test_rechaza_cuando_la_cola_esta_llena():
+    pool = PoolHash(hilos=1, cola_maxima=2)
+    liberar = threading.Event()
+
+    async def rafaga():
+        tareas = [asyncio.ensure_future(pool.ejecutar(liberar.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert pool.resumen()["en_curso"] == 1 and pool.resumen()["en_cola"] == 2
+        with pytest.raises(HTTPException) as error:
+            await pool.ejecutar(time.sleep, 0)
+        liberar.set()
+        await asyncio.gather(*tareas)
+        return error.value
+
+    error = asyncio.run(rafaga())
+    assert error.status_code == 503
+    resumen = pool.resumen()
+    assert resumen["rechazadas"] == 1 and resumen["completadas"] == 3
+    assert resumen["cola_maxima_observada"] == 2
+
+
+def test_el_event_loop_sigue_respondiendo():
+    pool = PoolHash(hilos=1, cola_maxima=10)
+
+    async def medir():
+        trabajo = asyncio.ensure_future(pool.ejecutar(time.sleep, 0.3))
+        inicio = time.perf_counter()
+        await asyncio.sleep(0.01)
+        latencia = time.perf_counter() - inicio
+        await trabajo
+        return latencia
+
+    assert asyncio.run(medir()) < 0.1
@@ -0,0 +1,172 @@
+"""
+Modo sin estado: el usuario sale de los claims del token y los cambios de
+contraseña, rol o bloqueo revocan los tokens emitidos antes.
+"""
+import calendar
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+import main  # noqa: F401  registra todos los modelos (sus relaciones se resuelven entre sí)
+import security.auth
+import security.revocacion
+from db import Base
+from db.database import engine
+from db.session import SessionLocal
+from models.token_revocado import TokenRevocado
+from models.usuario import Usuario
+from security.auth import get_current_user
+from security.jwt import crear_token, claims_usuario
+from security.revocacion import RegistroRevocaciones
+from utils.bloom import FiltroBloom
+
+ID_PRUEBA = 9101
+
+
+def credenciales(claims: dict) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=crear_token(claims))
+
+
+@pytest.fixture
+def usuario(monkeypatch):
+    monkeypatch.setattr(security.auth, "AUTH_MODO", "sin_estado")
+    monkeypatch.setattr(security.revocacion, "REVOCACION_ACTIVA", True)
+    registro = RegistroRevocaciones()
+    monkeypatch.setattr(security.auth, "revocaciones", registro)
+    monkeypatch.setattr(security.revocacion, "revocaciones", registro)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        usuario = db.merge(Usuario(id_usuario=ID_PRUEBA, nombre_usuario="Sin", apellido_usuario="Estado",
+                                   correo_usuario="sin_estado@sn52.test", contrasena_usuario="x", rol_id=2))
+        db.commit()
+        claims = claims_usuario(usuario)
+    yield claims
+    with SessionLocal() as db:
+        db.query(Usuario).filter(Usuario.id_usuario == ID_PRUEBA).delete()
+        db.query(TokenRevocado).filter(TokenRevocado.id_usuario == ID_PRUEBA).delete()
+        db.commit()
+
+
+@pytest.fixture
+def consultas():
+    sentencias = []
+
+    def registrar(conn, cursor, statement, *args):
+        sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    yield sentencias
+    event.remove(engine, "before_cursor_execute", registrar)
+
+
+def modificar(**cambios):
+    with SessionLocal() as db:
+        usuario = db.get(Usuario, ID_PRUEBA)
+        for columna, valor in cambios.items():
+            setattr(usuario, columna, valor)
+        db.commit()
+
+
+def test_filtro_bloom_sin_falsos_negativos():
+    filtro = FiltroBloom(1000)
+    for i in range(1000):
+        filtro.agregar(i)
+
+    assert all(i in filtro for i in range(1000))
+    falsos = sum(1 for i in range(1000, 11000) if i in filtro)
+    assert falsos < 300  # ~1% esperado; margen amplio
+
+
+def test_sin_estado_no_consulta_la_base(usuario, consultas):
+    token = credenciales(usuario)
+    get_current_user(token)  # puede sincronizar las revocaciones
+    consultas.clear()
+
+    actual = get_current_user(token)
+
+    assert consultas == []
+    assert actual.id_usuario == ID_PRUEBA and actual.rol_id == 2
+    assert actual.nombre_usuario == "Sin" and actual.correo_usuario == "sin_estado@sn52.test"
+
+
+def test_cambio_de_contrasena_revoca_tokens_anteriores(usuario):
+    viejo = credenciales(usuario)
+    get_current_user(viejo)
+
+    modificar(contrasena_usuario="nueva")
+
+    with pytest.raises(HTTPException) as error:
+        get_current_user(viejo)
+    assert error.value.status_code == 401
+
+    # Un login inmediato (mismo segundo que el cambio) emite un token válido
+    assert get_current_user(credenciales(usuario)).id_usuario == ID_PRUEBA
+
+
+def test_modo_cache_no_guarda_revocaciones(usuario, monkeypatch):
+    monkeypatch.setattr(security.revocacion, "REVOCACION_ACTIVA", False)
+    modificar(contrasena_usuario="otra")
+
+    with SessionLocal() as db:
+        assert db.get(TokenRevocado, ID_PRUEBA) is None
+
+
+def test_desbloquear_no_revoca(usuario):
+    token = credenciales(usuario)
+    modificar(intentos_fallidos=1, bloqueado_hasta=None)
+
+    assert get_current_user(token).id_usuario == ID_PRUEBA
+
+
+def test_otro_worker_ve_la_revocacion_al_sincronizar(usuario):
+    token_iat = int(time.time())
+    modificar(rol_id=3)
+
+    otro_worker = RegistroRevocaciones()
+    assert not otro_worker.revocado(ID_PRUEBA, token_iat)
+    with SessionLocal() as db:
+        otro_worker.sincronizar(db)
+    assert otro_worker.revocado(ID_PRUEBA, token_iat)
+
+
+def test_revocaciones_vencidas_se_borran(usuario):
+    with SessionLocal() as db:
+        db.merge(TokenRevocado(id_usuario=ID_PRUEBA, revocado_desde=datetime.utcnow() - timedelta(days=2)))
+        db.commit()
+
+    registro = RegistroRevocaciones()
+    with SessionLocal() as db:
+        registro.sincronizar(db)
+        assert db.get(TokenRevocado, ID_PRUEBA) is None
+    assert not registro.revocado(ID_PRUEBA, 0)
+
+
+def test_revocacion_que_confirma_tarde_no_se_pierde(usuario):
+    # Otro worker ya sincronizó una revocación más nueva de otro usuario
+    otro_usuario = ID_PRUEBA + 1
+    ahora = datetime.utcnow().replace(microsecond=0)
+    with SessionLocal() as db:
+        db.merge(TokenRevocado(id_usuario=otro_usuario, revocado_desde=ahora + timedelta(seconds=1)))
+        db.commit()
+    otro_worker = RegistroRevocaciones()
+    with SessionLocal() as db:
+        otro_worker.sincronizar(db)
+
+    # Llega después una revocación con revocado_desde anterior (su transacción confirmó tarde)
+    with SessionLocal() as db:
+        db.merge(TokenRevocado(id_usuario=ID_PRUEBA, revocado_desde=ahora))
+        db.commit()
+    try:
+        with SessionLocal() as db:
+            otro_worker.sincronizar(db)
+        iat = calendar.timegm(ahora.utctimetuple())
+        assert otro_worker.revocado(ID_PRUEBA, iat - 60)
+        assert otro_worker.revocado(otro_usuario, iat)
+    finally:
+        with SessionLocal() as db:
+            db.query(TokenRevocado).filter(TokenRevocado.id_usuario == otro_usuario).delete()
+            db.commit()
@@ -0,0 +1,62 @@
+"""
+Cache de respuestas serializadas: single-flight e invalidación por etiquetas.
+"""
+import asyncio
+
+from services.cache_respuestas import CacheRespuestas
+
+
+def test_single_flight_una_carga_para_muchas_peticiones():
+    cache = CacheRespuestas(10)
+    cargas = 0
+
+    async def cargar():
+        nonlocal cargas
+        cargas += 1
+        await asyncio.sleep(0.05)
+        return b"{}", {}
+
+    async def muchas():
+        return await asyncio.gather(*[cache.obtener_o_cargar("k", {"noticia:1"}, cargar) for _ in range(20)])
+
+    resultados = asyncio.run(muchas())
+    assert cargas == 1
+    assert all(r == (b"{}", {}) for r in resultados)
+    resumen = cache.resumen()
+    assert (resumen["fallos"], resumen["esperas_single_flight"]) == (1, 19)
+
+
+def test_si_falla_la_carga_los_que_esperaban_reintentan():
+    cache = CacheRespuestas(10)
+    intentos = 0
+
+    async def cargar():
+        nonlocal intentos
+        intentos += 1
+        await asyncio.sleep(0.01)
+        if intentos == 1:
+            raise RuntimeError("base caída")
+        return b"[]", {}
+
+    async def dos():
+        return await asyncio.gather(
+            cache.obtener_o_cargar("k", set(), cargar), cache.obtener_o_cargar("k", set(), cargar),
+            return_exceptions=True,
+        )
+
+    primero, segundo = asyncio.run(dos())
+    assert isinstance(primero, RuntimeError)
+    assert segundo == (b"[]", {})
+
+
+def test_invalidar_por_etiqueta_y_limite_lru():
+    cache = CacheRespuestas(2)
+    cache.guardar("a", b"1", {}, {"noticia:1", "usuarios"})
+    cache.guardar("b", b"2", {}, {"noticia:2"})
+    cache.invalidar("noticia:1")
+    assert cache.obtener("a") is None and cache.obtener("b") is not None
+
+    cache.guardar("c", b"3", {}, set())
+    cache.guardar("d", b"4", {}, set())
+    assert cache.obtener("b") is None  # la menos usada salió
+
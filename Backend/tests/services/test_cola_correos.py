@@ -0,0 +1,103 @@
+"""
+Cola de correos contra el Mailjet falso: envío, reintentos con espera y dead letter.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.correo_pendiente import CorreoPendiente
+from services.cola_correos import (
+    TrabajadorCorreos, encolar_correo, calcular_espera, ENVIADO, PENDIENTE, FALLIDO
+)
+
+
+@pytest.fixture
+def sesiones(tmp_path):
+    url = tmp_path / "cola.db"
+    engine = create_engine(f"sqlite:///{url}")
+    CorreoPendiente.__table__.create(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    yield sessionmaker(bind=engine), async_sessionmaker(async_engine, expire_on_commit=False)
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+def correos(Sesion):
+    with Sesion() as db:
+        return db.scalars(select(CorreoPendiente).order_by(CorreoPendiente.id_correo)).all()
+
+
+def test_calcular_espera_exponencial_con_tope():
+    assert [calcular_espera(i, base=30, maximo=200) for i in range(1, 6)] == [30, 60, 120, 200, 200]
+
+
+def test_encolar_valida_tipo(sesiones):
+    Sesion, _ = sesiones
+    with Sesion() as db:
+        with pytest.raises(ValueError):
+            encolar_correo(db, "desconocido", destinatario="x@sn52.test")
+
+
+def test_envia_los_correos_encolados(sesiones, mailjet_falso):
+    Sesion, AsyncSesion = sesiones
+    with Sesion() as db:
+        encolar_correo(db, "bienvenida", destinatario="ana@sn52.test", nombre="Ana")
+        encolar_correo(db, "borrador", destinatarios=[{"email": "ed@sn52.test", "nombre": "Ed"}],
+                       titulo_noticia="Título", escritor_nombre="Ana")
+        db.commit()
+
+    procesados = asyncio.run(TrabajadorCorreos(session_factory=AsyncSesion).procesar_lote())
+
+    assert procesados == 2
+    assert [c.estado for c in correos(Sesion)] == [ENVIADO, ENVIADO]
+    assert [m["To"][0]["Email"] for m in mailjet_falso.mensajes] == ["ana@sn52.test", "ed@sn52.test"]
+
+
+def test_reintenta_con_espera_y_luego_envia(sesiones, mailjet_falso):
+    Sesion, AsyncSesion = sesiones
+    with Sesion() as db:
+        encolar_correo(db, "recuperacion", destinatario="ana@sn52.test", nombre="Ana", token="abc")
+        db.commit()
+    mailjet_falso.fallar(1, status=503)
+    trabajador = TrabajadorCorreos(session_factory=AsyncSesion, backoff_base=60)
+
+    asyncio.run(trabajador.procesar_lote())
+    correo, = correos(Sesion)
+    assert correo.estado == PENDIENTE and correo.intentos == 1
+    assert "503" in correo.ultimo_error
+    assert correo.proximo_intento > datetime.utcnow() + timedelta(seconds=50)
+
+    # Mientras no venza la espera el correo no se vuelve a tomar
+    assert asyncio.run(trabajador.procesar_lote()) == 0
+
+    with Sesion() as db:
+        db.get(CorreoPendiente, correo.id_correo).proximo_intento = datetime.utcnow()
+        db.commit()
+    asyncio.run(trabajador.procesar_lote())
+    correo, = correos(Sesion)
+    assert correo.estado == ENVIADO and correo.intentos == 2
+    assert "abc" in mailjet_falso.mensajes[0]["HTMLPart"]
+    # Enviado el correo, el token ya no queda en la tabla
+    assert json.loads(correo.datos) == {"destinatario": "ana@sn52.test", "nombre": "Ana"}
+
+
+def test_pasa_a_fallido_al_agotar_los_intentos(sesiones, mailjet_falso):
+    Sesion, AsyncSesion = sesiones
+    with Sesion() as db:
+        encolar_correo(db, "bienvenida", destinatario="ana@sn52.test", nombre="Ana")
+        db.commit()
+    mailjet_falso.fallar(-1)
+    trabajador = TrabajadorCorreos(session_factory=AsyncSesion, max_intentos=3, backoff_base=0)
+
+    for _ in range(5):
+        asyncio.run(trabajador.procesar_lote())
+
+    correo, = correos(Sesion)
+    assert correo.estado == FALLIDO and correo.intentos == 3
+    assert mailjet_falso.peticiones == 3
+    assert json.loads(correo.datos)["destinatario"] == "ana@sn52.test"
@@ -0,0 +1,66 @@
+"""
+Envío por lotes a Mailjet: empaquetado en el arreglo Messages y resultado por mensaje.
+"""
+import asyncio
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.correo_pendiente import CorreoPendiente
+from services.cola_correos import TrabajadorCorreos, encolar_correo, ENVIADO, PENDIENTE
+from services.mail_service import enviar_lote, mensaje_bienvenida, MAILJET_MAX_MENSAJES
+
+
+def test_empaqueta_hasta_el_limite_por_llamada(mailjet_falso):
+    mensajes = [mensaje_bienvenida(f"u{i}@sn52.test", f"U{i}") for i in range(120)]
+
+    resultados = enviar_lote(mensajes)
+
+    assert mailjet_falso.tamanos_lote == [MAILJET_MAX_MENSAJES, MAILJET_MAX_MENSAJES, 20]
+    assert all(r.ok and len(r.ids) == 1 for r in resultados)
+
+
+def test_reporta_el_resultado_de_cada_mensaje(mailjet_falso):
+    mailjet_falso.rechazar("malo@sn52.test")
+    mensajes = [mensaje_bienvenida(email, "X") for email in ("a@sn52.test", "malo@sn52.test", "b@sn52.test")]
+
+    resultados = enviar_lote(mensajes)
+
+    assert [r.ok for r in resultados] == [True, False, True]
+    assert "Destinatario rechazado" in resultados[1].error
+
+
+def test_error_general_falla_todo_el_lote(mailjet_falso):
+    mailjet_falso.fallar(1, status=401)
+
+    resultados = enviar_lote([mensaje_bienvenida("a@sn52.test", "A"), mensaje_bienvenida("b@sn52.test", "B")])
+
+    assert [r.ok for r in resultados] == [False, False]
+    assert "401" in resultados[0].error
+
+
+def test_trabajador_agrupa_los_correos_de_varios_borradores(tmp_path, mailjet_falso):
+    url = tmp_path / "cola.db"
+    engine = create_engine(f"sqlite:///{url}")
+    CorreoPendiente.__table__.create(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    Sesion = sessionmaker(bind=engine)
+    mailjet_falso.rechazar("editor3@sn52.test")
+    with Sesion() as db:
+        for borrador in range(10):
+            for editor in range(5):
+                encolar_correo(db, "borrador", destinatarios=[{"email": f"editor{editor}@sn52.test", "nombre": "Ed"}],
+                               titulo_noticia=f"Borrador {borrador}", escritor_nombre="Ana")
+        db.commit()
+
+    trabajador = TrabajadorCorreos(session_factory=async_sessionmaker(async_engine, expire_on_commit=False))
+    asyncio.run(trabajador.procesar_lote())
+    asyncio.run(async_engine.dispose())
+
+    # 50 correos -> una sola llamada a Mailjet
+    assert mailjet_falso.peticiones == 1
+    with Sesion() as db:
+        estados = {(c.estado, "editor3" in c.datos) for c in db.scalars(select(CorreoPendiente))}
+    assert estados == {(ENVIADO, False), (PENDIENTE, True)}
+    engine.dispose()
@@ -0,0 +1,27 @@
+"""
+Plantillas de correo: escape de los datos del usuario y cache de render.
+"""
+from services.mail_service import mensaje_borrador, mensaje_recuperacion
+from services.plantillas_correo import cache_render
+
+
+def test_escapa_los_datos_del_usuario():
+    html = mensaje_borrador([{"email": "e@sn52.test", "nombre": "Ed"}], "<script>x</script>", "Ana")["HTMLPart"]
+    assert "<script>" not in html
+    assert "&lt;script&gt;x&lt;/script&gt;" in html
+
+
+def test_fan_out_de_un_borrador_se_renderiza_una_vez():
+    cache_render.limpiar()
+    for i in range(10):
+        mensaje_borrador([{"email": f"e{i}@sn52.test", "nombre": "Ed"}], "Mismo borrador", "Ana")
+    resumen = cache_render.resumen()
+    assert resumen["renders"] == 1
+    assert resumen["aciertos"] == 9
+
+
+def test_los_correos_con_token_no_se_cachean():
+    cache_render.limpiar()
+    html = mensaje_recuperacion("a@sn52.test", "Ana", "token-secreto")["HTMLPart"]
+    assert "token-secreto" in html
+    assert cache_render.resumen()["entradas"] == 0
@@ -0,0 +1,58 @@
+"""
+Resumen de borradores: los avisos retenidos se juntan en un correo por editor al cerrar la ventana.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.correo_pendiente import CorreoPendiente
+from services.cola_correos import TrabajadorCorreos, encolar_para_resumen, fin_ventana_resumen, AGRUPANDO, ENVIADO
+
+
+def test_ventanas_alineadas():
+    assert fin_ventana_resumen(datetime(2026, 5, 4, 10, 0), minutos=60) == datetime(2026, 5, 4, 11, 0)
+    assert fin_ventana_resumen(datetime(2026, 5, 4, 10, 59, 59), minutos=60) == datetime(2026, 5, 4, 11, 0)
+    assert fin_ventana_resumen(datetime(2026, 5, 4, 10, 7), minutos=15) == datetime(2026, 5, 4, 10, 15)
+
+
+def test_un_correo_por_editor_al_cerrar_la_ventana(tmp_path, mailjet_falso):
+    url = tmp_path / "cola.db"
+    engine = create_engine(f"sqlite:///{url}")
+    CorreoPendiente.__table__.create(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    Sesion = sessionmaker(bind=engine)
+    trabajador = TrabajadorCorreos(session_factory=async_sessionmaker(async_engine, expire_on_commit=False))
+
+    with Sesion() as db:
+        for i in range(4):
+            for editor in ("ana@sn52.test", "beto@sn52.test"):
+                encolar_para_resumen(db, {"email": editor, "nombre": editor[:4]},
+                                     titulo_noticia=f"Borrador {i}", escritor_nombre="Escritor")
+        db.commit()
+
+    async def ciclo():
+        await trabajador.agrupar_resumenes()
+        return await trabajador.procesar_lote()
+
+    # Ventana abierta: nada sale
+    assert asyncio.run(ciclo()) == 0
+    assert mailjet_falso.peticiones == 0
+
+    with Sesion() as db:
+        db.execute(update(CorreoPendiente).where(CorreoPendiente.estado == AGRUPANDO)
+                   .values(proximo_intento=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+    asyncio.run(ciclo())
+    asyncio.run(async_engine.dispose())
+
+    with Sesion() as db:
+        correos = db.scalars(select(CorreoPendiente)).all()
+    assert [(c.tipo, c.estado) for c in correos] == [("resumen_borradores", ENVIADO)] * 2
+    assert len(json.loads(correos[0].datos)["borradores"]) == 4
+    assert sorted(m["To"][0]["Email"] for m in mailjet_falso.mensajes) == ["ana@sn52.test", "beto@sn52.test"]
+    assert "Borrador 3" in mailjet_falso.mensajes[0]["HTMLPart"]
+    engine.dispose()
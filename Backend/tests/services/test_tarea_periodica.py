@@ -0,0 +1,37 @@
+"""
+TareaPeriodica: repite sin esperar mientras haya trabajo, sobrevive a errores
+y detener() corta la espera.
+"""
+import asyncio
+
+from services.tarea_periodica import TareaPeriodica
+
+
+class Contador(TareaPeriodica):
+    def __init__(self, resultados: list):
+        super().__init__(intervalo=3600)
+        self.resultados = resultados
+        self.pasos = 0
+        self.esperando = asyncio.Event()
+
+    async def paso(self):
+        self.pasos += 1
+        resultado = self.resultados.pop(0)
+        if not self.resultados:
+            self.esperando.set()  # lo que sigue es la espera del intervalo
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+
+def test_sigue_mientras_hay_trabajo_y_se_detiene_sin_esperar_el_intervalo():
+    async def correr():
+        tarea = Contador([5, 3, RuntimeError("base caída")])
+        tarea.iniciar()
+        await asyncio.wait_for(tarea.esperando.wait(), timeout=1)
+        await asyncio.wait_for(tarea.detener(), timeout=1)
+        return tarea
+
+    tarea = asyncio.run(correr())
+    # 5 y 3: sin esperar; el error no mata la tarea, espera el intervalo y detener() lo corta
+    assert tarea.pasos == 3 and tarea._tarea is None
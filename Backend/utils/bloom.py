@@ -0,0 +1,45 @@
+# utils/bloom.py
+"""
+Filtro de Bloom: pertenencia aproximada en poca memoria.
+
+`x in filtro` puede dar falsos positivos (con probabilidad ~tasa_falsos)
+pero nunca falsos negativos, así que sirve de filtro rápido delante de una
+estructura exacta: si dice que no, no hace falta mirar más.
+"""
+import hashlib
+import math
+
+
+class FiltroBloom:
+    def __init__(self, capacidad: int, tasa_falsos: float = 0.01):
+        capacidad = max(capacidad, 1)
+        self.capacidad = capacidad
+        self.tasa_falsos = tasa_falsos
+        # Tamaño y número de hashes óptimos para `capacidad` elementos
+        self.bits = max(8, int(-capacidad * math.log(tasa_falsos) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacidad * math.log(2)))
+        self._arreglo = bytearray((self.bits + 7) // 8)
+        self.elementos = 0
+
+    def _posiciones(self, elemento):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de dos hashes de 64 bits
+        digest = hashlib.blake2b(str(elemento).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def agregar(self, elemento):
+        for posicion in self._posiciones(elemento):
+            self._arreglo[posicion >> 3] |= 1 << (posicion & 7)
+        self.elementos += 1
+
+    def __contains__(self, elemento) -> bool:
+        return all(self._arreglo[p >> 3] & (1 << (p & 7)) for p in self._posiciones(elemento))
+
+    @property
+    def lleno(self) -> bool:
+        return self.elementos >= self.capacidad
+
+    @property
+    def bytes(self) -> int:
+        return len(self._arreglo)
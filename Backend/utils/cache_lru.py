@@ -0,0 +1,75 @@
+# utils/cache_lru.py
+"""
+Cache en memoria LRU con expiración (TTL), segura entre hilos.
+
+Es por proceso: con varios workers de uvicorn cada uno tiene la suya, así
+que el TTL es el máximo tiempo que otro worker puede servir un dato viejo
+después de una invalidación.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_FALTA = object()
+
+
+class CacheLRU:
+    def __init__(self, maximo: int, ttl: float | None = None):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()  # clave -> (expira, valor)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expirados = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave, defecto=None):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave, _FALTA)
+            if entrada is _FALTA:
+                self.fallos += 1
+                return defecto
+            expira, valor = entrada
+            if expira is not None and expira <= ahora:
+                del self._datos[clave]
+                self.expirados += 1
+                self.fallos += 1
+                return defecto
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave, valor, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else ttl
+        expira = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._datos[clave] = (expira, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, *claves):
+        with self._lock:
+            for clave in claves:
+                if self._datos.pop(clave, _FALTA) is not _FALTA:
+                    self.invalidaciones += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def resumen(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "maximo": self.maximo,
+                "ttl_s": self.ttl,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expirados": self.expirados,
+                "invalidaciones": self.invalidaciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
@@ -0,0 +1,261 @@
+# utils/compresion.py
+"""
+Compresión de respuestas (gzip y brotli) según Accept-Encoding.
+
+MiddlewareCompresion comprime las respuestas de tipos de texto (JSON, HTML,
+CSS, JS, SVG...) que superan COMPRESION_MINIMO_BYTES. Si la respuesta llega
+en un solo mensaje (lo normal en la API) se comprime de una vez y se manda
+con Content-Length; si llega por partes (StreamingResponse, FileResponse)
+cada parte se comprime y se envía en cuanto llega, sin juntar el cuerpo.
+
+Una respuesta comprimida es otra representación: su ETag pasa a ser débil
+(W/"...") para no anunciar los mismos bytes que la versión sin comprimir.
+db/validadores.py compara If-None-Match de forma débil, así que el 304
+sigue funcionando con el ETag que guardó el navegador.
+
+Los archivos de /uploads no se comprimen en cada petición: precomprimir()
+deja al lado del archivo sus variantes .gz y .br (al subirlo) y
+StaticPrecomprimidos sirve la que acepte el cliente. Las imágenes (JPEG,
+PNG, WebP) ya vienen comprimidas y se sirven tal cual.
+
+Brotli es opcional: sin el paquete `brotli` solo se ofrece gzip.
+"""
+import gzip
+import mimetypes
+import os
+import zlib
+
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+load_dotenv()
+
+COMPRESION_ACTIVA = os.getenv("COMPRESION_ACTIVA", "1") == "1"
+COMPRESION_MINIMO_BYTES = int(os.getenv("COMPRESION_MINIMO_BYTES", "1024"))  # por debajo no compensa
+COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", "6"))  # 1-9
+COMPRESION_NIVEL_BROTLI = int(os.getenv("COMPRESION_NIVEL_BROTLI", "4"))  # 0-11; 4-5 rinde bien en respuestas dinámicas
+
+TIPOS_COMPRIMIBLES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+# Extensión de la variante precomprimida de cada codificación
+EXTENSIONES = {"br": ".br", "gzip": ".gz"}
+
+
+def codificaciones_disponibles() -> tuple:
+    # Por orden de preferencia del servidor cuando el cliente las acepta por igual
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def elegir_codificacion(accept_encoding: str | None, disponibles: tuple = None) -> str | None:
+    """La codificación a usar según Accept-Encoding (con sus q=), o None para mandar sin comprimir"""
+    if not accept_encoding:
+        return None
+    disponibles = disponibles or codificaciones_disponibles()
+    pesos = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        pesos[nombre.strip()] = q
+    comodin = pesos.get("*", 0.0)
+    candidatas = [(pesos.get(c, comodin), -i, c) for i, c in enumerate(disponibles)]
+    q, _, elegida = max(candidatas)
+    return elegida if q > 0 else None
+
+
+def es_comprimible(content_type: str | None) -> bool:
+    return bool(content_type) and content_type.startswith(TIPOS_COMPRIMIBLES)
+
+
+class Compresor:
+    """Compresión incremental: comprimir() devuelve lo que ya se puede enviar, terminar() el resto"""
+
+    def __init__(self, codificacion: str, nivel: int | None = None):
+        self.codificacion = codificacion
+        if codificacion == "br":
+            self._br = brotli.Compressor(quality=COMPRESION_NIVEL_BROTLI if nivel is None else nivel)
+        else:
+            # wbits 16 + MAX_WBITS: formato gzip (cabecera y CRC) en vez de zlib
+            self._gz = zlib.compressobj(COMPRESION_NIVEL_GZIP if nivel is None else nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        if self.codificacion == "br":
+            return self._br.process(datos) + self._br.flush()
+        # Z_SYNC_FLUSH: lo comprimido hasta aquí sale ya, sin esperar al resto del cuerpo
+        return self._gz.compress(datos) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self, datos: bytes = b"") -> bytes:
+        if self.codificacion == "br":
+            return self._br.process(datos) + self._br.finish()
+        return self._gz.compress(datos) + self._gz.flush(zlib.Z_FINISH)
+
+
+def _etag_debil(cabeceras: MutableHeaders):
+    etag = cabeceras.get("etag")
+    if etag and not etag.startswith("W/"):
+        cabeceras["etag"] = f"W/{etag}"
+
+
+def _agregar_vary(cabeceras: MutableHeaders):
+    vary = cabeceras.get("vary")
+    if not vary:
+        cabeceras["vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        cabeceras["vary"] = f"{vary}, Accept-Encoding"
+
+
+class MiddlewareCompresion:
+    """
+    Middleware ASGI: comprime con gzip o brotli las respuestas de texto que
+    superan `minimo` bytes. Deja pasar tal cual las que ya traen
+    Content-Encoding (variantes precomprimidas), las parciales (206), los
+    HEAD y los tipos que no son de texto.
+    """
+
+    def __init__(self, app, minimo: int = COMPRESION_MINIMO_BYTES):
+        self.app = app
+        self.minimo = minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding"))
+        inicio = None  # mensaje http.response.start retenido hasta ver el primer trozo del cuerpo
+        compresor = None
+        pasar = False
+
+        async def enviar(message):
+            nonlocal inicio, compresor, pasar
+            if pasar:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                cabeceras = Headers(raw=message["headers"])
+                if (message["status"] in (204, 206, 304) or "content-encoding" in cabeceras
+                        or not es_comprimible(cabeceras.get("content-type"))):
+                    pasar = True
+                    await send(message)
+                    return
+                inicio = {**message, "headers": list(message["headers"])}
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            cuerpo = message.get("body", b"")
+            mas = message.get("more_body", False)
+
+            if compresor is None:
+                cabeceras = MutableHeaders(raw=inicio["headers"])
+                _agregar_vary(cabeceras)
+                largo = cabeceras.get("content-length")
+                # Con un solo mensaje el tamaño es el del cuerpo; por partes, el Content-Length si lo trae
+                chica = len(cuerpo) < self.minimo if not mas else (largo is not None and int(largo) < self.minimo)
+                if codificacion is None or chica:
+                    pasar = True
+                    await send(inicio)
+                    await send(message)
+                    return
+
+                compresor = Compresor(codificacion)
+                cabeceras["content-encoding"] = codificacion
+                _etag_debil(cabeceras)
+                if not mas:
+                    comprimido = compresor.terminar(cuerpo)
+                    cabeceras["content-length"] = str(len(comprimido))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+                # Por partes: el largo final no se conoce de antemano
+                del cabeceras["content-length"]
+                await send(inicio)
+
+            datos = compresor.comprimir(cuerpo) if mas else compresor.terminar(cuerpo)
+            await send({"type": "http.response.body", "body": datos, "more_body": mas})
+
+        await self.app(scope, receive, enviar)
+
+
+def precomprimir(ruta: str, minimo: int = COMPRESION_MINIMO_BYTES) -> list:
+    """
+    Escribe junto a `ruta` sus variantes .gz y .br con el nivel máximo (se hace
+    una vez por archivo, no por petición). Solo para tipos de texto y archivos
+    que superan `minimo`. Devuelve las rutas creadas.
+    """
+    tipo, _ = mimetypes.guess_type(ruta)
+    if not es_comprimible(tipo) or os.path.getsize(ruta) < minimo:
+        return []
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    creadas = []
+    for codificacion in codificaciones_disponibles():
+        if codificacion == "br":
+            comprimido = brotli.compress(datos, quality=11)
+        else:
+            comprimido = gzip.compress(datos, compresslevel=9, mtime=0)
+        if len(comprimido) >= len(datos):
+            continue
+        destino = ruta + EXTENSIONES[codificacion]
+        with open(destino, "wb") as f:
+            f.write(comprimido)
+        creadas.append(destino)
+    return creadas
+
+
+def borrar_variantes(ruta: str):
+    """Borra las variantes precomprimidas de `ruta` (al borrar o reemplazar el archivo)"""
+    for extension in EXTENSIONES.values():
+        try:
+            os.remove(ruta + extension)
+        except FileNotFoundError:
+            pass
+
+
+class StaticPrecomprimidos(StaticFiles):
+    """
+    StaticFiles que sirve la variante .br/.gz del archivo si existe y el cliente la acepta.
+    Las subclases pueden sumar cabeceras propias, como validadores o Cache-Control
+    (cabeceras_archivo); ver utils/subidas.py.
+    """
+
+    def cabeceras_archivo(self, full_path, codificacion: str | None) -> dict:
+        return {}
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        cabeceras_peticion = Headers(scope=scope)
+        tipo, _ = mimetypes.guess_type(str(full_path))
+        codificacion = None
+        if es_comprimible(tipo):
+            disponibles = tuple(c for c in codificaciones_disponibles() if os.path.exists(f"{full_path}{EXTENSIONES[c]}"))
+            if disponibles:
+                codificacion = elegir_codificacion(cabeceras_peticion.get("accept-encoding"), disponibles)
+
+        cabeceras = self.cabeceras_archivo(full_path, codificacion)
+        if codificacion is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=cabeceras)
+        else:
+            variante = f"{full_path}{EXTENSIONES[codificacion]}"
+            # ETag y Last-Modified salen del archivo comprimido: otra representación, otro validador
+            response = FileResponse(variante, status_code=status_code, stat_result=os.stat(variante),
+                                    media_type=tipo, headers={**cabeceras, "content-encoding": codificacion})
+        if es_comprimible(tipo):
+            _agregar_vary(response.headers)
+        if self.is_not_modified(response.headers, cabeceras_peticion):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,64 @@
+# utils/paginacion.py
+"""
+Paginación por cursor (keyset) ordenada por (fecha_creacion, id) descendente.
+
+El cursor es opaco para el cliente: base64 de la fecha y el id de la última
+fila devuelta. La siguiente página empieza justo después de esa fila, así que
+el costo no crece con la profundidad como pasa con OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+HEADER_CURSOR = "X-Next-Cursor"
+
+
+def codificar_cursor(fecha, id_fila: int) -> str:
+    datos = [fecha.isoformat() if fecha is not None else None, id_fila]
+    return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, id_fila = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return (datetime.fromisoformat(fecha) if fecha is not None else None), int(id_fila)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def ordenar_por_cursor(query, columna_fecha, columna_id, cursor: str = None):
+    """Ordena por (fecha, id) desc y, si hay cursor, filtra las filas posteriores a él"""
+    query = query.order_by(columna_fecha.desc(), columna_id.desc())
+    if not cursor:
+        return query
+
+    fecha, id_fila = decodificar_cursor(cursor)
+    if fecha is None:
+        # Las filas sin fecha van al final en orden descendente (MySQL y SQLite)
+        return query.where(columna_fecha.is_(None), columna_id < id_fila)
+
+    if columna_fecha.type.python_type is not datetime:
+        fecha = fecha.date()
+    return query.where(or_(
+        columna_fecha < fecha,
+        and_(columna_fecha == fecha, columna_id < id_fila),
+        columna_fecha.is_(None),
+    ))
+
+
+def recortar_pagina(filas: list, limit: int, response: Response, columna_fecha: str, columna_id: str) -> list:
+    """
+    La consulta pide limit + 1 filas: si sobra una hay página siguiente y se
+    envía su cursor en el header X-Next-Cursor (el cuerpo sigue siendo la lista).
+    """
+    if len(filas) <= limit:
+        return filas
+    filas = filas[:limit]
+    if not filas:  # limit <= 0: no hay última fila de la que sacar el cursor
+        return filas
+    ultima = filas[-1]
+    response.headers[HEADER_CURSOR] = codificar_cursor(getattr(ultima, columna_fecha), getattr(ultima, columna_id))
+    return filas
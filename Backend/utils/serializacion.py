@@ -0,0 +1,122 @@
+# utils/serializacion.py
+"""
+Serialización de las respuestas JSON de la API.
+
+Con response_model, FastAPI valida lo que devuelve la ruta contra el modelo,
+lo convierte a tipos JSON y recién ahí lo codifica. Las rutas de listados
+además validaban cada fila por su cuenta (model_validate().model_dump())
+antes de devolverla, así que cada fila se validaba dos veces.
+
+Serializador valida la página una sola vez con un TypeAdapter cacheado y
+la vuelca directo a bytes con pydantic-core; la ruta devuelve la Response
+ya armada y FastAPI no vuelve a tocarla (response_model queda solo para la
+documentación de OpenAPI). El resto de las rutas usa ORJSONResponse como
+clase por defecto (ver main.py).
+
+Los listados aceptan `fields=` (campos separados por coma, o "all"); sin él
+devuelven la proyección "resumen" de cada ruta. Las columnas que no se piden
+ni se leen de la base: la ruta pide solo las de columnas().
+
+Comparación en benchmarks/bench_serializacion.py.
+"""
+import os
+from typing import List
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, TypeAdapter, create_model
+
+from utils.cache_lru import CacheLRU
+
+load_dotenv()
+
+# Modelos parciales (uno por combinación de campos pedida) que se guardan por serializador
+SERIALIZACION_PARCIALES_MAXIMO = int(os.getenv("SERIALIZACION_PARCIALES_MAXIMO", "64"))
+
+CAMPOS_TODOS = "all"
+
+
+class Serializador:
+    def __init__(self, modelo: type[BaseModel], resumen: tuple | None = None, dependencias: dict | None = None):
+        """
+        resumen: campos que devuelve el listado si no se pasa `fields` (por defecto todos).
+        dependencias: campo de respuesta que no es columna -> columna ORM de la que sale
+        (por ejemplo "escritor" -> "usuario_escritor_id").
+        """
+        self.modelo = modelo
+        self.campos = tuple(modelo.model_fields)
+        self.resumen = tuple(c for c in self.campos if c in resumen) if resumen else self.campos
+        self.dependencias = dependencias or {}
+        self._uno = TypeAdapter(modelo)
+        self._lista = TypeAdapter(List[modelo])
+        self._parciales = CacheLRU(SERIALIZACION_PARCIALES_MAXIMO)
+
+    def campos_pedidos(self, fields: str | None) -> tuple:
+        """Campos del parámetro `fields`, en el orden del modelo: sin él, el resumen; "all", todos"""
+        if fields is None:
+            return self.resumen
+        if fields.strip() == CAMPOS_TODOS:
+            return self.campos
+        pedidos = {c.strip() for c in fields.split(",") if c.strip()}
+        desconocidos = pedidos - set(self.campos)
+        if desconocidos:
+            raise HTTPException(status_code=400, detail=f"Campos desconocidos: {', '.join(sorted(desconocidos))}")
+        if not pedidos:
+            raise HTTPException(status_code=400, detail="fields no puede estar vacío")
+        return tuple(c for c in self.campos if c in pedidos)
+
+    def parcial(self, campos: tuple) -> "Serializador":
+        """Serializador para un subconjunto de campos (un modelo generado con solo esos campos)"""
+        if campos == self.campos:
+            return self
+        parcial = self._parciales.obtener(campos)
+        if parcial is None:
+            definiciones = self.modelo.model_fields
+            modelo = create_model(
+                f"{self.modelo.__name__}Parcial",
+                **{c: (definiciones[c].annotation, definiciones[c]) for c in campos},
+            )
+            parcial = Serializador(modelo)
+            self._parciales.guardar(campos, parcial)
+        return parcial
+
+    def columnas(self, modelo_orm, campos: tuple) -> tuple:
+        """Nombres de las columnas de `modelo_orm` que hacen falta para `campos` (ver db/lecturas.py)"""
+        nombres = {self.dependencias.get(c, c) for c in campos}
+        return tuple(c.key for c in modelo_orm.__table__.c if c.key in nombres)
+
+    def fila(self, objeto, **extra) -> dict:
+        """
+        Datos de la fila para el modelo: los campos que no vienen en `extra` se leen
+        del objeto (fila ORM o Row de db/lecturas.py). Los campos que son relaciones
+        en el modelo ORM deben venir en `extra`, si no se dispararía una carga perezosa.
+        """
+        datos = {campo: getattr(objeto, campo) for campo in self.campos if campo not in extra}
+        datos.update(extra)
+        return datos
+
+    def json(self, dato) -> bytes:
+        return self._uno.dump_json(self._uno.validate_python(dato, from_attributes=True))
+
+    def json_lista(self, datos) -> bytes:
+        return self._lista.dump_json(self._lista.validate_python(datos, from_attributes=True))
+
+    def respuesta(self, dato, response: Response | None = None) -> Response:
+        return respuesta_bytes(self.json(dato), response)
+
+    def respuesta_lista(self, datos, response: Response | None = None) -> Response:
+        return respuesta_bytes(self.json_lista(datos), response)
+
+
+def respuesta_bytes(cuerpo: bytes, response: Response | None = None) -> Response:
+    """
+    Response con el JSON ya codificado. Al devolver una Response, FastAPI ignora las
+    cabeceras puestas en el `response` inyectado: se copian aquí (menos content-length,
+    que Starlette calcula de nuevo).
+    """
+    respuesta = Response(content=cuerpo, media_type="application/json")
+    if response is not None:
+        respuesta.raw_headers.extend(
+            (k, v) for k, v in response.raw_headers if k not in (b"content-length", b"content-type")
+        )
+    return respuesta
@@ -0,0 +1,145 @@
+# utils/subidas.py
+"""
+Archivos subidos (/uploads) con nombre por contenido y caché larga.
+
+guardar_subida() guarda cada archivo con el hash SHA-256 de su contenido
+como nombre (uploads/noticias/3f9a...c1.jpg). Un archivo nuevo siempre
+tiene una URL nueva y una URL nunca cambia de contenido, así que
+StaticSubidas puede servirlos con `Cache-Control: immutable` y un ETag
+fuerte que es el propio hash: navegador y CDN no vuelven a pedirlos.
+Subir dos veces el mismo archivo reutiliza el que ya está.
+
+Como un archivo puede ser compartido por varias filas, borrarlo se coordina
+con las subidas que lo reutilizan: el borrado aparta el archivo y vuelve a
+mirar la base antes de borrarlo (apartar_subida), y la subida, después de su
+commit, lo repone desde su temporal si ya no está (confirmar_subida).
+
+Los archivos con el nombre viejo (noticia_3.jpg, la foto con su nombre
+original) siguen sirviéndose, pero con revalidación (SUBIDAS_CACHE_CONTROL).
+
+Range lo resuelve FileResponse (206, If-Range con el ETag).
+"""
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+from typing import NamedTuple
+
+from dotenv import load_dotenv
+
+from utils.compresion import StaticPrecomprimidos, borrar_variantes, precomprimir
+
+load_dotenv()
+
+SUBIDAS_CACHE_CONTROL_INMUTABLE = os.getenv("SUBIDAS_CACHE_CONTROL_INMUTABLE", "public, max-age=31536000, immutable")
+SUBIDAS_CACHE_CONTROL = os.getenv("SUBIDAS_CACHE_CONTROL", "public, no-cache")  # archivos con nombre viejo
+SUBIDAS_BLOQUE_BYTES = int(os.getenv("SUBIDAS_BLOQUE_BYTES", str(256 * 1024)))  # lectura de la subida al guardarla
+
+LARGO_HASH = 32  # caracteres hex del SHA-256 que van en el nombre (128 bits)
+
+_NOMBRE_HASH = re.compile(rf"^([0-9a-f]{{{LARGO_HASH}}})\.[a-z0-9]+$")
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+def extension_segura(nombre_original: str | None) -> str:
+    """Extensión en minúsculas del nombre que mandó el cliente, o "" si no es una extensión simple"""
+    extension = os.path.splitext(nombre_original or "")[1].lower()
+    return extension if _EXTENSION.match(extension) else ""
+
+
+def hash_de_nombre(nombre: str) -> str | None:
+    """El hash de contenido si `nombre` es de los que genera guardar_subida()"""
+    coincidencia = _NOMBRE_HASH.match(nombre)
+    return coincidencia.group(1) if coincidencia else None
+
+
+class Subida(NamedTuple):
+    ruta: str
+    respaldo: str  # temporal con el mismo contenido, hasta confirmar_subida()
+
+
+def guardar_subida(archivo, directorio: str) -> Subida:
+    """
+    Guarda el UploadFile en `directorio` con nombre <hash><extensión>.
+    Se escribe a un temporal del mismo directorio mientras se calcula el hash y se
+    enlaza al final: nunca queda a la vista un archivo a medio escribir.
+
+    Es bloqueante (hash, disco y brotli): las rutas async lo llaman con
+    run_in_threadpool. El temporal queda como respaldo hasta confirmar_subida().
+    """
+    os.makedirs(directorio, exist_ok=True)
+    sha = hashlib.sha256()
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, prefix=".subida_")
+    try:
+        with os.fdopen(descriptor, "wb") as destino:
+            while bloque := archivo.file.read(SUBIDAS_BLOQUE_BYTES):
+                sha.update(bloque)
+                destino.write(bloque)
+        os.chmod(temporal, 0o644)
+        ruta = os.path.join(directorio, sha.hexdigest()[:LARGO_HASH] + extension_segura(archivo.filename))
+        try:
+            os.link(temporal, ruta)
+            precomprimir(ruta)
+        except FileExistsError:
+            pass  # mismo contenido ya subido: se reutiliza
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return Subida(ruta, temporal)
+
+
+def confirmar_subida(subida: Subida):
+    """
+    Se llama después del commit que guarda la ruta (o si falló). Un borrado
+    concurrente pudo haber quitado el archivo reutilizado entre guardar_subida()
+    y el commit: si falta, se repone desde el respaldo.
+    """
+    if os.path.exists(subida.ruta):
+        os.remove(subida.respaldo)
+    else:
+        os.replace(subida.respaldo, subida.ruta)
+        precomprimir(subida.ruta)
+
+
+def apartar_subida(ruta: str) -> str | None:
+    """
+    Primer paso de un borrado: renombra el archivo a un nombre oculto (atómico) y
+    devuelve ese nombre, o None si ya no estaba. Después hay que volver a mirar
+    si alguna fila lo usa (services/imagen_service.borrar_subida_sin_uso).
+    """
+    directorio, nombre = os.path.split(ruta)
+    apartado = os.path.join(directorio, f".borrando_{uuid.uuid4().hex}_{nombre}")
+    try:
+        os.rename(ruta, apartado)
+    except FileNotFoundError:
+        return None
+    return apartado
+
+
+def restaurar_subida(apartado: str, ruta: str):
+    """El archivo apartado sigue en uso: vuelve a su nombre (el contenido es el mismo)"""
+    os.replace(apartado, ruta)
+
+
+def descartar_subida(apartado: str, ruta: str):
+    """Nadie usa el archivo apartado: se borra. Las variantes solo si no lo repuso una subida"""
+    os.remove(apartado)
+    if not os.path.exists(ruta):
+        borrar_variantes(ruta)
+
+
+class StaticSubidas(StaticPrecomprimidos):
+    """
+    /uploads: variantes .br/.gz (StaticPrecomprimidos) y, para los nombres por
+    contenido, ETag fuerte con el hash y Cache-Control immutable.
+    """
+
+    def cabeceras_archivo(self, full_path, codificacion: str | None) -> dict:
+        contenido = hash_de_nombre(os.path.basename(full_path))
+        if contenido is None:
+            return {"cache-control": SUBIDAS_CACHE_CONTROL}
+        # Las variantes son deterministas (precomprimir() fija mtime=0): cada una con su ETag fuerte
+        etag = f'"{contenido}"' if codificacion is None else f'"{contenido}-{codificacion}"'
+        return {"cache-control": SUBIDAS_CACHE_CONTROL_INMUTABLE, "etag": etag}